@@ -0,0 +1,359 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import pandas as pd
+from dotenv import load_dotenv
+from data_layer import DataStore
+from generation_cache import GenerationCache
+from db_pool import PoolTimeout
+from instrument import stage
+from leaderboards import ALL, LEADERBOARD_ORDER
+from named_queries import load_queries
+from query_backend import BACKEND, BACKENDS, open_backend
+from search import match_query
+
+load_dotenv()
+
+# Read-only JSON API over competition.db for consumers other than the
+# dashboard (notebooks, widgets, cron reports), on the standard library's
+# threaded HTTP server. Data is read through the same DataStore as app.py,
+# so it shares the read pool, the per-generation frame cache and the
+# columnar snapshot. Every response body is built once per data generation
+# and kept in an LRU capped at API_CACHE_MB (generation_cache.py), together
+# with its gzip copy. Each has its own strong ETag (sha256 of the JSON, with
+# -gz for the gzip copy); clients revalidate with If-None-Match and get a 304
+# without a body until a load commits. Lists are paginated with ?page= and
+# ?per_page= (at most API_MAX_PAGE_SIZE rows).
+#   GET /                               endpoints and data generation
+#   GET /leaderboard?by=points&list=ATP&country=Spain&limit=10
+#   GET /countries?page=2
+#   GET /competitors/search?q=nadal
+#   GET /queries                        the named queries in analysis_queries.sql
+#   GET /queries/venues-per-complex?per_page=50
+#   python api.py [--port 8502] [--backend duckdb]
+
+HOST = os.getenv("API_HOST", "127.0.0.1")
+PORT = int(os.getenv("API_PORT", "8502"))
+CACHE_MB = float(os.getenv("API_CACHE_MB", "32"))
+PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+# Smaller bodies are sent as they are
+GZIP_MIN_BYTES = 1024
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def int_param(params, name, default, low=1, high=None):
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer") from None
+    if value < low or (high is not None and value > high):
+        raise ApiError(400, f"{name} must be between {low} and {high}" if high else f"{name} must be at least {low}")
+    return value
+
+
+def records(frame):
+    # NaN becomes null and numpy scalars plain numbers
+    return json.loads(frame.to_json(orient="records"))
+
+
+def paginate(params, total, rows_for):
+    # rows_for(offset, limit) returns the rows of one page
+    page = int_param(params, "page", 1)
+    per_page = int_param(params, "per_page", PAGE_SIZE, high=MAX_PAGE_SIZE)
+    pages = max(1, -(-total // per_page))
+    if page > pages:
+        raise ApiError(404, f"page {page} is past the last page ({pages})")
+    following = None
+    if page < pages:
+        following = urlencode({**params, "page": page + 1})
+    return {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": pages,
+        "next": following and f"?{following}",
+        "rows": rows_for((page - 1) * per_page, per_page),
+    }
+
+
+def paginate_frame(params, frame):
+    return paginate(params, len(frame), lambda offset, limit: records(frame.iloc[offset:offset + limit]))
+
+
+class Response:
+    """One encoded JSON body, its gzip copy and their ETags."""
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        # mtime=0 keeps the compressed bytes the same for the same body
+        self.gzipped = gzip.compress(self.body, 6, mtime=0) if len(self.body) >= GZIP_MIN_BYTES else None
+        # Strong tags name exact bytes, so the gzip copy has a tag of its own
+        self.gzip_etag = f'"{digest}-gz"' if self.gzipped is not None else None
+        self.size = len(self.body) + len(self.gzipped or b"")
+
+
+class Api:
+    """Routes a GET path and its parameters to a JSON payload."""
+
+    def __init__(self, db_path=None, backend=BACKEND):
+        self.store = DataStore(db_path)
+        # The sqlite backend reads through the store's pool, which follows a
+        # swapped file; duckdb keeps its own columnar copy
+        self.backend = None if backend == "sqlite" else open_backend(backend, db_path)
+        self.backend_name = backend
+        self.queries = {slug(name): (name, sql) for name, sql in load_queries()}
+        # Encoded responses; one built during a load is not kept
+        self.cache = GenerationCache(int(CACHE_MB * 1e6), self.store.current_generation)
+        self.routes = {
+            "/": self.index,
+            "/leaderboard": self.leaderboard,
+            "/countries": self.countries,
+            "/competitors/search": self.search,
+            "/queries": self.query_list,
+        }
+
+    def response(self, path, params):
+        # The cached Response for a request; raises ApiError for a bad one
+        path = path.rstrip("/") or "/"
+        if path in self.routes:
+            route, args = self.routes[path], ()
+        elif path.startswith("/queries/"):
+            route, args = self.named_query, (path[len("/queries/"):],)
+        else:
+            raise ApiError(404, f"no endpoint {path}")
+
+        generation = self.store.current_generation()
+        key = (path, tuple(sorted(params.items())))
+
+        def build():
+            with stage(f"api {path}") as s:
+                payload = route(params, *args)
+                s.rows = len(payload.get("rows", ()))
+            response = Response({"generation": generation, **payload})
+            return response, response.size
+
+        return self.cache.get(generation, key, build)
+
+    def index(self, params):
+        # The lists /leaderboard takes as ?list= (and ?gender=)
+        with self.store.pool.connection() as conn:
+            lists = [{"list": name, "type_id": type_id, "gender": gender}
+                     for name, type_id, gender in conn.execute(
+                         "SELECT name, type_id, gender FROM ranking_lists ORDER BY list_key")]
+        return {
+            "backend": self.backend_name,
+            "endpoints": ["/leaderboard", "/countries", "/competitors/search", "/queries"],
+            "ranking_lists": lists,
+        }
+
+    def leaderboard(self, params):
+        by = params.get("by", "rank")
+        if by not in LEADERBOARD_ORDER:
+            raise ApiError(400, f"by must be one of {', '.join(LEADERBOARD_ORDER)}")
+        limit = int_param(params, "limit", 10, high=MAX_PAGE_SIZE)
+        list_key = country_key = ALL
+        with self.store.pool.connection() as conn:
+            if "list" in params:
+                # List name as in the feed ("ATP"), with ?gender= when several share it
+                row = conn.execute(
+                    """
+                    SELECT list_key FROM ranking_lists
+                    WHERE name = ? AND (? IS NULL OR gender = ?)
+                    ORDER BY list_key
+                    """,
+                    (params["list"], params.get("gender"), params.get("gender")),
+                ).fetchone()
+                if row is None:
+                    raise ApiError(404, f"no ranking list {params['list']!r}")
+                list_key = row[0]
+            if "country" in params:
+                # Country name or ISO-3 code
+                row = conn.execute(
+                    "SELECT country_key FROM countries WHERE country_name = ? OR iso3 = ? ORDER BY country_key",
+                    (params["country"], params["country"].upper()),
+                ).fetchone()
+                if row is None:
+                    raise ApiError(404, f"no country {params['country']!r}")
+                country_key = row[0]
+        frame = self.store.leaderboard(by, list_key, country_key, limit)
+        return {"by": by, "rows": records(frame)}
+
+    def countries(self, params):
+        stats = self.store.get("country_stats")
+        return paginate_frame(params, stats)
+
+    def search(self, params):
+        match = match_query(params.get("q", ""))
+        if match is None:
+            raise ApiError(400, "q must contain a word to search for")
+        # Ranked by bm25 like search.SEARCH_QUERY, with the competitor's best
+        # current ranking (one row per competitor, as counted)
+        with self.store.pool.connection() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM competitor_search WHERE competitor_search MATCH ?", (match,)
+            ).fetchone()[0]
+
+            def rows_for(offset, limit):
+                return records(pd.read_sql("""
+                    SELECT c.competitor_id, c.name, c.abbreviation, n.country_name AS country,
+                           r.rank, r.points, l.name AS ranking_list
+                    FROM competitor_search s
+                    JOIN competitors c ON c.rowid = s.rowid
+                    LEFT JOIN countries n ON n.country_key = c.country_key
+                    LEFT JOIN competitor_rankings r ON r.rank_id = (
+                        SELECT rank_id FROM competitor_rankings_latest
+                        WHERE competitor_id = c.competitor_id
+                        ORDER BY rank LIMIT 1
+                    )
+                    LEFT JOIN ranking_lists l ON l.list_key = r.list_key
+                    WHERE competitor_search MATCH ?
+                    ORDER BY bm25(competitor_search, 10.0, 2.0, 1.0), c.rowid
+                    LIMIT ? OFFSET ?
+                """, conn, params=(match, limit, offset)))
+
+            return {"q": params["q"], **paginate(params, total, rows_for)}
+
+    def query_list(self, params):
+        return {"rows": [{"slug": key, "name": name, "url": f"/queries/{key}"}
+                         for key, (name, _) in self.queries.items()]}
+
+    def named_query(self, params, key):
+        if key not in self.queries:
+            raise ApiError(404, f"no query {key!r}; GET /queries lists them")
+        name, sql = self.queries[key]
+        # The full result is cached per generation; pages are slices of it
+        if self.backend is None:
+            frame = self.store.get(("query", key), lambda conn: pd.read_sql(sql, conn))
+        else:
+            frame = self.store.get(("query", key), lambda conn: self.backend.query(sql))
+        return {"name": name, **paginate_frame(params, frame)}
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+        self.store.pool.close()
+
+
+def etag_matches(header, response):
+    # If-None-Match: "*" or a list of (possibly weak) tags. Either encoding's
+    # tag matches: a client that has one of them has the current body.
+    if header is None:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or response.etag in tags or response.gzip_etag in tags
+
+
+def accepts_gzip(header):
+    for part in (header or "").split(","):
+        coding, _, q = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return q.strip().replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Keep-alive: every response carries Content-Length
+    protocol_version = "HTTP/1.1"
+    # Otherwise a response waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+    api = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        try:
+            response = self.api.response(url.path, params)
+        except ApiError as e:
+            return self.send_error_json(e.status, str(e))
+        except PoolTimeout as e:
+            return self.send_error_json(503, str(e), {"Retry-After": "1"})
+        except Exception:
+            # log_message is silenced, so the traceback goes to stderr here
+            print(f"❌ GET {self.path} failed", file=sys.stderr)
+            traceback.print_exc()
+            return self.send_error_json(500, "internal error")
+
+        gzipped = response.gzipped is not None and accepts_gzip(self.headers.get("Accept-Encoding"))
+        headers = {
+            # A 304 carries the tag of the encoding a 200 would have sent
+            "ETag": response.gzip_etag if gzipped else response.etag,
+            # Stored, but revalidated on every use: a load can commit any time
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(self.headers.get("If-None-Match"), response):
+            return self.send(304, b"", headers)
+        body = response.body
+        if gzipped:
+            body = response.gzipped
+            headers["Content-Encoding"] = "gzip"
+        self.send(200, body, {"Content-Type": "application/json; charset=utf-8", **headers})
+
+    def send_error_json(self, status, message, headers=None):
+        body = json.dumps({"error": message}).encode()
+        self.send(status, body, {"Content-Type": "application/json; charset=utf-8", **(headers or {})})
+
+    def send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        # One line per request would cost more than serving a cached one
+        pass
+
+
+def serve(db_path=None, host=HOST, port=PORT, backend=BACKEND):
+    api = Api(db_path, backend)
+    handler = type("ApiHandler", (Handler,), {"api": api})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return api, server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", help="database file (default: the live one, see live_db.py)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--backend", choices=list(BACKENDS), default=BACKEND)
+    args = parser.parse_args()
+
+    api, server = serve(args.db, args.host, args.port, args.backend)
+    print(f"✅ Serving {api.store.db_path} on http://{server.server_address[0]}:{server.server_address[1]}/ "
+          f"({args.backend})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        api.close()
@@ -1,15 +1,14 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
-from pathlib import Path
-import plotly.express as px
 import base64
+import math
+import time
+from pathlib import Path
 
 # ================= PAGE CONFIG =================
 st.set_page_config(page_title="Tennis Game Analytics", layout="wide")
 
 # ================= UI STYLES =================
-st.markdown("""
+STYLES = """
 <style>
 .block-container {
     background: rgba(0, 0, 0, 0.30);
@@ -56,78 +55,78 @@ section[data-testid="stSidebar"] {
     margin-bottom: 20px;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 # ================= BACKGROUND IMAGE =================
-def set_background(image_path):
-    with open(image_path, "rb") as img_file:
-        encoded = base64.b64encode(img_file.read()).decode()
-    st.markdown(f"""
+BACKGROUND = Path(__file__).resolve().parent / "static" / "bg.jpg"
+
+# Built once per process. With static serving on (.streamlit/config.toml)
+# the page refers to /app/static/bg.jpg, which the browser caches; otherwise
+# the image is inlined, encoded here rather than on every run.
+@st.cache_resource
+def background_css(image_path):
+    if st.get_option("server.enableStaticServing"):
+        url = f"app/static/{image_path.name}"
+    else:
+        url = f"data:image/jpg;base64,{base64.b64encode(image_path.read_bytes()).decode()}"
+    return f"""
         <style>
         .stApp {{
-            background-image: url("data:image/jpg;base64,{encoded}");
+            background-image: url("{url}");
             background-size: cover;
             background-position: center;
             background-attachment: fixed;
         }}
         </style>
-    """, unsafe_allow_html=True)
-
-set_background("src/app/assets/bg.jpg")
-
-# ================= DATABASE (CORRECT ONE) =================
-# app.py -> src/app/app.py
-# DB -> src/scripts/competition.db
-BASE_DIR = Path(__file__).resolve().parents[1]
-MAIN_DB = BASE_DIR / "scripts" / "competition.db"
-
-@st.cache_resource
-def get_connection():
-    return sqlite3.connect(MAIN_DB, check_same_thread=False)
-
-# ================= LOAD DATA =================
-def load_rank_data():
-    query = """
-    SELECT r.rank, r.movement, r.points, r.competitions_played,
-           c.name, c.country
-    FROM competitor_rankings r
-    JOIN competitors c
-    ON r.competitor_id = c.competitor_id
     """
-    return pd.read_sql(query, get_connection())
-
-def load_complex_data():
-    return pd.read_sql(
-        "SELECT complex_id, complex_name, country, timezone FROM complexes",
-        get_connection()
-    )
-
-def load_venue_data():
-    return pd.read_sql("""
-        SELECT v.venue_id, v.venue_name,
-               c.complex_name, c.country, c.timezone
-        FROM venues v
-        JOIN complexes c
-        ON v.complex_id = c.complex_id
-    """, get_connection())
-
-df = load_rank_data()
-complex_df = load_complex_data()
-venue_df = load_venue_data()
+
+st.markdown(STYLES + background_css(BACKGROUND), unsafe_allow_html=True)
 
 # ================= SIDEBAR =================
 st.sidebar.markdown("<div class='sidebar-title'>Tennis Game Analytics</div>", unsafe_allow_html=True)
 st.sidebar.markdown("<div class='sidebar-subtitle'>Sports Data Analytics Dashboard</div>", unsafe_allow_html=True)
 
-section = st.sidebar.radio("Navigation Menu", [
+section = st.sidebar.radio("Navigation Menu", key="section", options=[
     "Dashboard",
     "Competitor Explorer",
     "Country Analysis",
     "Leaderboards",
+    "Competition Hierarchy",
     "Infrastructure Analysis",
+    "Performance",
     "About"
 ])
 
+# ================= DATA =================
+# Imported once the sidebar is drawn: the first run in a process pays for
+# pandas here, and no SQLite work starts before the page can be navigated.
+# plotly.express is imported by the figures that need it (figures.py).
+import pandas as pd
+from data_layer import DataStore, EXPLORER_PAGE_SIZE, explorer_filters
+from leaderboards import ALL
+from figures import FigureCache
+from instrument import METRICS_PATH, read_metrics, stage
+
+# app.py -> src/app/app.py
+# DB -> src/scripts/competition.current, a link to the live version, or
+#       competition.db until the first swap creates the link (live_db.py)
+# Frames are shared by every session and reloaded only after an ingest
+# (see data_layer.py), so sections must not modify them in place.
+@st.cache_resource
+def get_store():
+    return DataStore()
+
+# Built figures, shared the same way and rebuilt in the background after a
+# load (see figures.py); charts are drawn from here by chart id. The warm-up
+# thread is started by the first section that draws charts, after they are
+# drawn, so sections without charts never start it.
+@st.cache_resource
+def get_figures():
+    return FigureCache(get_store())
+
+store = get_store()
+figures = get_figures()
+
 # ================= KPI CARD =================
 def kpi_card(title, value):
     st.markdown(f"""
@@ -137,146 +136,237 @@ def kpi_card(title, value):
         </div>
     """, unsafe_allow_html=True)
 
-# ================= DASHBOARD =================
-if section == "Dashboard":
-    st.markdown('<div class="section-box">', unsafe_allow_html=True)
-    st.markdown('<div class="section-title">Tennis Game Analytics Dashboard</div>', unsafe_allow_html=True)
-
-    c1, c2, c3 = st.columns(3)
-    with c1: kpi_card("Total Competitors", df.shape[0])
-    with c2: kpi_card("Countries Represented", df["country"].nunique())
-    with c3: kpi_card("Highest Points", int(df["points"].max()))
-
-    country_df = df["country"].value_counts().reset_index()
-    country_df.columns = ["Country", "Competitors"]
-
-    st.plotly_chart(px.bar(country_df.head(15),
-                           x="Country", y="Competitors",
-                           color="Competitors",
-                           template="plotly_dark"), use_container_width=True)
-
-    st.plotly_chart(px.pie(country_df.head(8),
-                           names="Country",
-                           values="Competitors",
-                           hole=0.5,
-                           template="plotly_dark"), use_container_width=True)
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ================= COMPETITOR EXPLORER =================
-elif section == "Competitor Explorer":
-    st.markdown('<div class="section-box">', unsafe_allow_html=True)
-    st.markdown('<div class="section-title">Competitor Explorer</div>', unsafe_allow_html=True)
-
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        rank_range = st.slider("Rank Range", 1, int(df["rank"].max()), (1, 50))
-    with col2:
-        countries = st.multiselect("Country", sorted(df["country"].unique()))
-    with col3:
-        min_points = st.slider("Minimum Points",
-                               int(df["points"].min()),
-                               int(df["points"].max()),
-                               int(df["points"].min()))
-    with col4:
-        search = st.text_input("Search Competitor")
-
-    filtered = df[
-        df["rank"].between(rank_range[0], rank_range[1]) &
-        (df["points"] >= min_points)
-    ]
-
-    if countries:
-        filtered = filtered[filtered["country"].isin(countries)]
-    if search:
-        filtered = filtered[filtered["name"].str.contains(search, case=False)]
-
-    st.dataframe(filtered.sort_values("rank"), use_container_width=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ================= COUNTRY ANALYSIS =================
-elif section == "Country Analysis":
-    st.markdown('<div class="section-box">', unsafe_allow_html=True)
-    st.markdown('<div class="section-title">Country-wise Analysis</div>', unsafe_allow_html=True)
-
-    stats = df.groupby("country").agg(
-        Total_Competitors=("name", "count"),
-        Average_Points=("points", "mean")
-    ).reset_index()
-
-    st.plotly_chart(px.bar(stats.sort_values("Total_Competitors", ascending=False).head(15),
-                           x="country", y="Total_Competitors",
-                           template="plotly_dark"), use_container_width=True)
-
-    st.plotly_chart(px.scatter(stats,
-                               x="Total_Competitors",
-                               y="Average_Points",
-                               size="Average_Points",
-                               color="country",
-                               template="plotly_dark"), use_container_width=True)
-
-    st.plotly_chart(px.choropleth(stats,
-                                  locations="country",
-                                  locationmode="country names",
-                                  color="Total_Competitors",
-                                  color_continuous_scale="Oranges",
-                                  title="Global Tennis Competitor Distribution"),
-                     use_container_width=True)
-
-    st.dataframe(stats, use_container_width=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ================= LEADERBOARDS =================
-elif section == "Leaderboards":
-    st.markdown('<div class="section-box">', unsafe_allow_html=True)
-    st.markdown('<div class="section-title">Leaderboards</div>', unsafe_allow_html=True)
-
-    tab1, tab2 = st.tabs(["Top Ranked", "Highest Points"])
-    with tab1:
-        st.dataframe(df.sort_values("rank").head(10), use_container_width=True)
-    with tab2:
-        st.dataframe(df.sort_values("points", ascending=False).head(10), use_container_width=True)
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ================= INFRASTRUCTURE (PERSON 2) =================
-elif section == "Infrastructure Analysis":
-    st.markdown('<div class="section-box">', unsafe_allow_html=True)
-    st.markdown('<div class="section-title">Infrastructure & Venue Analysis</div>', unsafe_allow_html=True)
-
-    k1, k2, k3 = st.columns(3)
-    with k1: kpi_card("Total Complexes", complex_df.shape[0])
-    with k2: kpi_card("Total Venues", venue_df.shape[0])
-    with k3: kpi_card("Countries with Venues", venue_df["country"].nunique())
-
-    venues_per_complex = venue_df.groupby("complex_name").size().reset_index(name="Venues")
-
-    st.plotly_chart(px.bar(venues_per_complex.sort_values("Venues", ascending=False).head(15),
-                           x="complex_name", y="Venues",
-                           template="plotly_dark"), use_container_width=True)
-
-    country_venues = venue_df.groupby("country").size().reset_index(name="Venues")
-
-    st.plotly_chart(px.pie(country_venues,
-                           names="country",
-                           values="Venues",
-                           hole=0.45,
-                           template="plotly_dark"), use_container_width=True)
-
-    st.plotly_chart(px.choropleth(country_venues,
-                                  locations="country",
-                                  locationmode="country names",
-                                  color="Venues",
-                                  color_continuous_scale="Oranges",
-                                  title="Global Tennis Infrastructure"),
-                     use_container_width=True)
-
-    st.dataframe(venue_df, use_container_width=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ================= ABOUT =================
-elif section == "About":
-    st.markdown('<div class="section-box">', unsafe_allow_html=True)
-    st.markdown('<div class="section-title">Tennis Game</div>', unsafe_allow_html=True)
-    st.markdown("Tennis is one of the most popular and widely played sports in the world, known for its combination of physical endurance, technical precision, strategic thinking, and mental resilience. It is played by individuals of all ages and skill levels, from recreational players to professional athletes competing on international stages. Tennis can be played in two primary formats: singles, where two players compete against each other, and doubles, where two teams of two players each face off. The objective of the game is to score points by hitting the ball over the net into the opponent’s court in such a way that the opponent cannot return it successfully within the rules. The origins of modern tennis can be traced back to Europe, particularly France and England, where earlier forms of the game were played as early as the twelfth century. Over time, tennis evolved into its current form during the late nineteenth century, with standardized rules, equipment, and court dimensions. The establishment of governing bodies helped regulate the sport globally, ensuring uniform rules, fair play, and structured competition. Today, tennis is governed internationally by professional organizations that oversee tournaments, player rankings, and rule enforcement.Tennis is played on different types of court surfaces, each of which significantly influences gameplay and player strategy. The three primary surfaces are grass, clay, and hard courts. Grass courts are fast-paced and favor players with strong serves and quick reflexes. Clay courts slow down the ball and produce higher bounces, encouraging longer rallies and emphasizing endurance and consistency. Hard courts offer a balanced playing environment, combining elements of speed and bounce that suit a wide range of playing styles. These surface variations make tennis a complex and dynamic sport, where adaptability plays a key role in success. Professional tennis follows a structured tournament system that allows players to compete at various levels throughout the year. Players earn ranking points based on their performance in tournaments, and these points determine their global rankings. Rankings are a critical aspect of professional tennis, as they influence tournament entry, seedings, and qualification for major events. Rankings are not static; they change frequently depending on match outcomes, points earned, and the number of tournaments played. This dynamic nature makes ranking analysis an important area of study in tennis analytics. Tennis tournaments are hosted across the world in a wide range of venues and sports complexes. These complexes often include multiple courts, training facilities, and supporting infrastructure to accommodate players, officials, and spectators. The geographical distribution of tennis venues reflects the global reach of the sport, with strong participation from Europe, the Americas, Asia, and other regions. Understanding the relationship between infrastructure, player representation, and competitive performance provides valuable insights into how tennis develops at national and international levels. In recent years, data analytics has become increasingly important in the sport of tennis. Large volumes of data are generated from matches, rankings, player movements, and tournament participation. This data can be analyzed to evaluate player performance, identify trends, compare competitors, and assess country-wise participation. Coaches, analysts, and sports organizations rely on data-driven insights to make informed decisions related to training, strategy, and player development. Tennis analytics enables the transformation of raw data into meaningful information through structured databases and visualizations. By organizing tennis data into relational databases and applying analytical queries, patterns and trends that are not immediately visible can be uncovered. Interactive dashboards further enhance understanding by allowing users to explore data through filters, charts, and geographic visualizations. These tools make complex tennis data more accessible to analysts, students, and enthusiasts alike. Overall, tennis is not only a sport of athletic excellence but also a domain rich in structured and unstructured data. The integration of tennis data with modern analytics platforms highlights the growing role of technology in sports. Tennis Game Analytics demonstrates how databases, programming, and visualization techniques can be combined to analyze sports data effectively. Through competitor analysis, country-wise insights, leaderboards, and infrastructure exploration, the platform showcases the practical application of data analytics concepts in the context of a globally recognized sport.")
-    st.markdown("</div>", unsafe_allow_html=True)
+# ================= SECTIONS =================
+# Each page view is one stage in the metrics file; the loaders it calls and
+# their SQL are recorded under it (see src/scripts/instrument.py)
+with stage(f"section {section}"):
+    # ================= DASHBOARD =================
+    if section == "Dashboard":
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Tennis Game Analytics Dashboard</div>', unsafe_allow_html=True)
+
+        kpis = store.get("kpis")
+        c1, c2, c3 = st.columns(3)
+        with c1: kpi_card("Total Competitors", kpis["total_competitors"])
+        with c2: kpi_card("Countries Represented", kpis["countries_represented"])
+        with c3: kpi_card("Highest Points", kpis["highest_points"])
+
+        st.plotly_chart(figures.get("dashboard_competitors_bar"), use_container_width=True)
+        st.plotly_chart(figures.get("dashboard_competitors_pie"), use_container_width=True)
+        figures.start_warming()
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ================= COMPETITOR EXPLORER =================
+    elif section == "Competitor Explorer":
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Competitor Explorer</div>', unsafe_allow_html=True)
+
+        max_rank, lowest_points, highest_points = store.get("ranking_bounds")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            rank_range = st.slider("Rank Range", 1, int(max_rank), (1, 50))
+        with col2:
+            country_names = store.get("ranked_countries")
+            countries = st.multiselect("Country", list(country_names), format_func=country_names.get)
+        with col3:
+            min_points = st.slider("Minimum Points",
+                                   int(lowest_points),
+                                   int(highest_points),
+                                   int(lowest_points))
+        with col4:
+            search = st.text_input("Search Competitor")
+
+        # Filters run in SQL; pages are fetched by keyset on (rank, competitor_id)
+        filters = explorer_filters(rank_range, countries, min_points, search)
+        if st.session_state.get("explorer_filters") != filters:
+            st.session_state.explorer_filters = filters
+            st.session_state.explorer_cursors = [None]
+        cursors = st.session_state.explorer_cursors
+
+        start = time.perf_counter()
+        total = store.explorer_count(filters)
+        page = store.explorer_page(filters, cursors[-1])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        st.dataframe(page.drop(columns="competitor_id"), use_container_width=True)
+
+        pages = max(1, math.ceil(total / EXPLORER_PAGE_SIZE))
+        prev_col, info_col, next_col = st.columns([1, 4, 1])
+        with info_col:
+            st.caption(f"{total} competitors · page {len(cursors)} of {pages} · {elapsed_ms:.1f} ms")
+        with prev_col:
+            if st.button("Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with next_col:
+            if st.button("Next", disabled=len(cursors) >= pages):
+                last = page.iloc[-1]
+                cursors.append((int(last["rank"]), last["competitor_id"]))
+                st.rerun()
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ================= COUNTRY ANALYSIS =================
+    elif section == "Country Analysis":
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Country-wise Analysis</div>', unsafe_allow_html=True)
+
+        stats = store.get("country_stats")
+
+        st.plotly_chart(figures.get("country_competitors_bar"), use_container_width=True)
+        st.plotly_chart(figures.get("country_points_scatter"), use_container_width=True)
+        st.plotly_chart(figures.get("country_competitors_map"), use_container_width=True)
+        figures.start_warming()
+
+        st.dataframe(stats, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ================= LEADERBOARDS =================
+    elif section == "Leaderboards":
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Leaderboards</div>', unsafe_allow_html=True)
+
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            list_names = store.get("ranking_lists")
+            if list_names:
+                list_key = st.selectbox("Ranking List", [ALL, *list_names],
+                                        format_func=lambda key: list_names.get(key, "All lists"))
+            else:
+                # Rankings loaded before ranking_lists have no list (backfill_ranking_lists.py)
+                list_key = ALL
+                st.caption("This database has no ranking lists yet: the leaderboards below "
+                           "rank every list together until the next rankings load.")
+        with col2:
+            country_names = store.get("ranked_countries")
+            country_key = st.selectbox("Country", [ALL, *country_names],
+                                       format_func=lambda key: country_names.get(key, "All countries"))
+        with col3:
+            top = st.number_input("Top", min_value=1, max_value=500, value=10)
+
+        # Each tab is one range read on the leaderboard index (src/scripts/leaderboards.py)
+        tab1, tab2 = st.tabs(["Top Ranked", "Highest Points"])
+        with tab1:
+            st.dataframe(store.leaderboard("rank", list_key, country_key, top), use_container_width=True)
+        with tab2:
+            st.dataframe(store.leaderboard("points", list_key, country_key, top), use_container_width=True)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ================= COMPETITION HIERARCHY =================
+    elif section == "Competition Hierarchy":
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Competition Hierarchy</div>', unsafe_allow_html=True)
+
+        # Parents referenced by the feed but not in it have no name
+        def competition_label(cid, name, depth=0):
+            name = name if isinstance(name, str) else f"{cid} (not in feed)"
+            # Em spaces: the select box trims ordinary leading spaces
+            return "\u2003" * depth + name
+
+        trees = store.get("competition_trees")
+        if trees.empty:
+            st.info("No competition has sub-competitions yet")
+        else:
+            st.subheader("Largest Hierarchies")
+            st.dataframe(trees, use_container_width=True)
+
+            roots = dict(zip(trees["competition_id"], trees["competition_name"]))
+            root_id = st.selectbox("Hierarchy", list(roots),
+                                   format_func=lambda cid: competition_label(cid, roots[cid]))
+
+            # Both lookups are one index range on competition_closure
+            members = store.subtree(root_id)
+            labels = {
+                row.competition_id: competition_label(row.competition_id, row.competition_name, row.depth)
+                for row in members.itertuples()
+            }
+            competition_id = st.selectbox("Competition", list(labels), format_func=labels.get)
+
+            path = store.ancestors(competition_id)
+            st.markdown("**Path:** " + " → ".join(
+                competition_label(cid, name) for cid, name in zip(path["competition_id"], path["competition_name"])
+            ))
+
+            below = store.subtree(competition_id)
+            st.subheader(f"Sub-competitions ({len(below) - 1})")
+            st.dataframe(below[below["depth"] > 0], use_container_width=True)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ================= INFRASTRUCTURE (PERSON 2) =================
+    elif section == "Infrastructure Analysis":
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Infrastructure & Venue Analysis</div>', unsafe_allow_html=True)
+
+        kpis = store.get("kpis")
+        k1, k2, k3 = st.columns(3)
+        with k1: kpi_card("Total Complexes", kpis["total_complexes"])
+        with k2: kpi_card("Total Venues", kpis["total_venues"])
+        with k3: kpi_card("Countries with Venues", kpis["countries_with_venues"])
+
+        st.plotly_chart(figures.get("complex_venues_bar"), use_container_width=True)
+        st.plotly_chart(figures.get("country_venues_pie"), use_container_width=True)
+        st.plotly_chart(figures.get("country_venues_map"), use_container_width=True)
+        figures.start_warming()
+
+        st.dataframe(store.get("venues"), use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ================= PERFORMANCE =================
+    elif section == "Performance":
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Performance</div>', unsafe_allow_html=True)
+
+        records = read_metrics()
+        stages = pd.DataFrame([r for r in records if r.get("kind") == "stage"])
+        queries = pd.DataFrame([r for r in records if r.get("kind") == "sql"])
+
+        if stages.empty:
+            st.info(f"No metrics recorded yet in {METRICS_PATH}")
+        else:
+            st.subheader("Slowest Stages")
+            slowest = (
+                stages.groupby("name")
+                .agg(runs=("seconds", "size"), avg_seconds=("seconds", "mean"),
+                     max_seconds=("seconds", "max"), rows=("rows", "max"),
+                     bytes=("bytes", "max"), max_rss_mb=("max_rss_mb", "max"),
+                     errors=("error", "count"), last_run=("ts", "max"))
+                .sort_values("avg_seconds", ascending=False)
+                .reset_index()
+            )
+            import plotly.express as px
+            st.plotly_chart(px.bar(slowest.head(15), x="avg_seconds", y="name", orientation="h"),
+                            use_container_width=True)
+            st.dataframe(slowest, use_container_width=True)
+
+        if not queries.empty:
+            st.subheader("Slowest Queries")
+            st.dataframe(
+                queries.groupby(["statement", "stage"])
+                .agg(count=("count", "sum"), total_seconds=("seconds", "sum"),
+                     max_seconds=("max_seconds", "max"))
+                .sort_values("total_seconds", ascending=False)
+                .head(50)
+                .reset_index(),
+                use_container_width=True,
+            )
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ================= ABOUT =================
+    elif section == "About":
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Tennis Game</div>', unsafe_allow_html=True)
+        st.markdown("Tennis is one of the most popular and widely played sports in the world, known for its combination of physical endurance, technical precision, strategic thinking, and mental resilience. It is played by individuals of all ages and skill levels, from recreational players to professional athletes competing on international stages. Tennis can be played in two primary formats: singles, where two players compete against each other, and doubles, where two teams of two players each face off. The objective of the game is to score points by hitting the ball over the net into the opponent’s court in such a way that the opponent cannot return it successfully within the rules. The origins of modern tennis can be traced back to Europe, particularly France and England, where earlier forms of the game were played as early as the twelfth century. Over time, tennis evolved into its current form during the late nineteenth century, with standardized rules, equipment, and court dimensions. The establishment of governing bodies helped regulate the sport globally, ensuring uniform rules, fair play, and structured competition. Today, tennis is governed internationally by professional organizations that oversee tournaments, player rankings, and rule enforcement.Tennis is played on different types of court surfaces, each of which significantly influences gameplay and player strategy. The three primary surfaces are grass, clay, and hard courts. Grass courts are fast-paced and favor players with strong serves and quick reflexes. Clay courts slow down the ball and produce higher bounces, encouraging longer rallies and emphasizing endurance and consistency. Hard courts offer a balanced playing environment, combining elements of speed and bounce that suit a wide range of playing styles. These surface variations make tennis a complex and dynamic sport, where adaptability plays a key role in success. Professional tennis follows a structured tournament system that allows players to compete at various levels throughout the year. Players earn ranking points based on their performance in tournaments, and these points determine their global rankings. Rankings are a critical aspect of professional tennis, as they influence tournament entry, seedings, and qualification for major events. Rankings are not static; they change frequently depending on match outcomes, points earned, and the number of tournaments played. This dynamic nature makes ranking analysis an important area of study in tennis analytics. Tennis tournaments are hosted across the world in a wide range of venues and sports complexes. These complexes often include multiple courts, training facilities, and supporting infrastructure to accommodate players, officials, and spectators. The geographical distribution of tennis venues reflects the global reach of the sport, with strong participation from Europe, the Americas, Asia, and other regions. Understanding the relationship between infrastructure, player representation, and competitive performance provides valuable insights into how tennis develops at national and international levels. In recent years, data analytics has become increasingly important in the sport of tennis. Large volumes of data are generated from matches, rankings, player movements, and tournament participation. This data can be analyzed to evaluate player performance, identify trends, compare competitors, and assess country-wise participation. Coaches, analysts, and sports organizations rely on data-driven insights to make informed decisions related to training, strategy, and player development. Tennis analytics enables the transformation of raw data into meaningful information through structured databases and visualizations. By organizing tennis data into relational databases and applying analytical queries, patterns and trends that are not immediately visible can be uncovered. Interactive dashboards further enhance understanding by allowing users to explore data through filters, charts, and geographic visualizations. These tools make complex tennis data more accessible to analysts, students, and enthusiasts alike. Overall, tennis is not only a sport of athletic excellence but also a domain rich in structured and unstructured data. The integration of tennis data with modern analytics platforms highlights the growing role of technology in sports. Tennis Game Analytics demonstrates how databases, programming, and visualization techniques can be combined to analyze sports data effectively. Through competitor analysis, country-wise insights, leaderboards, and infrastructure exploration, the platform showcases the practical application of data analytics concepts in the context of a globally recognized sport.")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+# ================= CACHE STATS =================
+cache = store.stats()
+figure_cache = figures.stats()
+st.sidebar.caption(
+    f"Data generation {cache['generation']} · cache hits {cache['hits']} · misses {cache['misses']}"
+    f" ({cache['snapshot_loads']} mapped) · figures {figure_cache['figures']} ({figure_cache['hits']} hits)"
+)
@@ -0,0 +1,302 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import pandas as pd
+
+# Process-wide cache of the data app.py shows. Every Streamlit session in the
+# process shares one copy of each frame, loaded the first time a section asks
+# for it. The cache is dropped only when a load has committed new data: the
+# cheap PRAGMA data_version tells us another connection wrote to the file, and
+# db_meta.data_generation (bumped by every ingest) tells us it was a load.
+# A refresh with pipeline.py --swap repoints the competition.current link (see
+# src/scripts/live_db.py); that shows up as a new inode behind the live path,
+# which is looked up again on every check, and the connections are reopened
+# on it.
+# The rankings, venues and complexes frames are mapped from the columnar
+# snapshot the pipeline writes (src/scripts/snapshot.py) when it matches the
+# file and generation being read, so worker processes share their pages;
+# otherwise they are read with SQL like the rest.
+# Entries keyed by parameters (leaderboards, subtrees, explorer counts) can
+# be many within a generation, so the cache keeps at most DATA_CACHE_ENTRIES
+# of them and evicts the least recently used.
+# Frames are shared between sessions, so callers must not modify them in place.
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+CACHE_ENTRIES = int(os.getenv("DATA_CACHE_ENTRIES", "256"))
+
+# Query helpers and instrumentation shared with the ingest scripts
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+from live_db import current_path
+from migrations import data_generation
+from search import match_query
+from hierarchy import ANCESTORS_QUERY, SUBTREE_QUERY
+from leaderboards import leaderboard_query, list_label
+from instrument import stage
+from db_pool import POOL_SIZE, ReadPool
+from snapshot import SNAPSHOT_QUERIES, open_snapshot
+
+def _read_sql(query):
+    return lambda conn: pd.read_sql(query, conn)
+
+
+LOADERS = {
+    # Large frames; read from the columnar snapshot when it is current (snapshot.py)
+    "rankings": _read_sql(SNAPSHOT_QUERIES["rankings"]),
+    "venues": _read_sql(SNAPSHOT_QUERIES["venues"]),
+    "complexes": _read_sql(SNAPSHOT_QUERIES["complexes"]),
+    # Summary tables maintained at ingest (src/scripts/aggregates.py)
+    "kpis": lambda conn: dict(conn.execute("SELECT name, value FROM dashboard_kpis").fetchall()),
+    # iso3 locates the country on the maps (locationmode="ISO-3")
+    "country_stats": _read_sql("""
+        SELECT n.country_name AS country, n.iso3,
+               s.competitors AS Total_Competitors,
+               CAST(s.total_points AS REAL) / s.competitors AS Average_Points
+        FROM country_stats s
+        JOIN countries n ON n.country_key = s.country_key
+        ORDER BY s.competitors DESC
+    """),
+    "venues_per_complex": _read_sql("""
+        SELECT complex_name, SUM(venues) AS Venues
+        FROM complex_venue_counts
+        WHERE venues > 0
+        GROUP BY complex_name
+        ORDER BY Venues DESC
+        LIMIT 15
+    """),
+    "country_venues": _read_sql("""
+        SELECT n.country_name AS country, n.iso3, s.venues AS Venues
+        FROM country_venue_counts s
+        JOIN countries n ON n.country_key = s.country_key
+    """),
+    # Filter widget bounds for the Competitor Explorer
+    "ranking_bounds": lambda conn: conn.execute("""
+        SELECT MAX(rank), MIN(points), MAX(points) FROM competitor_rankings_latest
+    """).fetchone(),
+    # country_key -> name, for the Competitor Explorer's country filter
+    "ranked_countries": lambda conn: dict(conn.execute("""
+        SELECT s.country_key, n.country_name
+        FROM country_stats s
+        JOIN countries n ON n.country_key = s.country_key
+        ORDER BY n.country_name
+    """).fetchall()),
+    # list_key -> label, for the Leaderboards page's list filter
+    "ranking_lists": lambda conn: {
+        key: list_label(name, type_id, gender)
+        for key, name, type_id, gender in conn.execute(
+            "SELECT list_key, name, type_id, gender FROM ranking_lists ORDER BY list_key")
+    },
+    # Roots (no parent row in the closure table) with at least one sub-competition
+    "competition_trees": _read_sql("""
+        SELECT h.ancestor_id AS competition_id, c.competition_name,
+               COUNT(*) - 1 AS sub_competitions, MAX(h.depth) AS levels
+        FROM competition_closure h
+        LEFT JOIN competitions c ON c.competition_id = h.ancestor_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM competition_closure p
+            WHERE p.descendant_id = h.ancestor_id AND p.depth = 1
+        )
+        GROUP BY h.ancestor_id
+        HAVING COUNT(*) > 1
+        ORDER BY sub_competitions DESC, h.ancestor_id
+        LIMIT 100
+    """),
+}
+
+EXPLORER_PAGE_SIZE = 50
+
+EXPLORER_FROM = """
+    FROM competitor_rankings_latest r
+    JOIN competitors c
+    ON r.competitor_id = c.competitor_id
+    LEFT JOIN countries n
+    ON n.country_key = c.country_key
+"""
+
+
+def explorer_filters(rank_range, countries, min_points, search):
+    # WHERE clause and parameters shared by the page and count queries;
+    # countries are country_key values
+    clauses = ["r.rank BETWEEN ? AND ?", "r.points >= ?"]
+    params = [rank_range[0], rank_range[1], min_points]
+    if countries:
+        clauses.append(f"c.country_key IN ({', '.join('?' for _ in countries)})")
+        params.extend(countries)
+    # Name search goes through the FTS5 index (src/scripts/search.py)
+    if search:
+        match = match_query(search)
+        if match is None:
+            clauses.append("0")
+        else:
+            clauses.append(
+                "c.rowid IN (SELECT rowid FROM competitor_search WHERE competitor_search MATCH ?)"
+            )
+            params.append(match)
+    return " AND ".join(clauses), tuple(params)
+
+
+class DataStore:
+    """Loads each dataset once per data generation and shares it."""
+
+    def __init__(self, db_path=None, loaders=LOADERS, pool_size=POOL_SIZE, snapshot=True,
+                 max_entries=CACHE_ENTRIES):
+        # None follows the live database (live_db.py)
+        self._db_path = db_path
+        self.loaders = loaders
+        self.snapshot = snapshot
+        self.max_entries = max_entries
+        self._snapshot = None
+        self.snapshot_loads = 0
+        self.pool = ReadPool(self.db_path, pool_size)
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        # PRAGMA data_version is per connection, so one connection is kept
+        # aside for the staleness check; queries go through the pool
+        self._version_conn = None
+        self._data_version = None
+        self._file_id = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self):
+        return self._db_path or current_path()
+
+    def _refresh_generation(self):
+        db_path = self.db_path
+        stat = os.stat(db_path)
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id:
+            self.pool.db_path = db_path
+            if self._file_id is not None:
+                self.pool.reset()
+                self._version_conn.close()
+                self._version_conn = None
+                self._data_version = None
+            self._file_id = file_id
+
+        if self._version_conn is None:
+            self._version_conn = self.pool.connect()
+        conn = self._version_conn
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+
+        generation = data_generation(conn)
+        if generation != self.generation:
+            if self.generation is not None:
+                self.invalidations += 1
+            self._cache.clear()
+            self.generation = generation
+
+    def current_generation(self):
+        # One PRAGMA data_version read unless a load has committed
+        with self._lock:
+            self._refresh_generation()
+            return self.generation
+
+    def get(self, name, loader=None):
+        return self.versioned(name, loader)[1]
+
+    def versioned(self, name, loader=None):
+        # (data generation, value): the generation the value was read at, for
+        # caches built on top of the frames (figures.py)
+        with self._lock:
+            self._refresh_generation()
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                self.hits += 1
+                return self.generation, self._cache[name]
+            self.misses += 1
+            generation = self.generation
+
+        # Loaded outside the lock so sessions missing different entries read in parallel
+        label = name[0] if isinstance(name, tuple) else name
+        with stage(f"load {label}") as s:
+            value = self._from_snapshot(name, generation) if loader is None else None
+            if value is None:
+                with self.pool.connection() as conn:
+                    value = (loader or self.loaders[name])(conn)
+            s.rows = len(value) if hasattr(value, "__len__") else 1
+
+        with self._lock:
+            # Not cached if a load committed while this one was reading
+            if self.generation == generation:
+                self._cache[name] = value
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+                    self.evictions += 1
+        return generation, value
+
+    def _from_snapshot(self, name, generation):
+        # The frame mapped from the snapshot, or None when there is no
+        # snapshot of this file at this generation
+        if not self.snapshot or name not in SNAPSHOT_QUERIES:
+            return None
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.generation != generation:
+            snapshot = self._snapshot = open_snapshot(self.db_path)
+        if (snapshot is None or snapshot.generation != generation
+                or snapshot.source != os.path.realpath(self.db_path)):
+            return None
+        self.snapshot_loads += 1
+        return snapshot.frame(name)
+
+    def explorer_count(self, filters):
+        # Counts are cached per generation like the frames
+        where, params = filters
+        return self.get(("explorer_count", where, params), lambda conn: conn.execute(
+            f"SELECT COUNT(*) {EXPLORER_FROM} WHERE {where}", params
+        ).fetchone()[0])
+
+    def explorer_page(self, filters, after=None, page_size=EXPLORER_PAGE_SIZE):
+        # Keyset pagination: a page starts after the (rank, competitor_id) that
+        # ended the previous one, so every page costs the same index seek
+        where, params = filters
+        if after is not None:
+            where += " AND (r.rank, r.competitor_id) > (?, ?)"
+            params += tuple(after)
+
+        query = f"""
+            SELECT r.rank, r.movement, r.points, r.competitions_played,
+                   c.name, n.country_name AS country, r.competitor_id
+            {EXPLORER_FROM}
+            WHERE {where}
+            ORDER BY r.rank, r.competitor_id
+            LIMIT ?
+        """
+        with stage("load explorer_page") as s, self.pool.connection() as conn:
+            page = pd.read_sql(query, conn, params=params + (page_size,))
+            s.rows = len(page)
+        return page
+
+    def leaderboard(self, by, list_key, country_key, k):
+        # Top k by "rank" or "points" of one list and/or country (leaderboards.ALL
+        # for every one): a range read on the leaderboard index, cached per generation
+        return self.get(("leaderboard", by, list_key, country_key, k), lambda conn: pd.read_sql(
+            leaderboard_query(by), conn, params=(list_key, country_key, k)))
+
+    def subtree(self, competition_id):
+        return self.get(("subtree", competition_id), lambda conn: pd.read_sql(
+            SUBTREE_QUERY, conn, params=(competition_id,)))
+
+    def ancestors(self, competition_id):
+        return self.get(("ancestors", competition_id), lambda conn: pd.read_sql(
+            ANCESTORS_QUERY, conn, params=(competition_id,)))
+
+    def stats(self):
+        return {
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "snapshot_loads": self.snapshot_loads,
+            "cached": len(self._cache),
+            "pool": self.pool.stats(),
+        }
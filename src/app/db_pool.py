@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from instrument import trace_sql
+
+load_dotenv()
+
+# Read-only SQLite connections shared by the Streamlit session threads.
+# A connection is used by one thread at a time and handed back afterwards,
+# so concurrent sessions read in parallel instead of queueing on a single
+# shared connection. The loads switch the database to WAL mode (bulk_load.py),
+# so readers are not blocked while an ingest is writing.
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ReadPool:
+    """Bounded pool of read-only connections to one database file."""
+
+    def __init__(self, db_path, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = []
+        # Waiting threads in arrival order; a returned connection goes straight
+        # to the oldest one so new arrivals cannot keep jumping the queue
+        self._waiters = deque()
+        self._opened = 0
+        # Bumped by reset(); connections opened in an older epoch are closed on return
+        self._epoch = 0
+        self._born = {}
+        self.resets = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquired = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+        )
+        conn.execute("PRAGMA query_only = ON")
+        # Statements are timed under the app stage (section or loader) running them
+        return trace_sql(conn)
+
+    def _open_pooled(self):
+        # The caller has counted this connection in _opened; give the slot
+        # back if it cannot be opened (the file is missing mid-swap, say)
+        epoch = self._epoch
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+        with self._lock:
+            self._born[conn] = epoch
+        return conn
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle and not self._waiters:
+                return self._idle.pop()
+            if self._opened < self.size:
+                self._opened += 1
+                waiter = None
+            else:
+                waiter = [threading.Event(), None]
+                self._waiters.append(waiter)
+
+        if waiter is None:
+            return self._open_pooled()
+
+        # Every connection is out: wait for one to be handed over
+        start = time.perf_counter()
+        waiter[0].wait(self.timeout)
+        with self._lock:
+            if waiter[1] is None:
+                self._waiters.remove(waiter)
+                raise PoolTimeout(
+                    f"no connection to {self.db_path} free after {self.timeout}s "
+                    f"({self.size} in use)"
+                )
+            waited = time.perf_counter() - start
+            self.waited += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return waiter[1]
+
+    def _release(self, conn):
+        with self._lock:
+            self.in_use -= 1
+            stale = self._born[conn] != self._epoch
+            if stale:
+                del self._born[conn]
+        if stale:
+            conn.close()
+            conn = self._open_pooled()
+
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter[1] = conn
+                waiter[0].set()
+            else:
+                self._idle.append(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        with self._lock:
+            self.acquired += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        # Closes idle connections; ones still checked out are closed by their owner's GC
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            for conn in idle:
+                del self._born[conn]
+        for conn in idle:
+            conn.close()
+
+    def reset(self):
+        # The file at db_path was replaced: drop every connection to the old one
+        with self._lock:
+            self._epoch += 1
+            self.resets += 1
+        self.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "acquired": self.acquired,
+                "resets": self.resets,
+                "waited": self.waited,
+                "avg_wait_ms": round(self.wait_seconds / self.waited * 1000, 2) if self.waited else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            }
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from data_layer import DataStore
+from generation_cache import GenerationCache
+from instrument import stage
+
+load_dotenv()
+
+# Process-wide cache of the Plotly figures app.py draws, shared by every
+# session. A figure is keyed by (chart id, params) within the data
+# generation of the frame it was built from, so a load makes every figure of
+# the previous generation unreachable; they are dropped as soon as the new
+# generation is seen. Entries are evicted least recently used first once
+# their serialized JSON passes FIGURE_CACHE_MB (generation_cache.py).
+# The warm-up thread polls the generation every FIGURE_WARM_INTERVAL seconds
+# and rebuilds the default figures (WARM_CHARTS) as soon as a load commits,
+# so the first page view after a refresh finds them built.
+# The Figure objects are kept rather than their JSON: st.plotly_chart turns
+# a dict back into a validated Figure on every render, which costs about as
+# much as building the smaller charts again.
+# plotly.express is imported by the first build rather than with this
+# module, so pages without charts never load it.
+# Figures are shared between sessions, so callers must not modify them.
+
+CACHE_MB = float(os.getenv("FIGURE_CACHE_MB", "64"))
+# 0 turns the warm-up thread off
+WARM_INTERVAL = float(os.getenv("FIGURE_WARM_INTERVAL", "5"))
+
+
+def dashboard_countries(stats):
+    return stats[["country", "Total_Competitors"]].rename(
+        columns={"country": "Country", "Total_Competitors": "Competitors"})
+
+
+# chart id -> (dataset in data_layer.LOADERS, builder(px, frame, **params))
+CHARTS = {
+    "dashboard_competitors_bar": ("country_stats", lambda px, stats, top=15: px.bar(
+        dashboard_countries(stats).head(top),
+        x="Country", y="Competitors",
+        color="Competitors",
+        template="plotly_dark")),
+    "dashboard_competitors_pie": ("country_stats", lambda px, stats, top=8: px.pie(
+        dashboard_countries(stats).head(top),
+        names="Country",
+        values="Competitors",
+        hole=0.5,
+        template="plotly_dark")),
+    "country_competitors_bar": ("country_stats", lambda px, stats, top=15: px.bar(
+        stats.head(top),
+        x="country", y="Total_Competitors",
+        template="plotly_dark")),
+    "country_points_scatter": ("country_stats", lambda px, stats: px.scatter(
+        stats,
+        x="Total_Competitors",
+        y="Average_Points",
+        size="Average_Points",
+        color="country",
+        template="plotly_dark")),
+    "country_competitors_map": ("country_stats", lambda px, stats: px.choropleth(
+        stats,
+        locations="iso3",
+        locationmode="ISO-3",
+        hover_name="country",
+        color="Total_Competitors",
+        color_continuous_scale="Oranges",
+        title="Global Tennis Competitor Distribution")),
+    "complex_venues_bar": ("venues_per_complex", lambda px, venues_per_complex: px.bar(
+        venues_per_complex,
+        x="complex_name", y="Venues",
+        template="plotly_dark")),
+    "country_venues_pie": ("country_venues", lambda px, country_venues: px.pie(
+        country_venues,
+        names="country",
+        values="Venues",
+        hole=0.45,
+        template="plotly_dark")),
+    "country_venues_map": ("country_venues", lambda px, country_venues: px.choropleth(
+        country_venues,
+        locations="iso3",
+        locationmode="ISO-3",
+        hover_name="country",
+        color="Venues",
+        color_continuous_scale="Oranges",
+        title="Global Tennis Infrastructure")),
+}
+
+# Every chart with its default parameters is drawn on first paint
+WARM_CHARTS = list(CHARTS)
+
+
+class FigureCache:
+    """LRU of built figures per data generation, capped by serialized size."""
+
+    def __init__(self, store, charts=CHARTS, max_bytes=int(CACHE_MB * 1e6)):
+        self.store = store
+        self.charts = charts
+        self.warmed = 0
+        # (chart id, params) -> figure, for the generation of the frames
+        self._figures = GenerationCache(max_bytes)
+        self._lock = threading.Lock()
+        self._warm_thread = None
+
+    def get(self, chart_id, **params):
+        dataset, build = self.charts[chart_id]
+        # The frame comes from the DataStore cache; its generation keys the figure
+        generation, frame = self.store.versioned(dataset)
+
+        def build_figure():
+            import plotly.express as px
+            import plotly.io as pio
+            with stage(f"figure {chart_id}") as s:
+                figure = build(px, frame, **params)
+                # What the browser receives; the cap is on these bytes
+                s.bytes = len(pio.to_json(figure, validate=False))
+            return figure, s.bytes
+
+        return self._figures.get(generation, (chart_id, tuple(sorted(params.items()))), build_figure)
+
+    def warm(self, chart_ids=WARM_CHARTS):
+        for chart_id in chart_ids:
+            self.get(chart_id)
+        self.warmed += 1
+
+    def start_warming(self, interval=WARM_INTERVAL):
+        # Background thread: rebuilds the defaults whenever the generation moves.
+        # app.py calls this from the sections that draw charts; the first call
+        # starts the thread
+        def run():
+            warmed_generation = None
+            while True:
+                try:
+                    generation = self.store.current_generation()
+                    if generation != warmed_generation:
+                        with stage("warm figures", generation=generation):
+                            self.warm()
+                        warmed_generation = generation
+                except Exception as e:
+                    # A swap or a load in progress; try again on the next tick
+                    print(f"Figure warm-up failed: {e}")
+                time.sleep(interval)
+
+        with self._lock:
+            if not interval or self._warm_thread is not None:
+                return
+            self._warm_thread = threading.Thread(target=run, name="figure-warmup", daemon=True)
+        self._warm_thread.start()
+
+    def stats(self):
+        stats = self._figures.stats()
+        return {"figures": stats.pop("entries"), **stats, "warmed": self.warmed}
+
+
+if __name__ == "__main__":
+    # Build time and size of every default figure, then the cached lookup
+    cache = FigureCache(DataStore())
+    for chart_id in WARM_CHARTS:
+        start = time.perf_counter()
+        cache.get(chart_id)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        cache.get(chart_id)
+        cached = time.perf_counter() - start
+        print(f"{chart_id:<28} built {built * 1000:8.1f} ms   cached {cached * 1000:6.3f} ms   "
+              f"{cache._figures.size_of((chart_id, ())):>8} B")
+    print("✅", cache.stats())
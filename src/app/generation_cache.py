@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+
+# Size-capped LRU for values built from one data generation, shared by the
+# figure cache (figures.py) and the API's response cache (api.py). Only the
+# newest generation seen is kept: the first lookup for a new one drops every
+# entry of the old. Concurrent lookups of a key that is not built yet wait
+# for one build instead of each running it. Values are shared between
+# threads, so callers must not modify them.
+
+
+class GenerationCache:
+    """LRU of values for the current data generation, capped by their size."""
+
+    def __init__(self, max_bytes, current_generation=None):
+        self.max_bytes = max_bytes
+        # When given, a value is only kept if its generation is still the
+        # current one once it is built (a load may commit during the build)
+        self.current_generation = current_generation
+        self.generation = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (value, size)
+        self._entries = OrderedDict()
+        # (generation, key) being built -> Event set when the build is done
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def _drop_old_generations(self, generation):
+        # Called with the lock held
+        self.generation = generation
+        self._entries.clear()
+        self.bytes = 0
+
+    def get(self, generation, key, build):
+        # build() returns (value, size in bytes)
+        while True:
+            with self._lock:
+                if generation != self.generation:
+                    self._drop_old_generations(generation)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                building = self._building.get((generation, key))
+                if building is None:
+                    self.misses += 1
+                    building = self._building[(generation, key)] = threading.Event()
+                    break
+            building.wait()
+
+        try:
+            value, size = build()
+            if self.current_generation is None or self.current_generation() == generation:
+                self._put(generation, key, value, size)
+        finally:
+            with self._lock:
+                del self._building[(generation, key)]
+            building.set()
+        return value
+
+    def _put(self, generation, key, value, size):
+        with self._lock:
+            if generation != self.generation or size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def size_of(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "generation": self.generation,
+                "entries": len(self._entries),
+                "mb": round(self.bytes / 1e6, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
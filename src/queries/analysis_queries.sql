@@ -46,15 +46,20 @@ JOIN competitions child
     ON parent.competition_id = child.parent_id
 ORDER BY parent_competition;
 
+-- Counted per category id in index order, then merged by name (names may repeat)
 -- Analyze distribution of competition types by category 
 SELECT 
     cat.category_name,
-    comp.type,
-    COUNT(*) AS total_competitions
-FROM competitions comp
+    t.type,
+    SUM(t.competitions) AS total_competitions
+FROM (
+    SELECT category_id, type, COUNT(*) AS competitions
+    FROM competitions
+    GROUP BY category_id, type
+) t
 JOIN categories cat
-    ON comp.category_id = cat.category_id
-GROUP BY cat.category_name, comp.type
+    ON t.category_id = cat.category_id
+GROUP BY cat.category_name, t.type
 ORDER BY cat.category_name, total_competitions DESC;
 
 -- List all competitions with no parent 
@@ -66,34 +71,57 @@ SELECT
 FROM competitions
 WHERE parent_id IS NULL;
 
+-- Every sub-competition of a competition at any depth (closure table)
+SELECT
+    h.descendant_id AS competition_id,
+    c.competition_name,
+    h.depth
+FROM competition_closure h
+LEFT JOIN competitions c
+    ON c.competition_id = h.descendant_id
+WHERE h.ancestor_id = 'sr:competition:3'
+ORDER BY h.depth, h.descendant_id;
+
+-- Path from the root competition down to a competition
+SELECT
+    h.ancestor_id AS competition_id,
+    c.competition_name,
+    h.depth
+FROM competition_closure h
+LEFT JOIN competitions c
+    ON c.competition_id = h.ancestor_id
+WHERE h.descendant_id = 'sr:competition:3'
+ORDER BY h.depth DESC;
+
 -- Competitors and Rankings Module
 -- All competitors with rank & points
 SELECT c.name, r.rank, r.points
 FROM competitors c
-JOIN competitor_rankings r
+JOIN competitor_rankings_latest r
 ON c.competitor_id = r.competitor_id;
 
 -- Top 5 competitors
 SELECT c.name, r.rank, r.points
 FROM competitors c
-JOIN competitor_rankings r
+JOIN competitor_rankings_latest r
 ON c.competitor_id = r.competitor_id
-ORDER BY r.rank
+ORDER BY r.rank, r.competitor_id
 LIMIT 5;
 
 -- Stable rank (no movement)
 SELECT c.name, r.rank
 FROM competitors c
-JOIN competitor_rankings r
+JOIN competitor_rankings_latest r
 ON c.competitor_id = r.competitor_id
 WHERE r.movement = 0;
 
 -- Total points by country
 SELECT c.country, SUM(r.points) AS total_points
 FROM competitors c
-JOIN competitor_rankings r
+JOIN competitor_rankings_latest r
 ON c.competitor_id = r.competitor_id
-WHERE c.country = 'Croatia';
+WHERE c.country = 'Croatia'
+GROUP BY c.country;
 
 -- Competitors per country
 SELECT country, COUNT(*) AS competitor_count
@@ -103,11 +131,25 @@ GROUP BY country;
 -- Highest points scorer (current week)
 SELECT c.name, r.points
 FROM competitors c
-JOIN competitor_rankings r
+JOIN competitor_rankings_latest r
 ON c.competitor_id = r.competitor_id
 ORDER BY r.points DESC
 LIMIT 1;
 
+-- Rankings as of a date (latest snapshot generated on or before it)
+SELECT c.name, r.rank, r.points
+FROM competitors c
+JOIN competitor_rankings r
+ON c.competitor_id = r.competitor_id
+WHERE r.snapshot_id <= (
+    SELECT MAX(snapshot_id) FROM ranking_snapshots
+    WHERE COALESCE(generated_at, ingested_at) <= '2026-01-31'
+)
+AND (r.valid_to IS NULL OR r.valid_to > (
+    SELECT MAX(snapshot_id) FROM ranking_snapshots
+    WHERE COALESCE(generated_at, ingested_at) <= '2026-01-31'
+));
+
 -- Complexes and Venues Module
 -- Venues per complex
 SELECT complex_name, COUNT(v.venue_id)
@@ -1,49 +1,242 @@
--- Categorires and Competition Schema
-CREATE TABLE IF NOT EXISTS categories (
+-- Generated by src/scripts/migrations.py --dump (schema version 16)
+-- Edit MIGRATIONS in migrations.py, not this file.
+
+CREATE TABLE categories (
     category_id TEXT PRIMARY KEY,
-    category_name TEXT NOT NULL
+    category_name TEXT NOT NULL,
+    fingerprint TEXT
 );
 
-CREATE TABLE IF NOT EXISTS competitions (
+CREATE TABLE competitions (
     competition_id TEXT PRIMARY KEY,
     competition_name TEXT NOT NULL,
     parent_id TEXT,
     type TEXT,
     gender TEXT,
     category_id TEXT,
+    fingerprint TEXT,
     FOREIGN KEY (category_id) REFERENCES categories(category_id)
 );
 
--- Competitor and Competitor Rankings Schema
-CREATE TABLE IF NOT EXISTS competitors (
+CREATE TABLE competitors (
     competitor_id VARCHAR(50) PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     country VARCHAR(100) NOT NULL,
     country_code CHAR(3) NOT NULL,
-    abbreviation VARCHAR(100) NOT NULL
+    abbreviation VARCHAR(100) NOT NULL,
+    country_key INTEGER REFERENCES countries(country_key)
 );
 
-CREATE TABLE IF NOT EXISTS competitor_rankings (
-    rank_id INT PRIMARY KEY AUTOINCREMENT,
+CREATE TABLE competitor_rankings (
+    rank_id INTEGER PRIMARY KEY AUTOINCREMENT,
     rank INT NOT NULL,
     movement INT NOT NULL,
     points INT NOT NULL,
     competitions_played INT NOT NULL,
     competitor_id VARCHAR(50) NOT NULL,
+    snapshot_id INT REFERENCES ranking_snapshots(snapshot_id),
+    valid_to INT REFERENCES ranking_snapshots(snapshot_id),
+    list_key INTEGER REFERENCES ranking_lists(list_key),
     FOREIGN KEY (competitor_id) REFERENCES competitors(competitor_id)
 );
 
--- Complexes and Venues Schema
-CREATE TABLE IF NOT EXISTS complexes (
+CREATE TABLE complexes (
     complex_id TEXT PRIMARY KEY,
     complex_name TEXT,
     country TEXT,
-    timezone TEXT
+    timezone TEXT,
+    fingerprint TEXT,
+    country_key INTEGER REFERENCES countries(country_key)
 );
 
-CREATE TABLE IF NOT EXISTS venues (
+CREATE TABLE venues (
     venue_id TEXT PRIMARY KEY,
     venue_name TEXT,
     complex_id TEXT,
+    fingerprint TEXT,
     FOREIGN KEY (complex_id) REFERENCES complexes(complex_id)
 );
+
+CREATE TABLE ranking_snapshots (
+    snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    generated_at TEXT,
+    ingested_at TEXT NOT NULL,
+    rows_seen INT NOT NULL DEFAULT 0,
+    rows_changed INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE pipeline_state (
+    stage TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    completed_at TEXT NOT NULL
+);
+
+CREATE TABLE db_meta (
+    key TEXT PRIMARY KEY,
+    value INT NOT NULL
+);
+
+CREATE VIRTUAL TABLE competitor_search USING fts5(
+    name,
+    abbreviation,
+    country,
+    content='competitors',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE TABLE competition_closure (
+    ancestor_id TEXT NOT NULL,
+    descendant_id TEXT NOT NULL,
+    depth INT NOT NULL,
+    PRIMARY KEY (ancestor_id, depth, descendant_id)
+) WITHOUT ROWID;
+
+CREATE TABLE tombstones (
+    table_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT,
+    deleted_at TEXT NOT NULL,
+    PRIMARY KEY (table_name, key)
+);
+
+CREATE TABLE countries (
+    country_key INTEGER PRIMARY KEY,
+    country_code TEXT NOT NULL UNIQUE,
+    country_name TEXT NOT NULL,
+    iso3 TEXT NOT NULL
+);
+
+CREATE TABLE country_stats (
+    country_key INTEGER PRIMARY KEY,
+    competitors INT NOT NULL,
+    total_points INT NOT NULL,
+    max_points INT NOT NULL
+);
+
+CREATE TABLE complex_venue_counts (
+    complex_id TEXT PRIMARY KEY,
+    complex_name TEXT,
+    country_key INT,
+    venues INT NOT NULL
+);
+
+CREATE TABLE country_venue_counts (
+    country_key INTEGER PRIMARY KEY,
+    venues INT NOT NULL
+);
+
+CREATE TABLE dashboard_kpis (
+    name TEXT PRIMARY KEY,
+    value INT
+);
+
+CREATE TABLE detail_payloads (
+    endpoint TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    status INT NOT NULL,
+    body TEXT,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (endpoint, entity_id)
+) WITHOUT ROWID;
+
+CREATE TABLE detail_failures (
+    endpoint TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    attempts INT NOT NULL,
+    error TEXT,
+    failed_at TEXT NOT NULL,
+    PRIMARY KEY (endpoint, entity_id)
+) WITHOUT ROWID;
+
+CREATE TABLE ranking_lists (
+    list_key INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    type_id INT,
+    gender TEXT,
+    UNIQUE (name, type_id, gender)
+);
+
+CREATE TABLE leaderboard (
+    competitor_id TEXT NOT NULL,
+    rank_id INT NOT NULL,
+    list_key INT NOT NULL,
+    country_key INT NOT NULL,
+    rank INT NOT NULL,
+    points INT NOT NULL,
+    PRIMARY KEY (competitor_id, rank_id, list_key, country_key)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_competitions_category
+ON competitions(category_id, type);
+
+CREATE INDEX idx_competitions_parent
+ON competitions(parent_id);
+
+CREATE INDEX idx_competitions_type
+ON competitions(type);
+
+CREATE INDEX idx_competitions_name
+ON competitions(competition_name);
+
+CREATE INDEX idx_competitors_country
+ON competitors(country);
+
+CREATE INDEX idx_rankings_current_cover
+ON competitor_rankings(competitor_id, rank, points, movement, competitions_played)
+WHERE valid_to IS NULL;
+
+CREATE INDEX idx_rankings_current_points
+ON competitor_rankings(points)
+WHERE valid_to IS NULL;
+
+CREATE INDEX idx_rankings_current_movement
+ON competitor_rankings(movement, rank)
+WHERE valid_to IS NULL;
+
+CREATE INDEX idx_rankings_snapshot
+ON competitor_rankings(snapshot_id, valid_to);
+
+CREATE INDEX idx_complexes_name
+ON complexes(complex_name, complex_id);
+
+CREATE INDEX idx_complexes_country
+ON complexes(country, complex_id);
+
+CREATE INDEX idx_complexes_timezone
+ON complexes(timezone);
+
+CREATE INDEX idx_venues_complex
+ON venues(complex_id, venue_id);
+
+CREATE INDEX idx_rankings_current_rank
+ON competitor_rankings(rank, competitor_id, points)
+WHERE valid_to IS NULL;
+
+CREATE INDEX idx_closure_descendant
+ON competition_closure(descendant_id, depth, ancestor_id);
+
+CREATE INDEX idx_competitors_country_key
+ON competitors(country_key);
+
+CREATE INDEX idx_complexes_country_key
+ON complexes(country_key, complex_id);
+
+CREATE UNIQUE INDEX idx_rankings_current
+ON competitor_rankings(competitor_id, list_key)
+WHERE valid_to IS NULL;
+
+CREATE INDEX idx_leaderboard_rank
+ON leaderboard(list_key, country_key, rank, competitor_id);
+
+CREATE INDEX idx_leaderboard_points
+ON leaderboard(list_key, country_key, points DESC, competitor_id);
+
+CREATE INDEX idx_categories_name
+ON categories(category_name);
+
+CREATE VIEW competitor_rankings_latest AS
+SELECT rank_id, rank, movement, points, competitions_played, competitor_id, snapshot_id, list_key
+FROM competitor_rankings
+WHERE valid_to IS NULL;
@@ -0,0 +1,134 @@
+# Summary tables behind the dashboard's KPI, country and infrastructure
+# views. Ingest refreshes only the keys a load touched; the app reads these
+# few rows instead of aggregating the raw tables on every rerun. Countries are
+# grouped by country_key (countries.py).
+
+SUMMARY_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS country_stats (
+        country_key INTEGER PRIMARY KEY,
+        competitors INT NOT NULL,
+        total_points INT NOT NULL,
+        max_points INT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS complex_venue_counts (
+        complex_id TEXT PRIMARY KEY,
+        complex_name TEXT,
+        country_key INT,
+        venues INT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS country_venue_counts (
+        country_key INTEGER PRIMARY KEY,
+        venues INT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_kpis (
+        name TEXT PRIMARY KEY,
+        value INT
+    )
+    """,
+]
+
+
+def create_summary_tables(conn):
+    # Migration step 5. The tables are filled by rebuild_summary_tables()
+    # once country keys exist (migration 11)
+    for statement in SUMMARY_TABLES:
+        conn.execute(statement)
+
+
+def rebuild_summary_tables(conn):
+    for table in ("country_stats", "complex_venue_counts", "country_venue_counts", "dashboard_kpis"):
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+    create_summary_tables(conn)
+    refresh_country_stats(conn)
+    refresh_venue_counts(conn)
+    refresh_kpis(conn)
+
+
+def _keys(conn, name, keys):
+    # Temp table of the keys to recompute; None means every key
+    conn.execute(f"DROP TABLE IF EXISTS temp.{name}")
+    if keys is None:
+        return ""
+    # Untyped, so text ids and integer keys are both compared as given
+    conn.execute(f"CREATE TEMP TABLE {name} (key PRIMARY KEY)")
+    conn.executemany(f"INSERT OR IGNORE INTO temp.{name} VALUES (?)", ((k,) for k in keys))
+    return f"IN (SELECT key FROM temp.{name})"
+
+
+def refresh_country_stats(conn, countries=None):
+    # A competitor ranked in several lists counts once; their points all add up
+    match = _keys(conn, "touched_countries", countries)
+
+    conn.execute(f"DELETE FROM country_stats {'WHERE country_key ' + match if match else ''}")
+    conn.execute(
+        f"""
+        INSERT INTO country_stats (country_key, competitors, total_points, max_points)
+        SELECT c.country_key, COUNT(DISTINCT r.competitor_id), SUM(r.points), MAX(r.points)
+        FROM competitor_rankings_latest r
+        JOIN competitors c ON c.competitor_id = r.competitor_id
+        WHERE c.country_key IS NOT NULL {'AND c.country_key ' + match if match else ''}
+        GROUP BY c.country_key
+        """
+    )
+
+
+def refresh_venue_counts(conn, complex_ids=None):
+    match = _keys(conn, "touched_complexes", complex_ids)
+
+    # A complex may have moved country: recompute its old and new country
+    country_match = ""
+    if match:
+        countries = [row[0] for row in conn.execute(
+            f"""
+            SELECT country_key FROM complex_venue_counts WHERE complex_id {match}
+            UNION
+            SELECT country_key FROM complexes WHERE complex_id {match}
+            """
+        )]
+        country_match = _keys(conn, "touched_venue_countries", countries)
+
+    conn.execute(f"DELETE FROM complex_venue_counts {'WHERE complex_id ' + match if match else ''}")
+    conn.execute(
+        f"""
+        INSERT INTO complex_venue_counts (complex_id, complex_name, country_key, venues)
+        SELECT c.complex_id, c.complex_name, c.country_key, COUNT(v.venue_id)
+        FROM complexes c
+        LEFT JOIN venues v ON v.complex_id = c.complex_id
+        {'WHERE c.complex_id ' + match if match else ''}
+        GROUP BY c.complex_id
+        """
+    )
+
+    conn.execute(f"DELETE FROM country_venue_counts {'WHERE country_key ' + country_match if match else ''}")
+    conn.execute(
+        f"""
+        INSERT INTO country_venue_counts (country_key, venues)
+        SELECT country_key, SUM(venues)
+        FROM complex_venue_counts
+        WHERE country_key IS NOT NULL {'AND country_key ' + country_match if match else ''}
+        GROUP BY country_key
+        HAVING SUM(venues) > 0
+        """
+    )
+
+
+def refresh_kpis(conn):
+    # Computed from the summary tables, so this reads a handful of rows
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO dashboard_kpis (name, value)
+        SELECT 'total_competitors', COALESCE(SUM(competitors), 0) FROM country_stats
+        UNION ALL SELECT 'countries_represented', COUNT(*) FROM country_stats
+        UNION ALL SELECT 'highest_points', MAX(max_points) FROM country_stats
+        UNION ALL SELECT 'total_complexes', COUNT(*) FROM complex_venue_counts
+        UNION ALL SELECT 'total_venues', COALESCE(SUM(venues), 0) FROM complex_venue_counts
+        UNION ALL SELECT 'countries_with_venues', COUNT(*) FROM country_venue_counts
+        """
+    )
@@ -0,0 +1,85 @@
+import argparse
+import sqlite3
+from leaderboards import RankingLists, refresh_leaderboard
+from migrations import migrate
+from instrument import trace_sql
+from live_db import current_path
+
+# Gives rankings stored before ranking_lists existed (migration 13) their
+# list. The feed sends one list after another, each starting again at rank
+# 1, and the rows of a snapshot were stored in feed order, so a snapshot's
+# rows without a list split into runs wherever the rank goes back down. The
+# runs are given the lists named on the command line, in feed order:
+#   python backfill_ranking_lists.py "ATP Doubles:3:men" "WTA Doubles:4:women"
+# A snapshot that does not split into exactly that many runs is left alone.
+# The journal mode is not touched, so the tracked file stays in rollback mode.
+
+
+def parse_list(value):
+    name, type_id, gender = value.rsplit(":", 2)
+    return name, int(type_id) if type_id else None, gender or None
+
+
+def runs(rows):
+    # rows: (rank_id, rank) in rank_id order
+    current, previous = [], None
+    for rank_id, rank in rows:
+        if previous is not None and rank < previous:
+            yield current
+            current = []
+        current.append(rank_id)
+        previous = rank
+    if current:
+        yield current
+
+
+def backfill(conn, lists):
+    ranking_lists = RankingLists(conn)
+    keys = [ranking_lists.key(*identity) for identity in lists]
+    filled = 0
+    snapshots = [row[0] for row in conn.execute(
+        "SELECT DISTINCT snapshot_id FROM competitor_rankings WHERE list_key IS NULL ORDER BY 1")]
+    for snapshot_id in snapshots:
+        found = list(runs(conn.execute(
+            """
+            SELECT rank_id, rank FROM competitor_rankings
+            WHERE snapshot_id = ? AND list_key IS NULL ORDER BY rank_id
+            """,
+            (snapshot_id,),
+        )))
+        if len(found) != len(keys):
+            print(f"Snapshot {snapshot_id}: {len(found)} runs for {len(keys)} lists, skipped")
+            continue
+        for key, rank_ids in zip(keys, found):
+            conn.executemany(
+                "UPDATE competitor_rankings SET list_key = ? WHERE rank_id = ?",
+                ((key, rank_id) for rank_id in rank_ids),
+            )
+            filled += len(rank_ids)
+    return filled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("lists", nargs="+", type=parse_list, help="name:type_id:gender, in feed order")
+    parser.add_argument("--db", default=current_path())
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    trace_sql(conn)
+    migrate(conn)
+    conn.execute("BEGIN")
+    try:
+        filled = backfill(conn, args.lists)
+        if filled:
+            refresh_leaderboard(conn)
+            # Tells readers (src/app/data_layer.py) that cached data is stale
+            conn.execute("UPDATE db_meta SET value = value + 1 WHERE key = 'data_generation'")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    print(f"✅ {filled} rankings given a list in", args.db)
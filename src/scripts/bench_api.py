@@ -0,0 +1,177 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+# Kept out of the metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+
+from check_query_plans import build_synthetic
+from live_db import current_path
+
+# Load test for the JSON API (src/app/api.py) on the SQLite backend. The
+# server runs in its own process on a copy of the database (or on the
+# synthetic one with --scale); N clients on keep-alive connections request a
+# mix of leaderboards, country pages, searches and named queries:
+#   cold         every URL once, built from the database
+#   cached       random URLs with Accept-Encoding: gzip, served from the cache
+#   revalidated  the same with If-None-Match, answered 304
+#   after load   every URL once with If-None-Match after data_generation is
+#                bumped: rebuilt, and no ETag may still match
+#   python bench_api.py --clients 16 --requests 500
+#   python bench_api.py --scale 1
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+API_PATH = os.path.join(BASE_DIR, "..", "app", "api.py")
+SEARCHES = ["mar", "nad", "ser", "wil", "ann", "kar", "pet", "lee", "ale", "dav"]
+
+
+def workload(conn, host, port):
+    countries = [row[0] for row in conn.execute(
+        "SELECT iso3 FROM countries WHERE iso3 IS NOT NULL ORDER BY country_key LIMIT 20")]
+    urls = ["/", "/queries"]
+    for by in ("rank", "points"):
+        for limit in (10, 100):
+            urls.append(f"/leaderboard?by={by}&limit={limit}")
+        urls.extend(f"/leaderboard?by={by}&country={iso3}" for iso3 in countries)
+    urls.extend(f"/countries?page={page}&per_page=10" for page in (1, 2))
+    urls.extend(f"/competitors/search?q={quote(word)}" for word in SEARCHES)
+    # The named queries as the server lists them
+    listing = http.client.HTTPConnection(host, port, timeout=60)
+    listing.request("GET", "/queries")
+    urls.extend(f"{row['url']}?per_page=100" for row in json.loads(listing.getresponse().read())["rows"])
+    listing.close()
+    return urls
+
+
+def start_server(db_path):
+    process = subprocess.Popen(
+        [sys.executable, API_PATH, "--db", db_path, "--port", "0", "--backend", "sqlite"],
+        stdout=subprocess.PIPE, text=True,
+    )
+    line = process.stdout.readline()
+    if "http://" not in line:
+        process.kill()
+        raise SystemExit(f"API did not start: {line!r}")
+    address = line.split("http://")[1].split("/")[0]
+    host, port = address.rsplit(":", 1)
+    return process, host, int(port)
+
+
+def run_phase(host, port, urls, clients, requests, etags=None, seed=0):
+    # Each client keeps one connection open; returns the phase's numbers
+    latencies = []
+    statuses = {}
+    sent = [0]
+    lock = threading.Lock()
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        mine = urls[index::clients] if requests is None else [rng.choice(urls) for _ in range(requests)]
+        for url in mine:
+            headers = {"Accept-Encoding": "gzip"}
+            if etags is not None:
+                headers["If-None-Match"] = etags[url]
+            start = time.perf_counter()
+            conn.request("GET", url, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+                sent[0] += len(body)
+        conn.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000,
+        "statuses": statuses,
+        "mb": sent[0] / 1e6,
+    }
+
+
+def fetch(host, port, url, etag=None):
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    conn.request("GET", url, headers={"If-None-Match": etag} if etag else {})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.status, response.getheader("ETag")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=current_path())
+    parser.add_argument("--scale", type=float, help="run on the synthetic database instead")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="per client, in the cached phases")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The simulated load must not touch the real database
+        db_path = os.path.join(tmp, "api.db")
+        if args.scale:
+            conn = sqlite3.connect(db_path, isolation_level=None)
+            build_synthetic(conn, args.scale)
+            conn.close()
+        else:
+            shutil.copy(args.db, db_path)
+        conn = sqlite3.connect(db_path, isolation_level=None)
+
+        process, host, port = start_server(db_path)
+        try:
+            urls = workload(conn, host, port)
+            results = [("cold", run_phase(host, port, urls, args.clients, None))]
+            # URLs that do not answer 200 (an empty table on the synthetic
+            # database has no page 2) are left out of the cached phases
+            answers = {url: fetch(host, port, url) for url in urls}
+            etags = {url: etag for url, (status, etag) in answers.items() if status == 200}
+            skipped = len(urls) - len(etags)
+            urls = list(etags)
+            results.append(("cached", run_phase(host, port, urls, args.clients, args.requests, seed=1)))
+            results.append(("revalidated", run_phase(host, port, urls, args.clients, args.requests, etags, seed=2)))
+
+            # A load commits: every URL is built again and none may still
+            # match the ETag the client holds
+            conn.execute("UPDATE db_meta SET value = value + 1 WHERE key = 'data_generation'")
+            results.append(("after load", run_phase(host, port, urls, args.clients, None, etags, seed=3)))
+            stale = results[-1][1]["statuses"].get(304, 0)
+        finally:
+            process.terminate()
+            process.wait()
+            conn.close()
+
+    print(f"{len(urls)} URLs ({skipped} without a 200 left out), {args.clients} clients, SQLite backend\n")
+    print(f"{'phase':<12} {'requests':>8} {'req/s':>9} {'p50':>9} {'p99':>9} {'MB sent':>8}  statuses")
+    for name, r in results:
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(r["statuses"].items()))
+        print(f"{name:<12} {r['requests']:>8} {r['per_s']:9.1f} {r['p50_ms']:7.2f}ms {r['p99_ms']:7.2f}ms "
+              f"{r['mb']:8.2f}  {statuses}")
+    if stale:
+        raise SystemExit(f"❌ {stale} URLs still answered 304 after the data generation moved")
+    print("\n✅ Load test finished; every ETag changed after the load")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+# Kept out of the metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+
+from check_query_plans import build_synthetic
+from named_queries import load_queries
+from query_backend import DuckDBBackend, SQLiteBackend
+
+# Times every query in analysis_queries.sql on SQLite and on DuckDB against
+# the large synthetic database (check_query_plans.build_synthetic: five
+# ranking rows of history per competitor). Best of --repeat runs each, after
+# one untimed run; the DuckDB export is timed separately.
+#   python bench_backends.py --scale 2 --repeat 5
+
+
+def timed(fn, repeat):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiplier for the synthetic row counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0,
+                        help="DuckDB threads (0 = one per core)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        start = time.perf_counter()
+        build_synthetic(conn, args.scale)
+        rankings = conn.execute("SELECT COUNT(*) FROM competitor_rankings").fetchone()[0]
+        conn.close()
+        print(f"Synthetic database with {rankings} ranking rows built in {time.perf_counter() - start:.1f}s")
+
+        sqlite_backend = SQLiteBackend(db_path)
+        start = time.perf_counter()
+        duckdb_backend = DuckDBBackend(db_path, threads=args.threads)
+        export = time.perf_counter() - start
+        threads = duckdb_backend.conn.execute("SELECT current_setting('threads')").fetchone()[0]
+
+        results = []
+        for name, sql in load_queries():
+            results.append((
+                name,
+                timed(lambda: sqlite_backend.query(sql), args.repeat),
+                timed(lambda: duckdb_backend.query(sql), args.repeat),
+            ))
+        sqlite_backend.close()
+        duckdb_backend.close()
+
+    width = max(len(name) for name, _, _ in results)
+    print(f"\n{'query':<{width}} {'sqlite':>10} {'duckdb':>10} {'speedup':>8}")
+    for name, sqlite_seconds, duckdb_seconds in results:
+        print(f"{name:<{width}} {sqlite_seconds * 1000:8.1f}ms {duckdb_seconds * 1000:8.1f}ms "
+              f"{sqlite_seconds / duckdb_seconds:7.2f}x")
+
+    sqlite_total = sum(r[1] for r in results)
+    duckdb_total = sum(r[2] for r in results)
+    print(f"{'total':<{width}} {sqlite_total * 1000:8.1f}ms {duckdb_total * 1000:8.1f}ms "
+          f"{sqlite_total / duckdb_total:7.2f}x")
+    print(f"\nDuckDB export: {export:.2f}s, {threads} threads")
+    print("✅ Backend benchmark finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Kept out of the metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+
+from fetch_details import DetailFetcher, PayloadWriter
+from migrations import migrate
+
+# Exercises fetch_details.py against a local stand-in for the per-id detail
+# endpoints that enforces a per-key quota of QPS requests per second and
+# answers 429 past it. The first run is cut off partway, like a crash, and
+# keeps only what it committed; the second run has to finish the rest
+# without asking again for any id the first run stored.
+#   python bench_fetch_details.py
+
+QPS = 25
+IDS = [f"sr:competitor:{i}" for i in range(1, 151)]
+MISSING = {i for i in IDS if int(i.rsplit(":", 1)[1]) % 17 == 0}
+FLAKY = {i for i in IDS if int(i.rsplit(":", 1)[1]) % 11 == 0}
+BROKEN = "sr:competitor:7"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    # Token bucket per api_key, with one request of slack for network jitter
+    buckets = {}
+    requests = Counter()
+    throttled = 0
+    flaky_left = set(FLAKY)
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=b""):
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        elif status == 503:
+            # The HTTP-date form, which is just as valid
+            self.send_header("Retry-After", formatdate(time.time(), usegmt=True))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def allowed(self, key):
+        cls = StandInHandler
+        current = time.monotonic()
+        tokens, updated = cls.buckets.get(key, (2.0, current))
+        tokens = min(2.0, tokens + (current - updated) * QPS)
+        if tokens < 1:
+            cls.buckets[key] = (tokens, current)
+            return False
+        cls.buckets[key] = (tokens - 1, current)
+        return True
+
+    def do_GET(self):
+        cls = StandInHandler
+        path, _, query = self.path.partition("?")
+        entity_id = path.split("/")[2]
+        with cls.lock:
+            if not self.allowed(query):
+                cls.throttled += 1
+                self.reply(429)
+                return
+            cls.requests[entity_id] += 1
+            flaky = entity_id in cls.flaky_left
+            cls.flaky_left.discard(entity_id)
+
+        if entity_id == BROKEN:
+            self.reply(500)
+        elif flaky:
+            self.reply(503)
+        elif entity_id in MISSING:
+            self.reply(404)
+        else:
+            self.reply(200, json.dumps({"competitor": {"id": entity_id, "name": "Player"}}).encode())
+
+
+def stored(db_path):
+    conn = sqlite3.connect(db_path)
+    ids = {row[0] for row in conn.execute("SELECT entity_id FROM detail_payloads")}
+    failures = {row[0] for row in conn.execute("SELECT entity_id FROM detail_failures")}
+    conn.close()
+    return ids, failures
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "details.db")
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        migrate(conn)
+        conn.executemany(
+            "INSERT INTO competitors (competitor_id, name, country, country_code, abbreviation) "
+            "VALUES (?, 'Player', 'Neutral', 'NEU', 'PLA')",
+            ((i,) for i in IDS),
+        )
+        conn.close()
+
+        def fetcher():
+            return DetailFetcher("competitor_profile", "test", db_path=db_path, api_root=base,
+                                 qps=QPS, burst=1, concurrency=8, retries=2, backoff=0.05)
+
+        # Run 1: stopped after two seconds, without the final flush a clean
+        # exit would do, so only the committed batches survive
+        first = fetcher()
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        writer = PayloadWriter(conn, "competitor_profile", batch_size=10, interval=60)
+        start = time.perf_counter()
+        try:
+            asyncio.run(asyncio.wait_for(first.run(first.pending_ids(conn), writer), timeout=2.0))
+        except TimeoutError:
+            pass
+        conn.close()
+        crashed_after = time.perf_counter() - start
+        kept, _ = stored(db_path)
+        requested_before = Counter(StandInHandler.requests)
+        print(f"Run 1: cut off after {crashed_after:.1f}s with {first.requests} requests, "
+              f"{len(kept)} ids committed")
+        assert 0 < len(kept) < len(IDS)
+
+        # Run 2: resumes from the checkpoint
+        second = fetcher()
+        start = time.perf_counter()
+        second.fetch()
+        elapsed = time.perf_counter() - start
+        rate = second.requests / elapsed
+        print(f"Run 2: {second.requests} requests in {elapsed:.1f}s ({rate:.1f} req/s, quota {QPS})")
+
+        done, failed = stored(db_path)
+        again = [i for i in kept if StandInHandler.requests[i] > requested_before[i]]
+        assert not again, f"{len(again)} committed ids were fetched again"
+        assert done == set(IDS) - {BROKEN}, f"{len(set(IDS) - done)} ids missing"
+        assert failed == {BROKEN}
+        assert StandInHandler.throttled == 0, f"{StandInHandler.throttled} requests over the quota"
+        assert rate <= QPS * 1.05
+
+        conn = sqlite3.connect(db_path)
+        missing = conn.execute("SELECT COUNT(*) FROM detail_payloads WHERE status = 404").fetchone()[0]
+        conn.close()
+        assert missing == len(MISSING)
+
+    server.shutdown()
+    print(f"✅ {len(IDS) - 1} ids stored ({len(MISSING)} not found), 1 failed, "
+          f"no 429s and no refetches after the crash")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http_client import HttpClient
+
+# Exercises HttpClient against a local stand-in for the Sportradar API:
+# cold fetch, TTL hit, 304 revalidation and retries on 503/429.
+#   python bench_http_client.py
+
+PAYLOAD = json.dumps({
+    "generated_at": "2026-01-21T12:51:17+00:00",
+    "competitions": [{"id": f"sr:competition:{i}", "name": f"Cup {i}"} for i in range(20000)],
+}).encode()
+ETAG = '"' + hashlib.sha256(PAYLOAD).hexdigest() + '"'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    failures = {"/flaky": 2, "/throttled": 1}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+
+        if self.failures.get(path, 0) > 0:
+            self.failures[path] -= 1
+            self.send_response(429 if path == "/throttled" else 503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = gzip.compress(PAYLOAD)
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        client = HttpClient(cache_dir=cache_dir, ttl=60, backoff=0.01)
+        params = {"api_key": "test"}
+
+        cold = client.get(base + "/competitions.json", params)
+        assert cold.source == "network" and len(cold.json()["competitions"]) == 20000
+        # Transferred bytes are the gzipped body; the decoded one is the payload
+        assert (cold.size, cold.body_size) == (len(gzip.compress(PAYLOAD)), len(PAYLOAD))
+        warm = client.get(base + "/competitions.json", params)
+        assert warm.source == "cache"
+
+        # TTL expired: conditional request answered with 304
+        client.ttl = 0
+        revalidated = client.get(base + "/competitions.json", params)
+        assert revalidated.source == "not_modified" and not revalidated.changed
+
+        client.ttl = 60
+        assert client.get(base + "/flaky", params).status == 200
+        assert client.get(base + "/throttled", params).status == 200
+
+        for t in client.timings:
+            print(f"{t['url'].replace(base, ''):<20} {t['source']:<13} "
+                  f"{t['status']:>4} {t['seconds'] * 1000:>8.2f} ms {t['bytes']:>9} B "
+                  f"({t['body_bytes']} B decoded)")
+        print(json.dumps(client.stats(), indent=2))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"✅ HTTP client checks passed in {time.perf_counter() - start:.2f}s")
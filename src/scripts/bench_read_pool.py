@@ -0,0 +1,164 @@
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Timed with tracing on, as the pipeline and app run, but kept out of the
+# metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from data_layer import LOADERS, DataStore, explorer_filters
+from live_db import current_path
+
+# Load test for the dashboard's read path. N simulated sessions each run the
+# app's uncached queries back to back while a writer commits small
+# transactions, once through the read pool and once through a single shared
+# connection behind a lock, the way app.py used to read. The pool has one
+# connection per session unless --pool-size says otherwise; a smaller pool
+# adds its queueing to the latencies. Reads only run in parallel on more
+# than one core: on a single core the pool is no faster than the shared
+# connection and its p99 is worse.
+#   python bench_read_pool.py --sessions 16 --requests 50
+#   python bench_read_pool.py --sessions 16 --pool-size 8
+
+
+class SharedConnection:
+    # The old read path: one connection, check_same_thread=False, one query at a time
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+
+    def run(self, fn):
+        with self.lock:
+            return fn(self.conn)
+
+
+class PooledConnection:
+    def __init__(self, db_path, size):
+        self.store = DataStore(db_path, pool_size=size)
+
+    def run(self, fn):
+        with self.store.pool.connection() as conn:
+            return fn(conn)
+
+
+def session_queries(rng):
+    # One simulated rerun: an Explorer page and its count, plus a dashboard
+    # dataset on one view in ten (the rest are served from the frame cache)
+    filters = explorer_filters((1, rng.randint(50, 2000)), [], rng.choice([0, 100, 1000]), "")
+    where, params = filters
+    queries = [
+        lambda conn: conn.execute(
+            f"""
+            SELECT r.rank, r.movement, r.points, r.competitions_played, c.name, c.country
+            FROM competitor_rankings_latest r
+            JOIN competitors c ON r.competitor_id = c.competitor_id
+            WHERE {where} ORDER BY r.rank, r.competitor_id LIMIT 50
+            """,
+            params,
+        ).fetchall(),
+        lambda conn: conn.execute(
+            f"""
+            SELECT COUNT(*) FROM competitor_rankings_latest r
+            JOIN competitors c ON r.competitor_id = c.competitor_id
+            WHERE {where}
+            """,
+            params,
+        ).fetchone(),
+    ]
+    if rng.random() < 0.1:
+        queries.append(LOADERS[rng.choice(sorted(LOADERS))])
+    return queries
+
+
+def writer(db_path, stop, commits):
+    # Stands in for an ingest committing while users read
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    while not stop.is_set():
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE dashboard_kpis SET value = value WHERE name = 'total_venues'")
+        time.sleep(0.005)
+        conn.execute("COMMIT")
+        commits.append(1)
+        time.sleep(0.005)
+    conn.close()
+
+
+def load_test(reader, sessions, requests, db_path, with_writer):
+    latencies = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    commits = []
+
+    def session(seed):
+        rng = random.Random(seed)
+        for _ in range(requests):
+            start = time.perf_counter()
+            for query in session_queries(rng):
+                reader.run(query)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    write_thread = threading.Thread(target=writer, args=(db_path, stop, commits))
+    if with_writer:
+        write_thread.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    if with_writer:
+        write_thread.join()
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "views_per_s": len(latencies) / elapsed,
+        "commits": len(commits),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=current_path())
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, help="default: one connection per session")
+    parser.add_argument("--no-writer", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The writer must not touch the real database
+        db_path = os.path.join(tmp, "load.db")
+        shutil.copy(args.db, db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.close()
+
+        pooled = PooledConnection(db_path, args.pool_size or args.sessions)
+        readers = [("shared connection", SharedConnection(db_path)), ("read pool", pooled)]
+
+        print(f"{args.sessions} sessions x {args.requests} page views"
+              f"{'' if args.no_writer else ', concurrent writer'}\n")
+        print(f"{'reader':<18} {'p50':>9} {'p99':>9} {'views/s':>9} {'commits':>8}")
+        for name, reader in readers:
+            result = load_test(reader, args.sessions, args.requests, db_path, not args.no_writer)
+            print(f"{name:<18} {result['p50_ms']:7.2f}ms {result['p99_ms']:7.2f}ms "
+                  f"{result['views_per_s']:9.1f} {result['commits']:>8}")
+
+        print("\nPool:", pooled.store.pool.stats())
+        pooled.store.pool.close()
+    print("✅ Load test finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import pandas as pd
+from migrations import migrate
+from search import match_query, SEARCH_QUERY
+
+# Name search latency: the FTS5 index (search.py) vs. the pandas
+# str.contains scan the Explorer used to run on every rerun.
+#   python bench_search.py --rows 1000000
+
+# Names are built from syllables so that, as in the real feed, most
+# prefixes match a small share of the table; a few carry accents
+SYLLABLES = ["ka", "ro", "li", "na", "vic", "dal", "mar", "tin", "sá", "ček", "ül",
+             "ber", "go", "vá", "ri", "kov", "sen", "zo", "ler", "ba", "ni", "te",
+             "ša", "jo", "ham", "der", "ïs", "pel", "wa", "mu", "ci", "fa"]
+COUNTRIES = ["Serbia", "Spain", "Poland", "Italy", "Czechia", "Denmark", "Tunisia",
+             "Greece", "Kazakhstan", "United States", "Germany", "Norway"]
+
+# Prefix, accent-folded, two-word and no-match searches
+QUERIES = ["marti", "cek", "sakov", "kaber rodal", "zoler", "qqq"]
+
+
+def word(rng, syllables):
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def build(conn, rows, seed=7):
+    rng = random.Random(seed)
+    migrate(conn)
+    conn.execute("BEGIN")
+    conn.executemany(
+        """
+        INSERT INTO competitors (competitor_id, name, country, country_code, abbreviation)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (
+            (f"sr:competitor:{i}",
+             f"{word(rng, 3)}, {word(rng, 2)}",
+             rng.choice(COUNTRIES), "XXX", "ABC")
+            for i in range(rows)
+        ),
+    )
+    conn.execute("INSERT INTO competitor_search (competitor_search) VALUES ('rebuild')")
+    conn.execute("COMMIT")
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "search.db"), isolation_level=None)
+        start = time.perf_counter()
+        build(conn, args.rows)
+        print(f"Built {args.rows:,} competitors and the FTS5 index in {time.perf_counter() - start:.1f}s")
+
+        names = pd.read_sql("SELECT name FROM competitors", conn)["name"]
+
+        print(f"\n{'query':<16} {'fts5 top 20':>12} {'fts5 count':>12} {'pandas':>10} {'matches':>9}")
+        for text in QUERIES:
+            match = match_query(text)
+            fts_ms, _ = timed(lambda: conn.execute(SEARCH_QUERY, (match, 20)).fetchall(), args.repeat)
+            count_ms, matches = timed(lambda: conn.execute(
+                "SELECT COUNT(*) FROM competitor_search WHERE competitor_search MATCH ?", (match,)
+            ).fetchone()[0], args.repeat)
+            pandas_ms, _ = timed(lambda: names[names.str.contains(text, case=False)], args.repeat)
+            print(f"{text:<16} {fts_ms:10.2f}ms {count_ms:10.2f}ms {pandas_ms:8.1f}ms {matches:>9,}")
+        conn.close()
+
+    # pandas matches the raw substring anywhere, so "cek" misses accented
+    # names FTS5 finds, and multi-word input must appear verbatim
+    print("\n✅ Search benchmark finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import pandas as pd
+
+# Kept out of the metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+
+from check_query_plans import build_synthetic
+from snapshot import SNAPSHOT_QUERIES, export_snapshot
+
+# Load time and memory of the dashboard's large frames (rankings, venues,
+# complexes) read with read_sql against the same frames mapped from the
+# columnar snapshot (snapshot.py), on the synthetic database. Each mode runs
+# in --workers processes at once, like Streamlit workers on one host; every
+# worker loads the frames through DataStore and reads every value.
+# PSS splits shared pages between the processes mapping them, so it is the
+# per-worker cost of the frames once they are all loaded.
+#   python bench_snapshot.py --scale 2 --workers 4
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+def memory():
+    # kB from /proc: resident set, and its proportional and private parts
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def worker(db_path, use_snapshot, barrier, results):
+    sys.path.insert(0, APP_DIR)
+    from data_layer import DataStore
+
+    store = DataStore(db_path, snapshot=use_snapshot)
+    store.current_generation()
+    before = memory()
+
+    start = time.perf_counter()
+    frames = [store.get(name) for name in SNAPSHOT_QUERIES]
+    loaded = time.perf_counter() - start
+    # Every value is read once, so mapped pages are actually resident
+    for frame in frames:
+        for name in frame.columns:
+            column = frame[name]
+            if column.dtype == "category":
+                column.array.codes.sum()
+            elif pd.api.types.is_string_dtype(column.dtype):
+                column.str.len().sum()
+            else:
+                column.to_numpy().sum()
+    touched = time.perf_counter() - start
+
+    barrier.wait()
+    after = memory()
+    results.put({
+        "load": loaded,
+        "touch": touched,
+        "rss": after["rss"] - before["rss"],
+        "pss": after["pss"] - before["pss"],
+        "private": after["private"] - before["private"],
+        "snapshot_loads": store.snapshot_loads,
+    })
+    barrier.wait()
+
+
+def run(db_path, use_snapshot, workers):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(db_path, use_snapshot, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiplier for the synthetic row counts")
+    parser.add_argument("--workers", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        build_synthetic(conn, args.scale)
+        counts = {name: conn.execute(f"SELECT COUNT(*) FROM ({sql})").fetchone()[0]
+                  for name, sql in SNAPSHOT_QUERIES.items()}
+        conn.close()
+        print("Frames:", ", ".join(f"{name} {rows} rows" for name, rows in counts.items()))
+
+        start = time.perf_counter()
+        export_snapshot(db_path)
+        print(f"Export: {time.perf_counter() - start:.2f}s")
+
+        report = {}
+        for mode, use_snapshot in (("read_sql", False), ("snapshot", True)):
+            rows = run(db_path, use_snapshot, args.workers)
+            assert all(row["snapshot_loads"] == (len(SNAPSHOT_QUERIES) if use_snapshot else 0) for row in rows)
+            report[mode] = {key: sum(row[key] for row in rows) / len(rows)
+                            for key in ("load", "touch", "rss", "pss", "private")}
+
+    print(f"\nper worker, {args.workers} workers   {'load':>9} {'+ read':>9} {'RSS':>9} {'PSS':>9} {'private':>9}")
+    for mode, r in report.items():
+        print(f"{mode:<28} {r['load'] * 1000:7.1f}ms {r['touch'] * 1000:7.1f}ms "
+              f"{r['rss'] / 1024:7.1f}MB {r['pss'] / 1024:7.1f}MB {r['private'] / 1024:7.1f}MB")
+    sql, mapped = report["read_sql"], report["snapshot"]
+    print(f"\nsnapshot: {sql['load'] / mapped['load']:.1f}x faster to load, "
+          f"{sql['pss'] / max(mapped['pss'], 1):.1f}x less memory per worker (PSS)")
+    print("✅ Snapshot benchmark finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+# Kept out of the metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+# No figure warm-up thread: it would build every chart behind the first run
+# and the timings would not be the script's own
+os.environ.setdefault("FIGURE_WARM_INTERVAL", "0")
+
+# Cold start and rerun cost of the Streamlit app (src/app/app.py), run
+# headless with streamlit.testing on the shipped database. Every section
+# starts in a fresh process, as the first session after the server starts:
+#   first render  the first script run with that section selected: app
+#                 imports, static assets, data loads and figures
+#   rerun         the median script run after that (a widget change): what
+#                 every interaction pays once the caches are filled
+# plotly.express is reported when the first run imported it, and the page
+# size is the markdown the script sent (styles, background and cards).
+# Streamlit itself is imported before the clock starts, as it is in a running
+# server. streamlit.testing compiles the script again on every run where a
+# server compiles it once, so that compile is timed apart and taken out of
+# the rerun. It runs from the repository root, like `streamlit run
+# src/app/app.py`, so .streamlit/config.toml applies.
+#   python bench_startup.py
+#   python bench_startup.py --reruns 20
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+APP_PATH = os.path.join(ROOT_DIR, "src", "app", "app.py")
+
+
+def compile_time(repeat=5):
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ScriptCache().get_bytecode(APP_PATH)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def worker(section, reruns, results):
+    os.chdir(ROOT_DIR)
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    if section is not None:
+        # The sidebar radio keeps its value under this key
+        at.session_state["section"] = section
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    if at.exception:
+        results.put({"section": section, "error": at.exception[0].message})
+        return
+    plotly = "plotly.express" in sys.modules
+    page_bytes = sum(len(element.value.encode()) for element in at.markdown)
+
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    compiled = compile_time()
+    results.put({
+        "section": at.sidebar.radio[0].value,
+        "options": at.sidebar.radio[0].options,
+        "first": first,
+        "rerun": statistics.median(times) - compiled,
+        "compile": compiled,
+        "plotly": plotly,
+        "page_bytes": page_bytes,
+    })
+
+
+def run(section, reruns):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=worker, args=(section, reruns, results))
+    process.start()
+    row = results.get()
+    process.join()
+    if "error" in row:
+        raise SystemExit(f"❌ {row['section']}: {row['error']}")
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+
+    # The default section tells which ones there are
+    rows = [run(None, args.reruns)]
+    rows += [run(section, args.reruns) for section in rows[0]["options"][1:]]
+
+    print(f"script compile (taken out of the reruns): {rows[0]['compile'] * 1000:.1f}ms\n")
+    print(f"{'section':<26} {'first render':>12} {'rerun':>9} {'page':>8}  plotly.express")
+    for row in rows:
+        print(f"{row['section']:<26} {row['first'] * 1000:10.1f}ms {row['rerun'] * 1000:7.1f}ms "
+              f"{row['page_bytes'] / 1024:6.1f}KB  {'imported' if row['plotly'] else '-'}")
+    print("✅ Startup benchmark finished")
+
+
+if __name__ == "__main__":
+    main()
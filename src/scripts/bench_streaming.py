@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+from stream_json import iter_items
+
+# Peak Python memory of json.load vs. the streaming reader as the
+# complexes and rankings payloads grow.
+#   python bench_streaming.py --sizes 1000 10000 100000
+
+RANKINGS_PATH = ("rankings", "*", "competitor_rankings", "*")
+
+
+def write_complexes(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"generated_at": "2026-01-21T12:51:17+00:00", "complexes": [')
+        for i in range(n):
+            if i:
+                f.write(",")
+            json.dump({
+                "id": f"sr:complex:{i}",
+                "name": f"Complex {i}",
+                "venues": [{
+                    "id": f"sr:venue:{i}{j}",
+                    "name": f"Court {j}",
+                    "city_name": "City",
+                    "country_name": "SPAIN",
+                    "country_code": "ESP",
+                    "timezone": "Europe/Madrid",
+                } for j in range(5)],
+            }, f)
+        f.write("]}")
+
+
+def write_rankings(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"generated_at": "2026-01-21T12:51:17+00:00", "rankings": [')
+        f.write('{"type_id": 1, "name": "ATP", "gender": "men", "competitor_rankings": [')
+        for i in range(n):
+            if i:
+                f.write(",")
+            json.dump({
+                "rank": i + 1,
+                "movement": 0,
+                "points": 10000 - i % 10000,
+                "competitions_played": 20,
+                "competitor": {
+                    "id": f"sr:competitor:{i}",
+                    "name": f"Player, {i}",
+                    "country": "Spain",
+                    "country_code": "ESP",
+                    "abbreviation": "PLA",
+                },
+            }, f)
+        f.write("]}]}")
+
+
+def peak(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_bytes
+
+
+def load_whole(path, item_path):
+    with open(path, "rb") as f:
+        node = json.load(f)
+    items = [node]
+    for key in item_path:
+        if key == "*":
+            items = [x for parent in items for x in parent]
+        else:
+            items = [parent[key] for parent in items]
+    return len(items)
+
+
+def load_streaming(path, item_path):
+    count = 0
+    with open(path, "rb") as f:
+        for _ in iter_items(f, item_path):
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    feeds = [
+        ("complexes", write_complexes, ("complexes", "*")),
+        ("rankings", write_rankings, RANKINGS_PATH),
+    ]
+
+    print(f"{'feed':<10} {'items':>8} {'file MB':>8} {'json.load MB':>13} {'stream MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for feed, write, item_path in feeds:
+            for n in args.sizes:
+                path = os.path.join(tmp, f"{feed}_{n}.json")
+                write(path, n)
+                size = os.path.getsize(path) / 2**20
+                whole = peak(load_whole, path, item_path) / 2**20
+                stream = peak(load_streaming, path, item_path) / 2**20
+                print(f"{feed:<10} {n:>8} {size:>8.1f} {whole:>13.1f} {stream:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Timed with tracing on, as the pipeline and app run, but kept out of the
+# metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+
+import insert_complexes_venues
+import insert_data
+import insert_rankings
+import landing
+from gen_synthetic import BASE_COUNTS, generate
+from leaderboards import ALL, leaderboard_query
+from named_queries import load_queries
+from snapshot import SNAPSHOT_QUERIES, export_snapshot, open_snapshot
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from data_layer import EXPLORER_FROM, LOADERS, DataStore, explorer_filters
+from figures import FigureCache
+
+# End-to-end benchmark on synthetic data: every ingest stage, every query in
+# analysis_queries.sql, every app.py loader and the snapshot of the large
+# frames, written as JSON and compared with a stored baseline. Exits 1 when
+# a timing regresses by more than --threshold (and by more than MIN_DELTA
+# seconds, to ignore timer noise), after scaling the baseline by how fast
+# this machine runs a fixed workload.
+#   python bench_suite.py                      compare with bench_baseline.json
+#   python bench_suite.py --save-baseline      record a new baseline
+#   python bench_suite.py --rankings 1000000 --venues 200000 --baseline none
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BASE_DIR, "bench_baseline.json")
+RESULTS_PATH = os.path.join(BASE_DIR, "bench_results.json")
+
+MIN_DELTA = 0.010
+
+
+def timed(fn, repeat=1):
+    # Best of N: the least noisy estimate on a shared machine
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def calibrate():
+    # Fixed SQLite workload timed with the suite; comparisons are scaled by
+    # it so a slower or busier machine is not reported as a regression
+    conn = sqlite3.connect(":memory:")
+    seconds = timed(lambda: conn.execute(
+        "WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < 1000000) "
+        "SELECT SUM(i % 7) FROM seq"
+    ).fetchone(), 5)
+    conn.close()
+    return seconds
+
+
+def quiet(fn, *args):
+    # The loaders print progress lines; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def bench_ingest(tmp, paths, repeat):
+    # Each round loads into a fresh database; the last one is kept for the queries
+    rounds = []
+    for i in range(repeat):
+        db_path = os.path.join(tmp, f"bench{i}.db")
+        rounds.append(ingest_once(db_path, paths))
+    timings = {key: min(r[key] for r in rounds) for key in rounds[0]}
+    return db_path, timings
+
+
+def ingest_once(db_path, paths):
+    def competitions():
+        with open(paths["competitions"], "rb") as f:
+            quiet(insert_data.insert_data, db_path, f)
+
+    def complexes():
+        with open(paths["complexes"], "rb") as f:
+            quiet(insert_complexes_venues.insert_complexes, db_path, f)
+
+    def rankings():
+        with open(paths["rankings"], "rb") as f:
+            quiet(insert_rankings.insert_data, db_path, f)
+
+    return {
+        # Includes creating the schema on the empty database
+        "ingest/competitions": timed(competitions),
+        "ingest/complexes": timed(complexes),
+        "ingest/rankings": timed(rankings),
+        # Same feeds again: every fingerprint and ranking matches, so nothing is written
+        "ingest/competitions_unchanged": timed(competitions),
+        "ingest/complexes_unchanged": timed(complexes),
+        "ingest/rankings_unchanged": timed(rankings),
+    }
+
+
+def bench_landing(tmp, paths, db_path, repeat):
+    # Hashing and compressing each feed into the landing store, then a
+    # reload of the complexes streamed from their gzip blob
+    landing_dir = os.path.join(tmp, "landing")
+    timings = {}
+    for feed, path in paths.items():
+        timings[f"landing/{feed}"] = timed(
+            lambda: landing.land_file(feed, path, landing_dir=landing_dir), repeat)
+    landed = landing.latest("complexes", landing_dir)
+
+    def complexes():
+        with landed.open() as f:
+            quiet(insert_complexes_venues.insert_complexes, db_path, f)
+
+    timings["ingest/complexes_unchanged_landed"] = timed(complexes, repeat)
+    return timings
+
+
+def bench_queries(db_path, repeat):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    timings = {
+        f"query/{name}": timed(lambda: conn.execute(sql).fetchall(), repeat)
+        for name, sql in load_queries()
+    }
+    conn.close()
+    return timings
+
+
+def bench_app(db_path, repeat):
+    store = DataStore(db_path)
+    timings = {}
+    with store.pool.connection() as conn:
+        for name, loader in LOADERS.items():
+            timings[f"app/{name}"] = timed(lambda: loader(conn), repeat)
+
+    # The large frames written to the columnar snapshot, then mapped back
+    with contextlib.redirect_stdout(io.StringIO()):
+        timings["app/export_snapshot"] = timed(lambda: export_snapshot(db_path, force=True), repeat)
+    snapshot = open_snapshot(db_path)
+    for name in SNAPSHOT_QUERIES:
+        timings[f"app/snapshot_{name}"] = timed(lambda: snapshot.frame(name), repeat)
+
+    where, params = filters = explorer_filters((1, 10 ** 9), [], 0, "")
+    with store.pool.connection() as conn:
+        timings["app/explorer_count"] = timed(lambda: conn.execute(
+            f"SELECT COUNT(*) {EXPLORER_FROM} WHERE {where}", params).fetchone(), repeat)
+    first = store.explorer_page(filters)
+    last = first.iloc[-1]
+    timings["app/explorer_first_page"] = timed(lambda: store.explorer_page(filters), repeat)
+    timings["app/explorer_next_page"] = timed(
+        lambda: store.explorer_page(filters, (int(last["rank"]), last["competitor_id"])), repeat)
+    search = explorer_filters((1, 10 ** 9), [], 0, "mar")
+    timings["app/explorer_search"] = timed(lambda: store.explorer_page(search), repeat)
+    # Top 100 of every list, and of one list in the largest country; read
+    # directly, as store.leaderboard caches them
+    country = store.get("country_stats")["iso3"].iloc[0]
+    with store.pool.connection() as conn:
+        country_key = conn.execute(
+            "SELECT country_key FROM countries WHERE iso3 = ?", (country,)).fetchone()[0]
+        for by in ("rank", "points"):
+            timings[f"app/leaderboard_{by}"] = timed(lambda: conn.execute(
+                leaderboard_query(by), (ALL, ALL, 100)).fetchall(), repeat)
+        timings["app/leaderboard_list_country"] = timed(lambda: conn.execute(
+            leaderboard_query("points"), (1, country_key, 100)).fetchall(), repeat)
+
+    # Every default figure built into an empty cache (a first paint without
+    # warm-up), then drawn from it
+    timings["app/figures_cold"] = timed(lambda: FigureCache(store).warm(), repeat)
+    figures = FigureCache(store)
+    figures.warm()
+    timings["app/figures_cached"] = timed(figures.warm, repeat)
+    store.pool.close()
+    return timings
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    if baseline["meta"]["counts"] != results["meta"]["counts"]:
+        print("Baseline was recorded at a different scale, comparison skipped")
+        return regressions
+
+    speed = results["meta"]["calibration"] / baseline["meta"]["calibration"]
+    print(f"This machine ran the calibration workload {speed:.2f}x as long as the baseline's")
+    for key, seconds in results["timings"].items():
+        before = baseline["timings"].get(key)
+        if before is None:
+            continue
+        expected = before * speed
+        if seconds > expected * (1 + threshold) and seconds - expected > MIN_DELTA:
+            regressions.append((key, expected, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=10.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ingest-repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="allowed slowdown against the baseline (0.5 = 50%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="'none' to skip the comparison")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    for name in BASE_COUNTS:
+        parser.add_argument(f"--{name}", type=int, help=f"exact number of {name}")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        paths, counts = generate(tmp, args.scale,
+                                 **{name: getattr(args, name) for name in BASE_COUNTS})
+        print(f"Generated {counts} in {time.perf_counter() - start:.1f}s")
+
+        calibration = calibrate()
+        db_path, timings = bench_ingest(tmp, paths, args.ingest_repeat)
+        timings.update(bench_landing(tmp, paths, db_path, args.ingest_repeat))
+        timings.update(bench_queries(db_path, args.repeat))
+        timings.update(bench_app(db_path, args.repeat))
+        calibration = min(calibration, calibrate())
+
+    results = {
+        "meta": {
+            "scale": args.scale,
+            "counts": counts,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "calibration": calibration,
+        },
+        "timings": timings,
+    }
+
+    width = max(len(key) for key in timings)
+    for key, seconds in timings.items():
+        print(f"{key:<{width}} {seconds * 1000:10.2f} ms")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print("Results written to", args.output)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print("✅ Baseline saved to", BASELINE_PATH)
+        return
+
+    if args.baseline == "none" or not os.path.exists(args.baseline):
+        print("✅ Benchmark finished (no baseline to compare)")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for key, expected, after in regressions:
+        print(f"❌ {key}: expected {expected * 1000:.2f} ms, took {after * 1000:.2f} ms")
+    if regressions:
+        print(f"{len(regressions)} timings regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"✅ No regressions against {os.path.basename(args.baseline)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from migrations import migrate
+from instrument import trace_sql
+from live_db import current_path
+
+load_dotenv()
+
+# PRAGMAs applied for the duration of a load (override in .env)
+LOAD_PRAGMAS = {
+    "journal_mode": os.getenv("LOAD_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("LOAD_SYNCHRONOUS", "NORMAL"),
+    "cache_size": os.getenv("LOAD_CACHE_SIZE", "-65536"),
+}
+BATCH_SIZE = int(os.getenv("LOAD_BATCH_SIZE", "5000"))
+
+
+@contextmanager
+def load_session(db_path=None):
+    # One connection, one transaction for the whole load.
+    # Pending migrations run first, each in its own transaction.
+    conn = sqlite3.connect(db_path or current_path(), isolation_level=None)
+    # Statement timings go to the stage that opened the session
+    trace_sql(conn)
+    for name, value in LOAD_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    migrate(conn)
+
+    conn.execute("BEGIN")
+    try:
+        yield conn
+        # Tells readers (src/app/data_layer.py) that cached data is stale
+        conn.execute("UPDATE db_meta SET value = value + 1 WHERE key = 'data_generation'")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+class Stage:
+    """Temp table that rows are batched into before one set-based INSERT."""
+
+    def __init__(self, conn, table, columns, batch_size=BATCH_SIZE):
+        self.conn = conn
+        self.table = table
+        self.columns = columns
+        self.name = f"stage_{table}"
+        self.batch_size = batch_size
+        self.rows = 0
+        self.elapsed = 0.0
+        self._pending = []
+
+        conn.execute(f"DROP TABLE IF EXISTS temp.{self.name}")
+        conn.execute(f"CREATE TEMP TABLE {self.name} ({', '.join(columns)})")
+        self._insert_sql = (
+            f"INSERT INTO temp.{self.name} VALUES "
+            f"({', '.join('?' for _ in columns)})"
+        )
+
+    def add(self, row):
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+        self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        start = time.perf_counter()
+        self.conn.executemany(self._insert_sql, self._pending)
+        self.elapsed += time.perf_counter() - start
+        self.rows += len(self._pending)
+        self._pending = []
+
+    def load_into(self, select=None, conflict="IGNORE"):
+        # Move the staged rows into the real table in one statement
+        self.flush()
+        columns = ", ".join(self.columns)
+        if select is None:
+            select = f"SELECT {columns} FROM temp.{self.name}"
+
+        start = time.perf_counter()
+        cursor = self.conn.execute(
+            f"INSERT OR {conflict} INTO {self.table} ({columns}) {select}"
+        )
+        self.elapsed += time.perf_counter() - start
+        self.conn.execute(f"DROP TABLE temp.{self.name}")
+
+        report(self.table, self.rows, cursor.rowcount, self.elapsed)
+        return cursor.rowcount
+
+
+def report(table, staged, inserted, elapsed):
+    rate = staged / elapsed if elapsed else float("inf")
+    print(
+        f"{table}: {staged} rows staged, {inserted} inserted "
+        f"in {elapsed:.3f}s ({rate:,.0f} rows/s)"
+    )
@@ -0,0 +1,158 @@
+import argparse
+import math
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+
+# Kept out of the metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+
+from check_query_plans import build_synthetic
+from named_queries import load_queries
+from live_db import current_path
+from query_backend import DuckDBBackend, SQLiteBackend, duckdb
+
+# Parity check for query_backend.py: every query in analysis_queries.sql must
+# return the same rows on SQLite and on DuckDB, against a copy of
+# competition.db and against a synthetic database. Rows are compared as
+# multisets, since ties under ORDER BY may come back in either order, and
+# numbers are compared by value (SUM is an integer in SQLite and a HUGEINT
+# in DuckDB). It also swaps the DuckDB copy while a query is still running
+# on the old one, which must finish on it and close it.
+#   python check_backends.py [--scale 0.2]
+
+
+def normalize(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return (0, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, round(float(value), 6))
+    if hasattr(value, "item"):
+        # numpy scalars
+        return normalize(value.item())
+    return (2, str(value))
+
+
+def rows(frame):
+    return sorted(tuple(normalize(value) for value in row) for row in frame.itertuples(index=False))
+
+
+def compare(db_path, label):
+    sqlite_backend = SQLiteBackend(db_path)
+    duckdb_backend = DuckDBBackend(db_path)
+    failures = 0
+    for name, sql in load_queries():
+        expected = sqlite_backend.query(sql)
+        actual = duckdb_backend.query(sql)
+        problems = []
+        if len(expected.columns) != len(actual.columns):
+            problems.append(f"{len(expected.columns)} columns in SQLite, {len(actual.columns)} in DuckDB")
+        elif len(expected) != len(actual):
+            problems.append(f"{len(expected)} rows in SQLite, {len(actual)} in DuckDB")
+        else:
+            differing = sum(a != b for a, b in zip(rows(expected), rows(actual)))
+            if differing:
+                problems.append(f"{differing} of {len(expected)} rows differ")
+
+        print(f"{'❌' if problems else '✅'} [{label}] {name} ({len(expected)} rows)")
+        for problem in problems:
+            print(f"     !! {problem}")
+        failures += bool(problems)
+    sqlite_backend.close()
+    duckdb_backend.close()
+    return failures
+
+
+class PausedBackend(DuckDBBackend):
+    # pause() blocks the query calling it until the check lets it go
+    def __init__(self, db_path):
+        self.started = threading.Event()
+        self.resume = threading.Event()
+        super().__init__(db_path)
+
+    def connect(self):
+        conn = super().connect()
+        conn.create_function("pause", self.pause, ["INTEGER"], "INTEGER")
+        return conn
+
+    def pause(self, value):
+        self.started.set()
+        self.resume.wait(10)
+        return value
+
+
+def check_refresh_during_query(db_path):
+    backend = PausedBackend(db_path)
+    old = backend.conn
+    result = {}
+
+    def run():
+        try:
+            result["rows"] = len(backend.query("SELECT pause(1) AS x"))
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    backend.started.wait(10)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("UPDATE db_meta SET value = value + 1 WHERE key = 'data_generation'")
+    conn.close()
+    backend.refresh()
+    replaced = backend.conn is not old
+    backend.resume.set()
+    thread.join()
+
+    problems = []
+    if not replaced:
+        problems.append("refresh() kept the old connection after a load")
+    if "error" in result:
+        problems.append(f"the running query failed: {result['error']!r}")
+    try:
+        old.execute("SELECT 1")
+        problems.append("the replaced connection was not closed")
+    except duckdb.ConnectionException:
+        pass
+    if backend._users:
+        problems.append(f"connections still counted as in use: {len(backend._users)}")
+    backend.close()
+
+    print(f"{'❌' if problems else '✅'} DuckDB copy swapped under a running query")
+    for problem in problems:
+        print(f"     !! {problem}")
+    return bool(problems)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=current_path())
+    parser.add_argument("--scale", type=float, default=0.2,
+                        help="multiplier for the synthetic row counts (0 skips it)")
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        # The DuckDB copy is written next to the database, so work on a copy
+        copy = os.path.join(tmp, "competition.db")
+        shutil.copyfile(args.db, copy)
+        failures += compare(copy, os.path.basename(args.db))
+        failures += check_refresh_during_query(copy)
+
+        if args.scale:
+            synthetic = os.path.join(tmp, "synthetic.db")
+            conn = sqlite3.connect(synthetic, isolation_level=None)
+            build_synthetic(conn, args.scale)
+            conn.close()
+            failures += compare(synthetic, f"synthetic x{args.scale:g}")
+
+    if failures:
+        print(f"❌ {failures} checks failed")
+        sys.exit(1)
+    print("✅ SQLite and DuckDB return the same results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from hierarchy import create_hierarchy
+from leaderboards import ALL, LEADERBOARD_ORDER, leaderboard_query, refresh_leaderboard
+from migrations import migrate
+from named_queries import load_queries
+
+# Runs EXPLAIN QUERY PLAN for every query in analysis_queries.sql (and the
+# dashboard's leaderboard reads) against a large synthetic database and
+# fails when a plan
+#   - scans a large table without an index (unless the query is a plain
+#     listing with no WHERE, GROUP BY or LIMIT, whose result is every row), or
+#   - builds a temp B-tree for GROUP BY / DISTINCT, or for ORDER BY over
+#     rows rather than over already-grouped results. A query that regroups
+#     the output of a grouped subquery may sort that output: it is bounded
+#     by the number of groups, like a grouped ORDER BY.
+#   python check_query_plans.py [--scale 1.0]
+
+LARGE_TABLE_ROWS = 1000
+
+TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|GROUP\b|ORDER\b|LEFT\b)(\w+))?",
+                       re.IGNORECASE)
+
+
+def build_synthetic(conn, scale=1.0):
+    n = lambda count: max(1, int(count * scale))
+    migrate(conn)
+
+    conn.execute("BEGIN")
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+        INSERT INTO categories (category_id, category_name) SELECT 'sr:category:' || i, 'Category ' || i FROM seq
+        """,
+        (n(200),),
+    )
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+        INSERT INTO competitions (competition_id, competition_name, parent_id, type, gender, category_id)
+        SELECT 'sr:competition:' || i,
+               'Competition ' || i,
+               CASE WHEN i % 3 = 0 THEN 'sr:competition:' || (i / 3) END,
+               CASE i % 3 WHEN 0 THEN 'singles' WHEN 1 THEN 'doubles' ELSE 'mixed' END,
+               CASE i % 2 WHEN 0 THEN 'men' ELSE 'women' END,
+               'sr:category:' || (1 + i % ?)
+        FROM seq
+        """,
+        (n(200000), n(200)),
+    )
+    create_hierarchy(conn)
+    conn.execute("UPDATE categories SET category_name = 'ITF Men' WHERE category_id = 'sr:category:1'")
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+        INSERT INTO competitors (competitor_id, name, country, country_code, abbreviation)
+        SELECT 'sr:competitor:' || i, 'Player, ' || i,
+               CASE WHEN i % 150 = 0 THEN 'Croatia' ELSE 'Country ' || (i % 150) END,
+               'C' || (i % 150), 'P' || i
+        FROM seq
+        """,
+        (n(100000),),
+    )
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < 10)
+        INSERT INTO ranking_snapshots (generated_at, ingested_at, rows_seen)
+        SELECT '2026-01-' || printf('%02d', i), '2026-01-' || printf('%02d', i), 0 FROM seq
+        """
+    )
+    # Four closed historical rows and one current row per competitor
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i < 4)
+        INSERT INTO competitor_rankings
+        (rank, movement, points, competitions_played, competitor_id, snapshot_id, valid_to)
+        SELECT CAST(substr(c.competitor_id, 15) AS INT) + seq.i, seq.i % 3 - 1,
+               100000 - CAST(substr(c.competitor_id, 15) AS INT), 20,
+               c.competitor_id, 1 + seq.i * 2,
+               CASE WHEN seq.i < 4 THEN 3 + seq.i * 2 END
+        FROM competitors c, seq
+        """
+    )
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+        INSERT INTO complexes (complex_id, complex_name, country, timezone)
+        SELECT 'sr:complex:' || i, 'Complex ' || i, 'COUNTRY ' || (i % 150), 'Zone/' || (i % 300)
+        FROM seq
+        """,
+        (n(50000),),
+    )
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+        INSERT INTO venues (venue_id, venue_name, complex_id)
+        SELECT 'sr:venue:' || i, 'Court ' || i, 'sr:complex:' || (1 + i % ?)
+        FROM seq
+        """,
+        (n(200000), n(50000)),
+    )
+    # Country keys, as the loads resolve them (countries.py)
+    conn.execute(
+        """
+        INSERT INTO countries (country_code, country_name, iso3)
+        SELECT country_code, MIN(country), country_code FROM competitors GROUP BY country_code
+        """
+    )
+    conn.execute(
+        """
+        UPDATE competitors SET country_key = (
+            SELECT country_key FROM countries WHERE country_code = competitors.country_code
+        )
+        """
+    )
+    conn.execute(
+        """
+        UPDATE complexes SET country_key = (
+            SELECT country_key FROM countries WHERE upper(country_name) = complexes.country
+        )
+        """
+    )
+    # Ranking lists as the feed's groups, and the leaderboard built from them
+    conn.execute(
+        """
+        INSERT INTO ranking_lists (name, type_id, gender)
+        VALUES ('ATP', 1, 'men'), ('WTA', 2, 'women'), ('ATP Doubles', 3, 'men'), ('WTA Doubles', 4, 'women')
+        """
+    )
+    conn.execute(
+        "UPDATE competitor_rankings SET list_key = 1 + CAST(substr(competitor_id, 15) AS INT) % 4"
+    )
+    refresh_leaderboard(conn)
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+
+
+def row_counts(conn, sql):
+    counts = {}
+    for table, alias in TABLE_REF.findall(sql):
+        count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        counts[table] = count
+        if alias:
+            counts[alias] = count
+    return counts
+
+
+def check_plan(conn, sql):
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+    plan = [row[3] for row in rows]
+    counts = row_counts(conn, sql)
+    grouped = re.search(r"\bGROUP\s+BY\b", sql, re.IGNORECASE) is not None
+    # The outer query reads only subqueries, so it sorts their rows, not a table's
+    subqueries = {m.group(1) for m in (re.match(r"(?:MATERIALIZE|CO-ROUTINE) (\w+)$", d) for d in plan) if m}
+    outer_scans = [row[3].split()[1] for row in rows if row[1] == 0 and row[3].startswith("SCAN ")]
+    regrouped = grouped and bool(outer_scans) and set(outer_scans) <= subqueries
+    listing = re.search(r"\b(WHERE|GROUP\s+BY|LIMIT)\b", sql, re.IGNORECASE) is None
+    problems = []
+
+    for detail in plan:
+        scan = re.match(r"SCAN (\w+)$", detail)
+        if scan and not listing and counts.get(scan.group(1), 0) >= LARGE_TABLE_ROWS:
+            problems.append(f"full scan of {scan.group(1)} ({counts[scan.group(1)]} rows)")
+        if "TEMP B-TREE" in detail:
+            # Sorting grouped output is bounded by the number of groups
+            if not (grouped and detail.endswith("ORDER BY")) and not (regrouped and detail.endswith("GROUP BY")):
+                problems.append(detail)
+
+    return plan, problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiplier for the synthetic row counts")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "plans.db"), isolation_level=None)
+        build_synthetic(conn, args.scale)
+
+        failures = 0
+        for name, sql in load_queries():
+            plan, problems = check_plan(conn, sql)
+            mark = "❌" if problems else "✅"
+            print(f"{mark} {name}")
+            for detail in plan:
+                print(f"     {detail}")
+            for problem in problems:
+                print(f"     !! {problem}")
+            failures += bool(problems)
+
+        # Every scope and order of the Leaderboards page reads K index entries
+        for by in LEADERBOARD_ORDER:
+            for list_key, country_key in ((ALL, ALL), (2, ALL), (ALL, 7), (2, 7)):
+                sql = leaderboard_query(by).replace("?", "{}").format(list_key, country_key, 10)
+                plan, problems = check_plan(conn, sql)
+                if not any("idx_leaderboard" in detail for detail in plan):
+                    problems.append("leaderboard not read through its index")
+                mark = "❌" if problems else "✅"
+                print(f"{mark} Leaderboard top 10 by {by} (list {list_key}, country {country_key})")
+                for detail in plan:
+                    print(f"     {detail}")
+                for problem in problems:
+                    print(f"     !! {problem}")
+                failures += bool(problems)
+        conn.close()
+
+    if failures:
+        print(f"{failures} queries have plan regressions")
+        sys.exit(1)
+    print("✅ All query plans use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Kept out of the metrics file the Performance page reads
+os.environ.setdefault("METRICS_PATH", os.devnull)
+
+from insert_rankings import insert_data
+from leaderboards import ALL, refresh_leaderboard
+from migrations import migrate
+
+# Check for rankings in several lists (insert_rankings.py, leaderboards.py):
+# three small feeds are loaded into a fresh database, with competitor 1
+# ranked in both ATP lists. Each list must keep its own current row and
+# history, and the leaderboard updated by the loads must match one rebuilt
+# from scratch.
+#   python check_ranking_lists.py
+
+LISTS = {"ATP": (1, "men"), "ATP Doubles": (3, "men")}
+
+
+def feed(rankings):
+    # rankings: list name -> [(competitor number, rank, points)]
+    groups = []
+    for name, rows in rankings.items():
+        type_id, gender = LISTS[name]
+        groups.append({
+            "type_id": type_id, "name": name, "gender": gender,
+            "competitor_rankings": [
+                {"rank": rank, "movement": 0, "points": points, "competitions_played": 10,
+                 "competitor": {"id": f"sr:competitor:{i}", "name": f"Player, {i}",
+                                "country": "Croatia", "country_code": "HRV", "abbreviation": f"P{i}"}}
+                for i, rank, points in rows
+            ],
+        })
+    body = {"generated_at": "2026-01-21T12:51:17+00:00", "rankings": groups}
+    return io.BytesIO(json.dumps(body).encode())
+
+
+def leaderboard(conn, name):
+    return sorted(row[0] for row in conn.execute(
+        """
+        SELECT b.competitor_id FROM leaderboard b
+        JOIN ranking_lists l ON l.list_key = b.list_key
+        WHERE l.name = ? AND b.country_key = ?
+        """,
+        (name, ALL),
+    ))
+
+
+def current(conn):
+    return sorted(conn.execute(
+        """
+        SELECT r.competitor_id, l.name, r.points FROM competitor_rankings_latest r
+        JOIN ranking_lists l ON l.list_key = r.list_key
+        """
+    ))
+
+
+def main():
+    problems = []
+
+    def expect(label, got, wanted):
+        if got != wanted:
+            problems.append(f"{label}: got {got!r}, expected {wanted!r}")
+
+    def rebuilt_leaderboard_matches(conn):
+        loaded = sorted(conn.execute("SELECT * FROM leaderboard"))
+        conn.execute("BEGIN")
+        refresh_leaderboard(conn)
+        rebuilt = sorted(conn.execute("SELECT * FROM leaderboard"))
+        conn.execute("ROLLBACK")
+        return loaded == rebuilt
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "lists.db")
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        migrate(conn)
+
+        # Competitor 1 in both lists
+        insert_data(db_path, feed({
+            "ATP": [(1, 1, 9000), (2, 2, 8000)],
+            "ATP Doubles": [(1, 5, 4000), (3, 6, 3500)],
+        }))
+        expect("current rows after load 1", current(conn), [
+            ("sr:competitor:1", "ATP", 9000), ("sr:competitor:1", "ATP Doubles", 4000),
+            ("sr:competitor:2", "ATP", 8000), ("sr:competitor:3", "ATP Doubles", 3500),
+        ])
+        expect("ATP leaderboard", leaderboard(conn, "ATP"), ["sr:competitor:1", "sr:competitor:2"])
+        expect("ATP Doubles leaderboard", leaderboard(conn, "ATP Doubles"),
+               ["sr:competitor:1", "sr:competitor:3"])
+        expect("competitors counted once", conn.execute(
+            "SELECT competitors FROM country_stats").fetchone(), (3,))
+        expect("leaderboard after load 1 matches a rebuild", rebuilt_leaderboard_matches(conn), True)
+
+        # Competitor 1 leaves the doubles list and gains ATP points
+        insert_data(db_path, feed({
+            "ATP": [(1, 1, 9500), (2, 2, 8000)],
+            "ATP Doubles": [(3, 6, 3500)],
+        }))
+        snapshot_id, changed = conn.execute(
+            "SELECT snapshot_id, rows_changed FROM ranking_snapshots ORDER BY snapshot_id DESC LIMIT 1"
+        ).fetchone()
+        expect("rows changed by load 2", changed, 1)
+        expect("current rows after load 2", current(conn), [
+            ("sr:competitor:1", "ATP", 9500), ("sr:competitor:2", "ATP", 8000),
+            ("sr:competitor:3", "ATP Doubles", 3500),
+        ])
+        expect("competitor 1's closed rows", sorted(conn.execute(
+            """
+            SELECT l.name, r.points FROM competitor_rankings r
+            JOIN ranking_lists l ON l.list_key = r.list_key
+            WHERE r.competitor_id = 'sr:competitor:1' AND r.valid_to = ?
+            """,
+            (snapshot_id,),
+        )), [("ATP", 9000), ("ATP Doubles", 4000)])
+        expect("ATP Doubles leaderboard after load 2", leaderboard(conn, "ATP Doubles"), ["sr:competitor:3"])
+        expect("leaderboard after load 2 matches a rebuild", rebuilt_leaderboard_matches(conn), True)
+
+        # The same feed again changes nothing
+        insert_data(db_path, feed({
+            "ATP": [(1, 1, 9500), (2, 2, 8000)],
+            "ATP Doubles": [(3, 6, 3500)],
+        }))
+        expect("rows changed by an unchanged feed", conn.execute(
+            "SELECT rows_changed FROM ranking_snapshots ORDER BY snapshot_id DESC LIMIT 1"
+        ).fetchone(), (0,))
+        conn.close()
+
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print("✅ Rankings in several lists keep their own rows, history and leaderboards")
+
+
+if __name__ == "__main__":
+    main()
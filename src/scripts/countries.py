@@ -0,0 +1,122 @@
+from aggregates import rebuild_summary_tables
+
+# Country dimension. Both feeds name countries in free text ("CHILE" in
+# complexes.json, "Chile" in the rankings) next to an alpha-3 code, so rows
+# reference a country by an integer key resolved from the code at ingest.
+# The app groups and joins on country_key and draws maps from iso3, the
+# ISO 3166 code, instead of matching names on every render.
+
+COUNTRIES_TABLE = """
+CREATE TABLE IF NOT EXISTS countries (
+    country_key INTEGER PRIMARY KEY,
+    country_code TEXT NOT NULL UNIQUE,
+    country_name TEXT NOT NULL,
+    iso3 TEXT NOT NULL
+)
+"""
+
+COUNTRY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_competitors_country_key ON competitors(country_key)",
+    "CREATE INDEX IF NOT EXISTS idx_complexes_country_key ON complexes(country_key, complex_id)",
+]
+
+# Feed codes that are not ISO 3166 alpha-3, and the country they are drawn as
+MAP_CODES = {
+    "ENG": "GBR",
+    "SCO": "GBR",
+    "WAL": "GBR",
+    "NIR": "GBR",
+    "TPE": "TWN",
+}
+
+
+def display_name(name, title_case=False):
+    # complexes.json upper-cases its names ("COTE D IVOIRE"); the rankings
+    # feed's are kept as given, acronyms included ("USA")
+    name = " ".join(name.split())
+    return name.title() if title_case and name.isupper() else name
+
+
+class CountryKeys:
+    """Feed code to country_key for one load; new codes are added as they come."""
+
+    def __init__(self, conn, rename=False, title_case=False):
+        self.conn = conn
+        # The rankings feed's names replace the ones stored from complexes.json
+        self.rename = rename
+        # Set for complexes.json, whose names are all upper case
+        self.title_case = title_case
+        self.keys = dict(conn.execute("SELECT country_code, country_key FROM countries"))
+        self.renamed = set()
+        self.added = 0
+
+    def key(self, code, name):
+        if not code or not code.strip():
+            return None
+        code = code.strip().upper()
+        name = display_name(name or code, self.title_case)
+
+        key = self.keys.get(code)
+        if key is None:
+            key = self.conn.execute(
+                "INSERT INTO countries (country_code, country_name, iso3) VALUES (?, ?, ?)",
+                (code, name, MAP_CODES.get(code, code)),
+            ).lastrowid
+            self.keys[code] = key
+            self.renamed.add(code)
+            self.added += 1
+        elif self.rename and code not in self.renamed:
+            self.conn.execute(
+                "UPDATE countries SET country_name = ? WHERE country_key = ? AND country_name IS NOT ?",
+                (name, key, name),
+            )
+            self.renamed.add(code)
+        return key
+
+
+def create_countries(conn):
+    # Migration step: the countries table, country_key on competitors and
+    # complexes, and the summary tables rebuilt keyed by country_key
+    conn.execute(COUNTRIES_TABLE)
+    for table in ("competitors", "complexes"):
+        conn.execute(
+            f"ALTER TABLE {table} ADD COLUMN country_key INTEGER REFERENCES countries(country_key)"
+        )
+
+    keys = CountryKeys(conn, rename=True)
+    for code, name in conn.execute(
+        "SELECT country_code, MIN(country) FROM competitors GROUP BY country_code"
+    ).fetchall():
+        keys.key(code, name)
+    conn.execute(
+        """
+        UPDATE competitors SET country_key = (
+            SELECT country_key FROM countries WHERE country_code = competitors.country_code
+        )
+        """
+    )
+    # Complexes were stored without their code: a name that matches a known
+    # country is keyed now, the rest by the next complexes load
+    conn.execute(
+        """
+        UPDATE complexes SET country_key = (
+            SELECT country_key FROM countries WHERE upper(country_name) = upper(complexes.country)
+        )
+        """
+    )
+
+    for statement in COUNTRY_INDEXES:
+        conn.execute(statement)
+    rebuild_summary_tables(conn)
+
+
+def restore_feed_names(conn):
+    # Migration step: names from the rankings feed were title-cased like the
+    # ones from complexes.json ("USA" became "Usa"); store them as given.
+    # A new generation, so readers drop frames holding the old names.
+    keys = CountryKeys(conn, rename=True)
+    for code, name in conn.execute(
+        "SELECT country_code, MIN(country) FROM competitors GROUP BY country_code"
+    ).fetchall():
+        keys.key(code, name)
+    conn.execute("UPDATE db_meta SET value = value + 1 WHERE key = 'data_generation'")
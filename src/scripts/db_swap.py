@@ -0,0 +1,155 @@
+import glob
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from migrations import data_generation, migrate
+from live_db import LINK_PATH, current_link
+
+load_dotenv()
+
+# Build-then-swap refresh. The live database is copied to a new versioned
+# file in a db/ directory next to it, the loads run against the copy, and once it
+# passes the checks below competition.current is atomically repointed to it
+# (a symlink replaced with os.replace). Readers keep whichever file they
+# opened until they reopen, so they never wait on a load or see half of one.
+# Once it exists the link is the path everything opens (live_db.py); the
+# competition.db tracked in git is only where it starts out, and is never
+# replaced. db_path here is always the link, never the file behind it.
+#
+# A symlink rather than renaming the file over the live one: in WAL mode
+# the -wal/-shm files are found by name, and a new file must never pick up
+# the old one's. SQLite resolves the link, so each version keeps its own.
+
+# A build may shrink a table by at most this fraction of its live row count
+MAX_SHRINK = float(os.getenv("SWAP_MAX_SHRINK", "0.05"))
+# Versions kept on disk besides the live one, for readers still on them
+KEEP_VERSIONS = int(os.getenv("SWAP_KEEP_VERSIONS", "1"))
+
+CHECKED_TABLES = [
+    "categories", "competitions", "competitors", "competitor_rankings_latest",
+    "complexes", "venues",
+]
+
+
+class SwapRejected(Exception):
+    pass
+
+
+def live_file(db_path=LINK_PATH):
+    return os.path.realpath(db_path)
+
+
+def build_dir(db_path=LINK_PATH):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "db")
+
+
+def prepare_build(db_path=LINK_PATH):
+    # Online backup: a consistent copy even while the live file is being read
+    os.makedirs(build_dir(db_path), exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    build_path = os.path.join(build_dir(db_path), f"competition.{stamp}.db")
+
+    live = sqlite3.connect(f"file:{live_file(db_path)}?mode=ro", uri=True)
+    build = sqlite3.connect(build_path, isolation_level=None)
+    live.backup(build)
+    live.close()
+    migrate(build)
+    start_generation = data_generation(build)
+    build.close()
+    return build_path, start_generation
+
+
+def row_counts(conn):
+    return {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in CHECKED_TABLES
+    }
+
+
+def validate(build_path, db_path=LINK_PATH):
+    build = sqlite3.connect(build_path)
+    live = sqlite3.connect(f"file:{live_file(db_path)}?mode=ro", uri=True)
+    try:
+        result = build.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise SwapRejected(f"integrity check failed: {result}")
+
+        live_counts = row_counts(live)
+        build_counts = row_counts(build)
+        for table, before in live_counts.items():
+            after = build_counts[table]
+            if after < before * (1 - MAX_SHRINK):
+                raise SwapRejected(f"{table} would shrink from {before} to {after} rows")
+        return live_counts, build_counts
+    finally:
+        build.close()
+        live.close()
+
+
+def publish(build_path, db_path=LINK_PATH):
+    # Fold the WAL into the file and flush it before anyone can open it
+    conn = sqlite3.connect(build_path, isolation_level=None)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    fd = os.open(build_path, os.O_RDONLY)
+    os.fsync(fd)
+    os.close(fd)
+
+    # New link next to the old one, then one rename: readers see either version
+    link = db_path + ".swap"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.relpath(build_path, os.path.dirname(db_path)), link)
+    os.replace(link, db_path)
+
+    dir_fd = os.open(os.path.dirname(db_path), os.O_RDONLY)
+    os.fsync(dir_fd)
+    os.close(dir_fd)
+
+    prune(build_path)
+
+
+def prune(current):
+    versions = sorted(glob.glob(os.path.join(os.path.dirname(current), "competition.*.db")))
+    older = [path for path in versions if path < current]
+    for path in older[:max(0, len(older) - KEEP_VERSIONS)]:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def discard(build_path):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(build_path + suffix):
+            os.remove(build_path + suffix)
+
+
+@contextmanager
+def building(db_path=None):
+    # Yields the path to load into. The build is published only if the block
+    # finishes, the checks pass and a load actually committed something.
+    # The first swap creates the link, pointing at competition.db until then.
+    db_path = db_path or current_link()
+    build_path, start_generation = prepare_build(db_path)
+    try:
+        yield build_path
+
+        conn = sqlite3.connect(build_path)
+        build_generation = data_generation(conn)
+        conn.close()
+        if build_generation == start_generation:
+            print("No loads committed, live database kept")
+            discard(build_path)
+            return
+
+        live_counts, build_counts = validate(build_path, db_path)
+    except BaseException:
+        discard(build_path)
+        raise
+
+    publish(build_path, db_path)
+    for table in CHECKED_TABLES:
+        print(f"{table}: {live_counts[table]} -> {build_counts[table]} rows")
+    print(f"✅ {os.path.basename(build_path)} is now live (generation {build_generation})")
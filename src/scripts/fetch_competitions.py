@@ -1,25 +1,26 @@
 import os
-import requests
 from dotenv import load_dotenv
+from http_client import get_client
+from instrument import instrumented, stage
+import landing
 
 load_dotenv()
 
-API_KEY = os.getenv("SPORTRADAR_API_KEY")
-if not API_KEY:
-    raise ValueError("API key not found")
-
-URL = os.getenv("COMPETITIONS_URL")
-if not URL:
-    raise ValueError("URL not found")
+def request_competitions():
+    api_key = os.getenv("SPORTRADAR_API_KEY")
+    if not api_key:
+        raise ValueError("API key not found")
+    url = os.getenv("COMPETITIONS_URL")
+    if not url:
+        raise ValueError("URL not found")
+    with stage("request_competitions") as s:
+        response = get_client().get(url, params={"api_key": api_key})
+        s.bytes = response.size
+        return landing.land("competitions", response)
 
+@instrumented()
 def fetch_competitions():
-    response = requests.get(
-        URL,
-        params={"api_key": API_KEY},
-        timeout=10
-    )
-    response.raise_for_status()
-    return response.json()["competitions"]
+    return request_competitions().json()["competitions"]
 
 if __name__ == "__main__":
     data = fetch_competitions()
@@ -1,28 +1,28 @@
-import requests
-import json
 import os
 from dotenv import load_dotenv
+from http_client import get_client
+from instrument import stage
+import landing
 
 # Load .env file
 load_dotenv()
 
-API_KEY = os.getenv("SPORTRADAR_API_KEY")
-if not API_KEY:
-    raise ValueError("API key not found")
 
-URL = os.getenv("COMPLEXES_URL")
-if not URL:
-    raise ValueError("URL not found")
+def fetch_complexes():
+    api_key = os.getenv("SPORTRADAR_API_KEY")
+    if not api_key:
+        raise ValueError("API key not found")
+    url = os.getenv("COMPLEXES_URL")
+    if not url:
+        raise ValueError("URL not found")
+    # Kept in the landing store; insert_complexes_venues.py reads the latest one
+    with stage("fetch_complexes") as s:
+        response = get_client().get(url, params={"api_key": api_key})
+        s.bytes = response.size
+        return landing.land("complexes", response)
 
-# Base directory = src/scripts
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_PATH = os.path.join(BASE_DIR, "complexes.json")
 
-response = requests.get(URL, params={"api_key": API_KEY}, timeout=10)
-
-if response.status_code == 200:
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(response.json(), f, indent=4)
-    print("Complexes data saved successfully at:", OUTPUT_PATH)
-else:
-    print("Failed to fetch complexes:", response.status_code)
+if __name__ == "__main__":
+    landed = fetch_complexes()
+    print(f"Complexes data landed as {landed.sha256[:12]} "
+          f"({landed.size} B, {landed.stored_size} B compressed):", landed.path)
@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from instrument import now, stage, trace_sql
+from migrations import migrate
+from live_db import current_path
+
+load_dotenv()
+
+# Fan-out fetcher for the per-id detail endpoints: one request per
+# competitor or competition id in the tables the loads build.
+#   python fetch_details.py competitor_profile [--limit 500]
+#   python fetch_details.py competition_seasons
+# Up to DETAIL_CONCURRENCY requests are in flight, but they start no faster
+# than the API key's quota (a token bucket of DETAIL_QPS per second). A 429
+# pauses the bucket for every worker. Responses go to one writer that
+# inserts and commits them in batches into detail_payloads; each commit is a
+# checkpoint, so a rerun after a crash skips every id already stored. 429s,
+# 5xx and network errors are retried per id with backoff. Ids that still fail
+# are kept in detail_failures and tried again on the next run. The asyncio
+# loop schedules the work; requests run on a thread pool of the same size.
+
+API_ROOT = os.getenv("DETAIL_API_ROOT", "https://api.sportradar.com/tennis/trial/v3/en")
+QPS = float(os.getenv("DETAIL_QPS", "1"))
+BURST = int(os.getenv("DETAIL_BURST", "1"))
+CONCURRENCY = int(os.getenv("DETAIL_CONCURRENCY", "4"))
+RETRIES = int(os.getenv("DETAIL_RETRIES", "4"))
+BACKOFF = float(os.getenv("DETAIL_BACKOFF", "1.0"))
+TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "10"))
+
+# Rows per commit, and the longest a fetched row waits for one
+WRITE_BATCH = 200
+WRITE_INTERVAL = 2.0
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Path under API_ROOT and the ids to fetch it for
+ENDPOINTS = {
+    "competitor_profile": ("/competitors/{id}/profile.json",
+                           "SELECT competitor_id FROM competitors ORDER BY competitor_id"),
+    "competition_seasons": ("/competitions/{id}/seasons.json",
+                            "SELECT competition_id FROM competitions ORDER BY competition_id"),
+}
+
+
+def retry_after_seconds(value):
+    # Retry-After is either seconds or an HTTP date; None when it is neither
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """At most `rate` acquisitions per second on average and `burst` at once."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Callers queue on the lock, so tokens are handed out in arrival order
+        async with self.lock:
+            while True:
+                current = time.monotonic()
+                if current < self.paused_until:
+                    await asyncio.sleep(self.paused_until - current)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (current - self.updated) * self.rate)
+                self.updated = current
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        # The server says the quota is spent: nobody starts a request until then
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        self.updated = self.paused_until
+
+
+class PayloadWriter:
+    """Batches responses into detail_payloads; every commit is a checkpoint."""
+
+    def __init__(self, conn, endpoint, batch_size=WRITE_BATCH, interval=WRITE_INTERVAL):
+        self.conn = conn
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval = interval
+        self.payloads = []
+        self.failures = []
+        self.last_flush = time.monotonic()
+        self.stored = 0
+        self.failed = 0
+
+    def add(self, entity_id, status, body):
+        self.payloads.append((self.endpoint, entity_id, status, body, now()))
+        self._maybe_flush()
+
+    def fail(self, entity_id, attempts, error):
+        self.failures.append((self.endpoint, entity_id, attempts, error, now()))
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        pending = len(self.payloads) + len(self.failures)
+        if pending >= self.batch_size or time.monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.payloads and not self.failures:
+            return
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO detail_payloads VALUES (?, ?, ?, ?, ?)", self.payloads
+            )
+            self.conn.executemany(
+                "DELETE FROM detail_failures WHERE endpoint = ? AND entity_id = ?",
+                ((endpoint, entity_id) for endpoint, entity_id, *_ in self.payloads),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO detail_failures VALUES (?, ?, ?, ?, ?)", self.failures
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.stored += len(self.payloads)
+        self.failed += len(self.failures)
+        self.payloads = []
+        self.failures = []
+
+
+class DetailFetcher:
+    def __init__(self, endpoint, api_key, db_path=None, api_root=API_ROOT, qps=QPS,
+                 burst=BURST, concurrency=CONCURRENCY, retries=RETRIES, backoff=BACKOFF,
+                 timeout=TIMEOUT):
+        path, self.ids_query = ENDPOINTS[endpoint]
+        self.endpoint = endpoint
+        self.url = api_root.rstrip("/") + path
+        self.api_key = api_key
+        self.db_path = db_path or current_path()
+        self.qps = qps
+        self.burst = burst
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.requests = 0
+        self.throttled = 0
+        self.bytes = 0
+
+        # No urllib3 retries here: every attempt has to take a token
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def pending_ids(self, conn, limit=None):
+        # Ids without a stored payload; failures from earlier runs included
+        ids = [row[0] for row in conn.execute(
+            f"""
+            WITH ids(id) AS ({self.ids_query})
+            SELECT id FROM ids WHERE id NOT IN (SELECT entity_id FROM detail_payloads WHERE endpoint = ?)
+            """,
+            (self.endpoint,),
+        )]
+        return ids[:limit] if limit else ids
+
+    def _get(self, entity_id):
+        return self.session.get(self.url.format(id=entity_id), params={"api_key": self.api_key},
+                                timeout=self.timeout)
+
+    async def fetch_one(self, entity_id, bucket, executor, writer):
+        loop = asyncio.get_running_loop()
+        error = None
+        for attempt in range(1, self.retries + 2):
+            await bucket.acquire()
+            self.requests += 1
+            delay = None
+            try:
+                response = await loop.run_in_executor(executor, self._get, entity_id)
+            except requests.RequestException as exc:
+                error = repr(exc)
+            else:
+                self.bytes += len(response.content)
+                # A missing id is an answer too, and is not asked for again
+                if response.status_code in (200, 404):
+                    body = response.text if response.status_code == 200 else None
+                    writer.add(entity_id, response.status_code, body)
+                    return
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                retry_after = response.headers.get("Retry-After")
+                if retry_after is not None:
+                    delay = retry_after_seconds(retry_after)
+                if response.status_code == 429:
+                    self.throttled += 1
+                    bucket.pause(delay if delay is not None else 1 / self.qps)
+
+            if attempt <= self.retries:
+                await asyncio.sleep(
+                    delay if delay is not None else self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                )
+        writer.fail(entity_id, attempt, error)
+
+    async def run(self, ids, writer):
+        bucket = TokenBucket(self.qps, self.burst)
+        queue = iter(ids)
+
+        async def worker():
+            # One loop thread: workers take ids from the shared iterator in turn
+            for entity_id in queue:
+                await self.fetch_one(entity_id, bucket, executor, writer)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    def fetch(self, limit=None):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        trace_sql(conn)
+        # The app keeps reading while the batches commit
+        conn.execute("PRAGMA journal_mode = WAL")
+        migrate(conn)
+        start = time.perf_counter()
+        with stage(f"fetch_details {self.endpoint}") as s:
+            ids = self.pending_ids(conn, limit)
+            writer = PayloadWriter(conn, self.endpoint)
+            try:
+                asyncio.run(self.run(ids, writer))
+            finally:
+                # Whatever was fetched before an error or Ctrl+C is kept
+                writer.flush()
+                conn.close()
+            s.rows = writer.stored
+            s.bytes = self.bytes
+
+        elapsed = time.perf_counter() - start
+        print(
+            f"{self.endpoint}: {len(ids)} ids, {writer.stored} stored, {writer.failed} failed, "
+            f"{self.requests} requests ({self.throttled} throttled) in {elapsed:.1f}s "
+            f"({self.requests / elapsed if elapsed else 0:.1f} req/s)"
+        )
+        return writer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("endpoint", choices=list(ENDPOINTS))
+    parser.add_argument("--limit", type=int, help="fetch at most this many ids")
+    parser.add_argument("--db", default=current_path())
+    args = parser.parse_args()
+
+    api_key = os.getenv("SPORTRADAR_API_KEY")
+    if not api_key:
+        raise ValueError("API key not found")
+
+    fetcher = DetailFetcher(args.endpoint, api_key, db_path=args.db)
+    writer = fetcher.fetch(args.limit)
+    if writer.failed:
+        print(f"{writer.failed} ids failed; rerun to retry them")
+    else:
+        print(f"✅ {args.endpoint} details saved to", args.db)
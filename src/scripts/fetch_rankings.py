@@ -1,30 +1,30 @@
 import os
-import requests
 from dotenv import load_dotenv
+from http_client import get_client
+from instrument import instrumented, stage
+import landing
 
 load_dotenv()
 
-API_KEY = os.getenv("SPORTRADAR_API_KEY")
-if not API_KEY:
-    raise ValueError("API key not found")
 
-URL = os.getenv("RANKINGS_URL")
-if not URL:
-    raise ValueError("URL not found")
+def request_rankings():
+    # Checked here rather than at import, so modules that only import the
+    # parsers (benches, checks) run without the API settings
+    api_key = os.getenv("SPORTRADAR_API_KEY")
+    if not api_key:
+        raise ValueError("API key not found")
+    url = os.getenv("RANKINGS_URL")
+    if not url:
+        raise ValueError("URL not found")
+    with stage("request_rankings") as s:
+        response = get_client().get(url, params={"api_key": api_key})
+        s.bytes = response.size
+        return landing.land("rankings", response)
 
 
+@instrumented()
 def fetch_rankings():
-    try:
-        response = requests.get(URL, params={"api_key": API_KEY}, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-
-        if isinstance(data.get("rankings"), list):
-            return data["rankings"]
-
-        return []
-
-    except requests.exceptions.RequestException as e:
-        print("API error:", e)
-        return []
+    # Returns the landed body as a (decompressing) binary stream so it can be parsed
+    # incrementally. Errors propagate: an empty list would look like a real
+    # (empty) ranking to the loader.
+    return request_rankings().open()
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import random
+
+# Synthetic feeds in the shapes the loaders consume, at any multiple of the
+# trial API snapshot (about 950 ranked competitors, 6.4k competitions, 750
+# complexes and 3.8k venues):
+#   competitions.json -> parse_competitions / insert_data.py
+#   complexes.json    -> insert_complexes_venues.py
+#   rankings.json     -> parse_rankings / insert_rankings.py
+#   python gen_synthetic.py --scale 100 --out /tmp/synthetic
+#   python gen_synthetic.py --rankings 1000000 --venues 200000 --out /tmp/synthetic
+
+BASE_COUNTS = {
+    "categories": 18,
+    "competitions": 6447,
+    "complexes": 752,
+    "venues": 3846,
+    "rankings": 948,
+}
+
+COUNTRIES = [
+    ("Spain", "ESP", "Europe/Madrid"), ("France", "FRA", "Europe/Paris"),
+    ("Italy", "ITA", "Europe/Rome"), ("Germany", "DEU", "Europe/Berlin"),
+    ("Great Britain", "GBR", "Europe/London"), ("United States", "USA", "America/New_York"),
+    ("Argentina", "ARG", "America/Argentina/Buenos_Aires"), ("Brazil", "BRA", "America/Sao_Paulo"),
+    ("Chile", "CHL", "America/Santiago"), ("Australia", "AUS", "Australia/Melbourne"),
+    ("Japan", "JPN", "Asia/Tokyo"), ("China", "CHN", "Asia/Shanghai"),
+    ("India", "IND", "Asia/Kolkata"), ("Czechia", "CZE", "Europe/Prague"),
+    ("Serbia", "SRB", "Europe/Belgrade"), ("Croatia", "HRV", "Europe/Zagreb"),
+    ("Poland", "POL", "Europe/Warsaw"), ("Russia", "RUS", "Europe/Moscow"),
+    ("Canada", "CAN", "America/Toronto"), ("Mexico", "MEX", "America/Mexico_City"),
+    ("Netherlands", "NLD", "Europe/Amsterdam"), ("Belgium", "BEL", "Europe/Brussels"),
+    ("Switzerland", "CHE", "Europe/Zurich"), ("Austria", "AUT", "Europe/Vienna"),
+    ("Sweden", "SWE", "Europe/Stockholm"), ("Norway", "NOR", "Europe/Oslo"),
+    ("Greece", "GRC", "Europe/Athens"), ("Turkey", "TUR", "Europe/Istanbul"),
+    ("Egypt", "EGY", "Africa/Cairo"), ("South Africa", "ZAF", "Africa/Johannesburg"),
+    ("Tunisia", "TUN", "Africa/Tunis"), ("Kazakhstan", "KAZ", "Asia/Almaty"),
+    ("Korea, Republic of", "KOR", "Asia/Seoul"), ("Portugal", "PRT", "Europe/Lisbon"),
+    ("Colombia", "COL", "America/Bogota"), ("Ukraine", "UKR", "Europe/Kyiv"),
+]
+
+SYLLABLES = ["ka", "ro", "li", "na", "vic", "dal", "mar", "tin", "sa", "cek", "mül",
+             "ber", "go", "va", "ri", "kov", "sen", "zo", "ler", "ba", "ni", "te",
+             "ša", "jo", "ham", "der", "is", "pel", "wa", "mu", "ci", "fa", "ló", "pez"]
+
+CATEGORY_NAMES = ["ATP", "WTA", "ITF Men", "ITF Women", "Challenger", "Davis Cup",
+                  "Billie Jean King Cup", "Juniors", "Exhibition", "Wheelchairs",
+                  "UTR Men", "UTR Women", "Hopman Cup", "United Cup", "Laver Cup",
+                  "Olympics", "Beach Tennis", "Legends"]
+
+RANKING_GROUPS = [
+    ("ATP", "men", 1), ("WTA", "women", 2), ("ATP Doubles", "men", 3), ("WTA Doubles", "women", 4),
+]
+
+
+def scaled_counts(scale=1.0, **overrides):
+    counts = {name: max(1, int(count * scale)) for name, count in BASE_COUNTS.items()}
+    counts["categories"] = min(counts["categories"], 500)
+    counts["complexes"] = min(counts["complexes"], counts["venues"])
+    counts.update({name: value for name, value in overrides.items() if value})
+    return counts
+
+
+def word(rng, syllables):
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def write_items(path, head, items, tail="]}"):
+    # Items are written as they are generated, so memory stays flat at any scale
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(head)
+        for i, item in enumerate(items):
+            if i:
+                f.write(",")
+            json.dump(item, f, ensure_ascii=False)
+        f.write(tail)
+
+
+def category_name(i):
+    base = CATEGORY_NAMES[i % len(CATEGORY_NAMES)]
+    return base if i < len(CATEGORY_NAMES) else f"{base} {i // len(CATEGORY_NAMES) + 1}"
+
+
+def competitions(rng, counts):
+    for i in range(counts["competitions"]):
+        category = i % counts["categories"]
+        item = {
+            "id": f"sr:competition:{i + 1}",
+            "name": f"{word(rng, 2)} {rng.choice(['Open', 'Cup', 'Masters', 'Challenger'])}"
+                    f" {rng.choice(['Singles', 'Doubles', 'Mixed'])}",
+            "type": rng.choice(["singles", "doubles", "mixed"]),
+            "gender": rng.choice(["men", "women", "mixed"]),
+            "category": {"id": f"sr:category:{category + 1}", "name": category_name(category)},
+        }
+        # About a third are qualifying or sub-draws of an earlier competition
+        if i and rng.random() < 0.33:
+            item["parent_id"] = f"sr:competition:{rng.randint(1, i)}"
+        yield item
+
+
+def complexes(rng, counts):
+    per_complex, extra = divmod(counts["venues"], counts["complexes"])
+    venue_id = 0
+    for i in range(counts["complexes"]):
+        country, code, tz = rng.choice(COUNTRIES)
+        city = word(rng, 2)
+        venues = []
+        for j in range(per_complex + (1 if i < extra else 0)):
+            venue_id += 1
+            venues.append({
+                "id": f"sr:venue:{venue_id}",
+                "name": "Center Court" if j == 0 else f"Court {j}",
+                "city_name": city,
+                "country_name": country.upper(),
+                "country_code": code,
+                "timezone": tz,
+            })
+        yield {"id": f"sr:complex:{i + 1}", "name": f"{city} Tennis Club", "venues": venues}
+
+
+def ranking_group(rng, name, gender, type_id, start, rows):
+    items = []
+    for rank in range(1, rows + 1):
+        country, code, _ = rng.choice(COUNTRIES)
+        last = word(rng, 3)
+        items.append({
+            "rank": rank,
+            "movement": rng.randint(-20, 20) if rng.random() < 0.6 else 0,
+            "points": max(1, int(12000 / rank ** 0.6)),
+            "competitions_played": rng.randint(1, 30),
+            "competitor": {
+                "id": f"sr:competitor:{start + rank}",
+                "name": f"{last}, {word(rng, 2)}",
+                "country": country,
+                "country_code": code,
+                "abbreviation": last[:3].upper(),
+            },
+        })
+    return {"type_id": type_id, "name": name, "gender": gender, "competitor_rankings": items}
+
+
+def ranking_groups(rng, counts):
+    total = counts["rankings"]
+    start = 0
+    for g, (name, gender, type_id) in enumerate(RANKING_GROUPS):
+        rows = total // len(RANKING_GROUPS) + (1 if g < total % len(RANKING_GROUPS) else 0)
+        # One group at a time is held in memory
+        yield ranking_group(rng, name, gender, type_id, start, rows)
+        start += rows
+
+
+def generate(out_dir, scale=1.0, seed=7, **overrides):
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    counts = scaled_counts(scale, **overrides)
+    paths = {
+        "competitions": os.path.join(out_dir, "competitions.json"),
+        "complexes": os.path.join(out_dir, "complexes.json"),
+        "rankings": os.path.join(out_dir, "rankings.json"),
+    }
+    stamp = '"generated_at": "2026-01-21T12:51:17+00:00"'
+
+    write_items(paths["competitions"], f"{{{stamp}, \"competitions\": [", competitions(rng, counts))
+    write_items(paths["complexes"], f"{{{stamp}, \"complexes\": [", complexes(rng, counts))
+    write_items(paths["rankings"], f"{{{stamp}, \"rankings\": [", ranking_groups(rng, counts))
+    return paths, counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", required=True, help="directory to write the three payloads to")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiple of the trial snapshot's row counts")
+    parser.add_argument("--seed", type=int, default=7)
+    for name in BASE_COUNTS:
+        parser.add_argument(f"--{name}", type=int, help=f"exact number of {name}")
+    args = parser.parse_args()
+
+    paths, counts = generate(args.out, args.scale, args.seed,
+                             **{name: getattr(args, name) for name in BASE_COUNTS})
+    for name, path in paths.items():
+        print(f"{name}: {os.path.getsize(path) / 1e6:.1f} MB -> {path}")
+    print("✅ Synthetic payloads written:", counts)
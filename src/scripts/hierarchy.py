@@ -0,0 +1,132 @@
+# Closure table for the competitions.parent_id tree. Every competition (and
+# every parent_id that points outside the feed) has one row per ancestor,
+# itself included at depth 0, so a subtree, the path to the root or the root
+# itself is one range lookup on an index whatever the depth:
+#   subtree:   WHERE ancestor_id = ?    (primary key)
+#   ancestors: WHERE descendant_id = ?  (idx_closure_descendant)
+# A load links in the competitions it adds. One that is re-parented or
+# deleted (sync.py) is first unlinked from its old ancestors, subtree and all.
+
+CLOSURE_TABLE = [
+    """
+    CREATE TABLE IF NOT EXISTS competition_closure (
+        ancestor_id TEXT NOT NULL,
+        descendant_id TEXT NOT NULL,
+        depth INT NOT NULL,
+        PRIMARY KEY (ancestor_id, depth, descendant_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_closure_descendant
+    ON competition_closure(descendant_id, depth, ancestor_id)
+    """,
+]
+
+# Every ancestor of the parent (itself included) gains every descendant of
+# the child (itself included). An edge that would close a cycle is skipped.
+LINK_EDGE = """
+INSERT OR IGNORE INTO competition_closure (ancestor_id, descendant_id, depth)
+SELECT a.ancestor_id, d.descendant_id, a.depth + 1 + d.depth
+FROM competition_closure a, competition_closure d
+WHERE a.descendant_id = :parent AND d.ancestor_id = :child
+  AND NOT EXISTS (
+      SELECT 1 FROM competition_closure
+      WHERE descendant_id = :parent AND ancestor_id = :child
+  )
+"""
+
+# Paths from the node's strict ancestors into its subtree
+UNLINK_NODE = """
+DELETE FROM competition_closure
+WHERE descendant_id IN (SELECT descendant_id FROM competition_closure WHERE ancestor_id = :node)
+  AND ancestor_id IN (
+      SELECT ancestor_id FROM competition_closure WHERE descendant_id = :node AND depth > 0
+  )
+"""
+
+SUBTREE_QUERY = """
+SELECT h.descendant_id AS competition_id, c.competition_name, c.type, c.gender, h.depth
+FROM competition_closure h
+LEFT JOIN competitions c ON c.competition_id = h.descendant_id
+WHERE h.ancestor_id = ?
+ORDER BY h.depth, h.descendant_id
+"""
+
+# Root first, the competition itself last
+ANCESTORS_QUERY = """
+SELECT h.ancestor_id AS competition_id, c.competition_name, h.depth
+FROM competition_closure h
+LEFT JOIN competitions c ON c.competition_id = h.ancestor_id
+WHERE h.descendant_id = ?
+ORDER BY h.depth DESC
+"""
+
+ROOT_QUERY = """
+SELECT ancestor_id FROM competition_closure
+WHERE descendant_id = ?
+ORDER BY depth DESC
+LIMIT 1
+"""
+
+
+def create_hierarchy(conn):
+    # Migration step: create the closure table and build it from competitions
+    for statement in CLOSURE_TABLE:
+        conn.execute(statement)
+    conn.execute("DELETE FROM competition_closure")
+    link_competitions(conn, conn.execute(
+        "SELECT competition_id, parent_id FROM competitions"
+    ).fetchall())
+
+
+def link_competitions(conn, competitions):
+    # competitions: (competition_id, parent_id) pairs newly inserted by a load.
+    # A parent that arrives after its children is linked above them then.
+    competitions = list(competitions)
+    nodes = {cid for cid, _ in competitions}
+    nodes.update(parent for _, parent in competitions if parent)
+    # In key order, so the rows are appended rather than scattered over the B-tree
+    conn.executemany(
+        "INSERT OR IGNORE INTO competition_closure VALUES (?, ?, 0)",
+        ((node, node) for node in sorted(nodes)),
+    )
+    conn.executemany(LINK_EDGE, (
+        {"parent": parent, "child": cid} for cid, parent in competitions if parent
+    ))
+    return len(competitions)
+
+
+def unlink_competitions(conn, competition_ids):
+    # Before re-linking updated competitions or dropping deleted ones
+    competition_ids = list(competition_ids)
+    parents = set()
+    for cid in competition_ids:
+        parents.update(row[0] for row in conn.execute(
+            "SELECT ancestor_id FROM competition_closure WHERE descendant_id = ? AND depth = 1",
+            (cid,),
+        ))
+    conn.executemany(UNLINK_NODE, ({"node": cid} for cid in competition_ids))
+
+    # Nodes neither in competitions nor referenced as a parent any more
+    conn.executemany(
+        """
+        DELETE FROM competition_closure
+        WHERE ancestor_id = :node AND depth = 0 AND descendant_id = :node
+          AND NOT EXISTS (SELECT 1 FROM competitions WHERE competition_id = :node)
+          AND NOT EXISTS (SELECT 1 FROM competitions WHERE parent_id = :node)
+        """,
+        ({"node": node} for node in parents.union(competition_ids)),
+    )
+
+
+def subtree(conn, competition_id):
+    return conn.execute(SUBTREE_QUERY, (competition_id,)).fetchall()
+
+
+def ancestors(conn, competition_id):
+    return conn.execute(ANCESTORS_QUERY, (competition_id,)).fetchall()
+
+
+def root(conn, competition_id):
+    row = conn.execute(ROOT_QUERY, (competition_id,)).fetchone()
+    return row[0] if row else None
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Response cache settings (override in .env)
+CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(BASE_DIR, ".http_cache"))
+CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", "3600"))
+TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "10"))
+RETRIES = int(os.getenv("HTTP_RETRIES", "5"))
+BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CHUNK_SIZE = 64 * 1024
+
+
+class CachedResponse:
+    # A response body stored on disk. `changed` is False when it came from
+    # the cache or a 304, so callers can skip parsing an unchanged feed.
+
+    def __init__(self, url, path, source, status, elapsed, size=0, body_size=0):
+        self.url = url
+        self.path = path
+        self.source = source
+        self.status = status
+        self.elapsed = elapsed
+        # Bytes transferred for this response, before any Content-Encoding is
+        # decoded (0 when served from the cache), and the decoded body's size
+        self.size = size
+        self.body_size = body_size
+
+    @property
+    def changed(self):
+        return self.source == "network"
+
+    def open(self):
+        return open(self.path, "rb")
+
+    def json(self):
+        with self.open() as f:
+            return json.load(f)
+
+
+class HttpClient:
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL, timeout=TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, pool_size=POOL_SIZE):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self.timings = []
+        self._lock = threading.Lock()
+
+        # Bounded exponential backoff on 429/5xx, honouring Retry-After
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url, params):
+        key = hashlib.sha256(
+            (url + json.dumps(params or {}, sort_keys=True)).encode()
+        ).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".json"
+
+    def _record(self, url, source, status, start, size=0, body_size=0):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.timings.append({
+                "url": url,
+                "source": source,
+                "status": status,
+                "seconds": elapsed,
+                "bytes": size,
+                "body_bytes": body_size,
+            })
+        return elapsed
+
+    def get(self, url, params=None):
+        start = time.perf_counter()
+        body_path, meta_path = self._paths(url, params)
+
+        meta = None
+        if os.path.exists(meta_path) and os.path.exists(body_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+
+        # Fresh enough: no request at all
+        if meta and time.time() - meta["fetched_at"] < self.ttl:
+            elapsed = self._record(url, "cache", meta["status"], start)
+            return CachedResponse(url, body_path, "cache", meta["status"], elapsed)
+
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = self.session.get(url, params=params, headers=headers,
+                                    timeout=self.timeout, stream=True)
+
+        # Unchanged upstream: keep the cached body, restart the TTL
+        if response.status_code == 304 and meta:
+            response.close()
+            meta["fetched_at"] = time.time()
+            self._write_meta(meta_path, meta)
+            elapsed = self._record(url, "not_modified", 304, start)
+            return CachedResponse(url, body_path, "not_modified", meta["status"], elapsed)
+
+        response.raise_for_status()
+
+        body_size = 0
+        tmp_path = body_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                body_size += len(chunk)
+        os.replace(tmp_path, body_path)
+        # iter_content yields decoded bytes; urllib3 counts what came off the wire
+        size = response.raw.tell()
+
+        self._write_meta(meta_path, {
+            "url": url,
+            "status": response.status_code,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        })
+        elapsed = self._record(url, "network", response.status_code, start, size, body_size)
+        return CachedResponse(url, body_path, "network", response.status_code, elapsed, size, body_size)
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def stats(self):
+        # Request count, total and slowest time per source (network/not_modified/cache)
+        summary = {}
+        with self._lock:
+            timings = list(self.timings)
+        for t in timings:
+            s = summary.setdefault(t["source"], {"requests": 0, "seconds": 0.0,
+                                                 "max_seconds": 0.0, "bytes": 0,
+                                                 "body_bytes": 0})
+            s["requests"] += 1
+            s["seconds"] += t["seconds"]
+            s["max_seconds"] = max(s["max_seconds"], t["seconds"])
+            s["bytes"] += t["bytes"]
+            s["body_bytes"] += t["body_bytes"]
+        return summary
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    # One pooled client per process, shared by every fetch_* script
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -1,52 +1,59 @@
-import json
-import sqlite3
-import os
-
-# Base directory = src/scripts
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# DB is also inside src/scripts
-DB_PATH = os.path.join(BASE_DIR, "competition.db")
-
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
-
-# Load complexes JSON (also in src/scripts)
-with open(os.path.join(BASE_DIR, "complexes.json"), "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-for c in data.get("complexes", []):
-    complex_id = c.get("id")
-    complex_name = c.get("name")
-
-    venues = c.get("venues", [])
-
-    country = None
-    timezone = None
-    if venues:
-        country = venues[0].get("country_name")
-        timezone = venues[0].get("timezone")
-
-    cursor.execute(
-        """
-        INSERT OR IGNORE INTO complexes
-        (complex_id, complex_name, country, timezone)
-        VALUES (?, ?, ?, ?)
-        """,
-        (complex_id, complex_name, country, timezone)
-    )
-
-    for v in venues:
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO venues
-            (venue_id, venue_name, complex_id)
-            VALUES (?, ?, ?)
-            """,
-            (v.get("id"), v.get("name"), complex_id)
-        )
-
-conn.commit()
-conn.close()
-
-print("Complexes & venues inserted into src/scripts/competition.db")
+from bulk_load import Stage, load_session
+from sync import sync
+from countries import CountryKeys
+import instrument
+from stream_json import iter_items
+from aggregates import refresh_kpis, refresh_venue_counts
+import landing
+
+COMPLEX_COLUMNS = ["complex_id", "complex_name", "country", "timezone", "country_key"]
+VENUE_COLUMNS = ["venue_id", "venue_name", "complex_id"]
+
+
+def insert_complexes(db_path=None, fp=None):
+    # fp: a complexes payload; by default the latest one in the landing store
+    if fp is None:
+        with landing.find("complexes").open() as f:
+            return insert_complexes(db_path, f)
+
+    with instrument.stage("insert_complexes") as s:
+        with load_session(db_path) as conn:
+            complexes = Stage(conn, "complexes", COMPLEX_COLUMNS)
+            venues = Stage(conn, "venues", VENUE_COLUMNS)
+            country_keys = CountryKeys(conn, title_case=True)
+
+            # One complex at a time; the file is never loaded whole
+            for _, c in iter_items(fp, ("complexes", "*")):
+                complex_id = c.get("id")
+                complex_venues = c.get("venues", [])
+
+                country = None
+                timezone = None
+                country_key = None
+                if complex_venues:
+                    country = complex_venues[0].get("country_name")
+                    timezone = complex_venues[0].get("timezone")
+                    country_key = country_keys.key(complex_venues[0].get("country_code"), country)
+
+                complexes.add((complex_id, c.get("name"), country, timezone, country_key))
+                for v in complex_venues:
+                    venues.add((v.get("id"), v.get("name"), complex_id))
+
+            complexes_result = sync(complexes)
+            venues_result = sync(venues)
+
+            # Complexes that were added, changed or removed, and those that
+            # gained or lost a venue, need their counts refreshed
+            touched = {row["complex_id"] for row in
+                       complexes_result.changed + complexes_result.previous
+                       + venues_result.changed + venues_result.previous}
+
+            refresh_venue_counts(conn, touched)
+            refresh_kpis(conn)
+            s.rows = complexes.rows + venues.rows
+
+    print("Complexes & venues inserted into src/scripts/competition.db")
+
+
+if __name__ == "__main__":
+    insert_complexes()
@@ -1,59 +1,41 @@
-import sqlite3, os
 from parse_competitions import parse_competitions
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "competition.db")
-
-def create_tables(cursor):
-    cursor.executescript("""
-    CREATE TABLE IF NOT EXISTS categories (
-        category_id TEXT PRIMARY KEY,
-        category_name TEXT NOT NULL
-    );
-
-    CREATE TABLE IF NOT EXISTS competitions (
-        competition_id TEXT PRIMARY KEY,
-        competition_name TEXT NOT NULL,
-        parent_id TEXT,
-        type TEXT,
-        gender TEXT,
-        category_id TEXT,
-        FOREIGN KEY (category_id) REFERENCES categories(category_id)
-    );
-    """)
-
-def insert_data():
-    categories, competitions = parse_competitions()
-
-    # IMPORTANT: use DB_PATH
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    create_tables(cursor)
-
-    for cat_id, cat_name in categories.items():
-        cursor.execute(
-            "INSERT OR IGNORE INTO categories VALUES (?, ?)",
-            (cat_id, cat_name)
-        )
-
-    for comp in competitions:
-        cursor.execute(
-            """INSERT OR IGNORE INTO competitions
-            (competition_id, competition_name, parent_id, type, gender, category_id)
-            VALUES (?, ?, ?, ?, ?, ?)""",
-            (
-                comp["competition_id"],
-                comp["competition_name"],
-                comp["parent_id"],
-                comp["type"],
-                comp["gender"],
-                comp["category_id"]
+from bulk_load import Stage, load_session
+from hierarchy import link_competitions, unlink_competitions
+from sync import sync
+import instrument
+
+CATEGORY_COLUMNS = ["category_id", "category_name"]
+COMPETITION_COLUMNS = [
+    "competition_id", "competition_name", "parent_id", "type", "gender", "category_id"
+]
+
+def insert_data(db_path=None, fp=None):
+    with instrument.stage("insert_competitions") as s:
+        categories, competitions = parse_competitions(fp)
+
+        with load_session(db_path) as conn:
+            stage = Stage(conn, "categories", CATEGORY_COLUMNS)
+            stage.extend(categories.items())
+            sync(stage)
+            rows = stage.rows
+
+            stage = Stage(conn, "competitions", COMPETITION_COLUMNS)
+            stage.extend(
+                tuple(comp[col] for col in COMPETITION_COLUMNS) for comp in competitions
+            )
+            result = sync(stage)
+            rows += stage.rows
+
+            # Re-parented and deleted competitions leave their old place in
+            # the hierarchy; new and updated ones are linked at their new one
+            if result.previous:
+                unlink_competitions(conn, [row["competition_id"] for row in result.previous])
+            linked = link_competitions(
+                conn, [(row["competition_id"], row["parent_id"]) for row in result.changed]
             )
-        )
+            print(f"Hierarchy: {linked} competitions linked")
+        s.rows = rows
 
-    conn.commit()
-    conn.close()
     print("✅ DATA INSERTED INTO src/scripts/competition.db")
 
 if __name__ == "__main__":
@@ -1,86 +1,148 @@
-import sqlite3, os
-from parse_rankings import parse_rankings
+import time
+from parse_rankings import iter_rankings
+from bulk_load import Stage, load_session, report
+from aggregates import refresh_country_stats, refresh_kpis
+from search import index_new_competitors
+from countries import CountryKeys
+from leaderboards import RankingLists, refresh_leaderboard
+import instrument
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "competition.db")
+COMPETITOR_COLUMNS = ["competitor_id", "name", "country", "country_code", "abbreviation", "country_key"]
+RANKING_COLUMNS = ["rank", "movement", "points", "competitions_played", "competitor_id", "list_key"]
 
-def create_tables(cursor):
-    cursor.executescript(
-        """
-    CREATE TABLE IF NOT EXISTS competitors (
-        competitor_id VARCHAR(50) PRIMARY KEY,
-        name VARCHAR(100) NOT NULL,
-        country VARCHAR(100) NOT NULL,
-        country_code CHAR(3) NOT NULL,
-        abbreviation VARCHAR(100) NOT NULL
-    );
+def insert_data(db_path=None, fp=None):
+    with instrument.stage("insert_rankings") as s:
+        with load_session(db_path) as conn:
+            competitors = Stage(conn, "competitors", COMPETITOR_COLUMNS)
+            rankings = Stage(conn, "competitor_rankings", RANKING_COLUMNS)
+            country_keys = CountryKeys(conn, rename=True)
+            ranking_lists = RankingLists(conn)
+            generated_at = None
 
-    CREATE TABLE IF NOT EXISTS competitor_rankings (
-        rank_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        rank INT NOT NULL,
-        movement INT NOT NULL,
-        points INT NOT NULL,
-        competitions_played INT NOT NULL,
-        competitor_id VARCHAR(50) NOT NULL,
-        FOREIGN KEY (competitor_id) REFERENCES competitors(competitor_id)
-    );
-    """
-    )
+            # Rows go to the staging tables in batches as the feed streams in
+            for competitor, ranking in iter_rankings(fp):
+                competitor["country_key"] = country_keys.key(competitor["country_code"], competitor["country"])
+                ranking["list_key"] = ranking_lists.key(
+                    ranking["list_name"], ranking["list_type"], ranking["list_gender"])
+                competitors.add(tuple(competitor[col] for col in COMPETITOR_COLUMNS))
+                rankings.add(tuple(ranking[col] for col in RANKING_COLUMNS))
+                generated_at = ranking["generated_at"]
 
-def insert_data():
-    competitors, rankings = parse_rankings()
-    print(f"Total competitors: {len(competitors)}, Total rankings: {len(rankings)}")
+            rankings.flush()
+            s.rows = rankings.rows
+            print(f"Total rankings: {rankings.rows}")
 
-    # IMPORTANT: use DB_PATH
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+            # An empty feed would close every current row
+            if rankings.rows == 0:
+                print("No rankings received, snapshot skipped")
+                return
 
-    # Enable foreign keys
-    cursor.execute("PRAGMA foreign_keys = ON;")
+            last_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM competitors").fetchone()[0]
+            competitors.load_into()
+            print(f"Search index: {index_new_competitors(conn, last_rowid)} competitors added")
+            snapshot_id, changed = store_snapshot(conn, rankings, generated_at)
 
-    create_tables(cursor)
+    print(f"✅ Snapshot {snapshot_id}: {changed} changed rankings inserted into src/scripts/competition.db")
 
-    # Insert competitors
-    for comp in competitors.values():
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO competitors
-            (competitor_id, name, country, country_code, abbreviation)
-            VALUES (?, ?, ?, ?, ?)
-        """,
-            (
-                comp["competitor_id"],
-                comp["name"],
-                comp["country"],
-                comp["country_code"],
-                comp["abbreviation"],
-            ),
-        )
+def store_snapshot(conn, rankings, generated_at):
+    # A competitor has one current row per ranking list. Only rankings that
+    # differ from that row are stored; replaced rows and rankings missing
+    # from the feed get valid_to set.
+    start = time.perf_counter()
 
-    # Insert rankings
-    for r in rankings:
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO competitor_rankings
-            (rank, movement, points, competitions_played, competitor_id)
-            SELECT ?, ?, ?, ?, ?
-            WHERE EXISTS (
-                SELECT 1 FROM competitors WHERE competitor_id = ?
-            )
-        """,
-            (
-                r["rank"],
-                r["movement"],
-                r["points"],
-                r["competitions_played"],
-                r["competitor_id"],
-                r["competitor_id"],
-            ),
+    snapshot_id = conn.execute(
+        "INSERT INTO ranking_snapshots (generated_at, ingested_at, rows_seen) VALUES (?, ?, ?)",
+        (generated_at, instrument.now(), rankings.rows),
+    ).lastrowid
+
+    # First row per competitor and list; rankings for unknown competitors are dropped by the join
+    conn.execute(
+        """
+        CREATE TEMP TABLE feed AS
+        SELECT s.rank, s.movement, s.points, s.competitions_played, s.competitor_id, s.list_key
+        FROM temp.stage_competitor_rankings s
+        JOIN competitors c ON c.competitor_id = s.competitor_id
+        WHERE s.rowid IN (
+            SELECT MIN(rowid) FROM temp.stage_competitor_rankings GROUP BY competitor_id, list_key
+        )
+        """
+    )
+    conn.execute("CREATE INDEX temp.idx_feed_key ON feed(competitor_id, list_key)")
+    conn.execute(
+        """
+        CREATE TEMP TABLE changed AS
+        SELECT f.*
+        FROM temp.feed f
+        LEFT JOIN competitor_rankings_latest cur
+        ON cur.competitor_id = f.competitor_id AND cur.list_key IS f.list_key
+        WHERE cur.rank_id IS NULL
+           OR cur.rank IS NOT f.rank
+           OR cur.points IS NOT f.points
+           OR cur.movement IS NOT f.movement
+           OR cur.competitions_played IS NOT f.competitions_played
+        """
+    )
+    # Current rows this snapshot replaces or closes: every one the feed does
+    # not repeat unchanged under the same competitor and list
+    conn.execute(
+        """
+        CREATE TEMP TABLE closed AS
+        SELECT cur.rank_id, cur.competitor_id
+        FROM competitor_rankings_latest cur
+        WHERE NOT EXISTS (
+            SELECT 1 FROM temp.feed f
+            WHERE f.competitor_id = cur.competitor_id AND f.list_key IS cur.list_key
+              AND f.rank IS cur.rank AND f.points IS cur.points
+              AND f.movement IS cur.movement AND f.competitions_played IS cur.competitions_played
         )
+        """
+    )
+    # Competitors whose current rows are replaced or closed by this snapshot
+    conn.execute(
+        """
+        CREATE TEMP TABLE touched AS
+        SELECT competitor_id FROM temp.changed
+        UNION
+        SELECT competitor_id FROM temp.closed
+        """
+    )
+    conn.execute(
+        "UPDATE competitor_rankings SET valid_to = ? WHERE rank_id IN (SELECT rank_id FROM temp.closed)",
+        (snapshot_id,),
+    )
+    changed = conn.execute(
+        """
+        INSERT INTO competitor_rankings
+        (rank, movement, points, competitions_played, competitor_id, list_key, snapshot_id)
+        SELECT rank, movement, points, competitions_played, competitor_id, list_key, ?
+        FROM temp.changed
+        """,
+        (snapshot_id,),
+    ).rowcount
+    conn.execute(
+        "UPDATE ranking_snapshots SET rows_changed = ? WHERE snapshot_id = ?",
+        (changed, snapshot_id),
+    )
+
+    # Only the countries of touched competitors are re-aggregated
+    countries = [row[0] for row in conn.execute(
+        """
+        SELECT DISTINCT country_key FROM competitors
+        WHERE competitor_id IN (SELECT competitor_id FROM temp.touched)
+        """
+    )]
+    refresh_country_stats(conn, countries)
+    refresh_kpis(conn)
+    # Top-K index: only the touched competitors' rows are rewritten
+    touched = [row[0] for row in conn.execute("SELECT competitor_id FROM temp.touched")]
+    refresh_leaderboard(conn, touched)
+
+    for table in ("feed", "changed", "closed", "touched", "stage_competitor_rankings"):
+        conn.execute(f"DROP TABLE temp.{table}")
 
-    conn.commit()
-    conn.close()
-    print("✅ Competitor rankings inserted into src/scripts/competition.db")
+    elapsed = rankings.elapsed + time.perf_counter() - start
+    report("competitor_rankings", rankings.rows, changed, elapsed)
+    return snapshot_id, changed
 
 if __name__ == "__main__":
     insert_data()
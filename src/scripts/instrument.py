@@ -0,0 +1,257 @@
+import functools
+import json
+import os
+import re
+import resource
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Stage timing and SQL tracing for the pipeline scripts and the dashboard.
+#
+#   with stage("insert_rankings") as s:      # or @instrumented("insert_rankings")
+#       ...
+#       s.rows += n
+#
+# Every finished stage appends one JSON line to METRICS_PATH with its wall
+# time, rows, bytes downloaded and peak memory. Connections passed to
+# trace_sql() report each statement they run to the stage active in the
+# calling thread; the statement totals are written when the outermost stage
+# of that thread finishes. The dashboard's Performance page reads the file.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS_PATH = os.getenv("METRICS_PATH", os.path.join(BASE_DIR, "metrics.jsonl"))
+ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# tracemalloc slows Python down noticeably, so allocation peaks are opt-in;
+# otherwise peak memory is the process high-water mark (ru_maxrss)
+TRACE_MEMORY = os.getenv("METRICS_TRACEMALLOC", "0") == "1"
+MAX_BYTES = int(os.getenv("METRICS_MAX_BYTES", str(10 * 1024 * 1024)))
+# The progress handler runs every this many SQLite VM instructions
+PROGRESS_STEPS = 10000
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+LITERALS = re.compile(r"'[^']*(?:''[^']*)*'|(?<![\w.])\d[\d.]*|(?:(?<=[(,])|(?<=[(,] ))NULL\b")
+
+
+def now(timespec="seconds"):
+    # UTC ISO-8601 timestamp, as stored by the loads and the metrics file
+    return datetime.now(timezone.utc).isoformat(timespec=timespec)
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current_stage():
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def write(record):
+    if not ENABLED:
+        return
+    line = json.dumps(record, default=str) + "\n"
+    with _write_lock:
+        # One previous file is kept as metrics.jsonl.1
+        if os.path.exists(METRICS_PATH) and os.path.getsize(METRICS_PATH) > MAX_BYTES:
+            os.replace(METRICS_PATH, METRICS_PATH + ".1")
+        with open(METRICS_PATH, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class StageRecord:
+    """One timed unit of work; rows and bytes are filled in by the caller."""
+
+    def __init__(self, name, **fields):
+        self.name = name
+        self.fields = fields
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.peak_bytes = 0
+        self.parent = None
+        self.sql = {}
+        self.tracers = set()
+        self._start = None
+        self._traced_memory = False
+
+    def start(self):
+        stack = _stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        if TRACE_MEMORY and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._traced_memory = True
+        if TRACE_MEMORY:
+            # Keep the parent's peak so far before the counter is reset
+            if self.parent is not None:
+                self.parent.peak_bytes = max(self.parent.peak_bytes, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def finish(self, error=None):
+        self.seconds = time.perf_counter() - self._start
+        for tracer in self.tracers:
+            if tracer.owner is self:
+                tracer.close()
+        if TRACE_MEMORY:
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if self._traced_memory:
+                tracemalloc.stop()
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+        write({
+            "ts": now("milliseconds"),
+            "kind": "stage",
+            "name": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "seconds": round(self.seconds, 6),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "peak_alloc_mb": round(self.peak_bytes / 1e6, 2) if TRACE_MEMORY else None,
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "error": repr(error) if error else None,
+            **self.fields,
+        })
+
+        if self.parent is not None:
+            # Allocation peaks and statements roll up into the enclosing stage
+            self.parent.peak_bytes = max(self.parent.peak_bytes, self.peak_bytes)
+            for statement, (count, total, longest) in self.sql.items():
+                merged = self.parent.sql.setdefault(statement, [0, 0.0, 0.0])
+                merged[0] += count
+                merged[1] += total
+                merged[2] = max(merged[2], longest)
+        else:
+            for statement, (count, total, longest) in self.sql.items():
+                write({
+                    "ts": now("milliseconds"),
+                    "kind": "sql",
+                    "stage": self.name,
+                    "statement": statement,
+                    "count": count,
+                    "seconds": round(total, 6),
+                    "max_seconds": round(longest, 6),
+                })
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        # Control flow such as Streamlit's st.rerun() is not an error
+        self.finish(exc if isinstance(exc, Exception) else None)
+        return False
+
+
+def stage(name, **fields):
+    return StageRecord(name, **fields)
+
+
+def instrumented(name=None):
+    # Decorator form of stage(); the stage is named after the function by default
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def normalize(sql):
+    # Literals become ? so one statement shape is counted once
+    return " ".join(LITERALS.sub("?", sql).split())[:300]
+
+
+class _Tracer:
+    # A statement runs from its trace callback until the last progress tick
+    # before the next statement starts (or the stage ends)
+
+    def __init__(self):
+        self.statement = None
+        self.started = 0.0
+        self.last_tick = 0.0
+        self.owner = None
+        # executemany() traces every row as its own INSERT with the values
+        # inlined; rows sharing the text up to the first value reuse the
+        # normalized statement
+        self.insert_head = None
+        self.insert_statement = None
+
+    def close(self):
+        if self.statement is None:
+            return
+        elapsed = self.last_tick - self.started
+        entry = self.owner.sql.get(self.statement)
+        if entry is None:
+            entry = self.owner.sql[self.statement] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+        self.statement = None
+
+    def trace(self, sql):
+        # Trigger and virtual-table sub-statements ("-- ...") belong to the
+        # statement that is still running
+        if sql.startswith("--"):
+            return
+        if self.statement is not None:
+            self.close()
+        stack = getattr(_local, "stack", None)
+        if not stack:
+            return
+        owner = stack[-1]
+        if owner is not self.owner:
+            self.owner = owner
+            owner.tracers.add(self)
+
+        if self.insert_head is not None and sql.startswith(self.insert_head):
+            self.statement = self.insert_statement
+        else:
+            self.statement = normalize(sql)
+            first = LITERALS.search(sql) if sql.startswith("INSERT") else None
+            if first is not None:
+                self.insert_head = sql[:first.start()]
+                self.insert_statement = self.statement
+        self.started = self.last_tick = time.perf_counter()
+
+    def progress(self):
+        if self.statement is not None:
+            self.last_tick = time.perf_counter()
+        return 0
+
+
+def trace_sql(conn):
+    if not ENABLED:
+        return conn
+    tracer = _Tracer()
+    conn.set_trace_callback(tracer.trace)
+    conn.set_progress_handler(tracer.progress, PROGRESS_STEPS)
+    return conn
+
+
+def read_metrics(path=METRICS_PATH, limit=20000):
+    # Most recent records first
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()[-limit:]
+    records = []
+    for line in reversed(lines):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
@@ -0,0 +1,198 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dotenv import load_dotenv
+from instrument import now, stage
+
+load_dotenv()
+
+# Raw landing store: every payload the fetch_* scripts download, kept as
+# gzip blobs named by the sha256 of the uncompressed body, so a payload seen
+# twice is stored once. manifest.jsonl has one line per landed fetch (feed,
+# sha256, generated_at, fetched_at, sizes); loads can be rerun from any of
+# them with replay.py, which streams the blob without unpacking it to disk.
+#   landing/manifest.jsonl
+#   landing/blobs/3f/3fa9...c1.json.gz
+#   python landing.py list [feed]
+#   python landing.py import complexes saved/complexes.json
+# landing/ is not tracked. landing_seed/ is: it holds the payloads committed
+# with the repository (the complexes feed), read before the store's own
+# entries so a fresh clone can load them without a request.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LANDING_DIR = os.getenv("LANDING_DIR", os.path.join(BASE_DIR, "landing"))
+SEED_DIR = os.path.join(BASE_DIR, "landing_seed")
+GZIP_LEVEL = 6
+CHUNK_SIZE = 1024 * 1024
+
+# Every feed has a top-level generated_at; it is among the first few bytes
+GENERATED_AT = re.compile(rb'"generated_at"\s*:\s*"([^"]*)"')
+
+_manifest_lock = threading.Lock()
+
+
+class Landed:
+    """One manifest entry: a fetch of `feed` whose body is blob `sha256`."""
+
+    def __init__(self, feed, sha256, generated_at, fetched_at, size, stored_size, url=None,
+                 landing_dir=LANDING_DIR):
+        self.feed = feed
+        self.sha256 = sha256
+        self.generated_at = generated_at
+        self.fetched_at = fetched_at
+        # Uncompressed and compressed bytes
+        self.size = size
+        self.stored_size = stored_size
+        self.url = url
+        self.path = blob_path(sha256, landing_dir)
+
+    def open(self):
+        # Decompresses as it is read; stream_json.iter_items reads it in chunks
+        return gzip.open(self.path, "rb")
+
+    def json(self):
+        with self.open() as f:
+            return json.load(f)
+
+    def to_json(self):
+        return json.dumps({
+            "feed": self.feed,
+            "sha256": self.sha256,
+            "generated_at": self.generated_at,
+            "fetched_at": self.fetched_at,
+            "size": self.size,
+            "stored_size": self.stored_size,
+            "url": self.url,
+        })
+
+
+def blob_path(sha256, landing_dir=LANDING_DIR):
+    return os.path.join(landing_dir, "blobs", sha256[:2], sha256 + ".json.gz")
+
+
+def store_blob(chunks, landing_dir=LANDING_DIR):
+    # Hashes and compresses in one pass, then keeps the blob only if it is new.
+    # Returns (sha256, generated_at, size, stored_size).
+    os.makedirs(os.path.join(landing_dir, "blobs"), exist_ok=True)
+    tmp = os.path.join(landing_dir, "blobs", f".{os.getpid()}.{threading.get_ident()}.tmp")
+    digest = hashlib.sha256()
+    generated_at = None
+    size = 0
+    head = b""
+    try:
+        # mtime=0: the same body always compresses to the same bytes
+        with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb",
+                                                   compresslevel=GZIP_LEVEL, mtime=0) as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+                if generated_at is None and len(head) < 4096:
+                    head += chunk[:4096]
+                    match = GENERATED_AT.search(head)
+                    if match:
+                        generated_at = match.group(1).decode()
+
+        sha256 = digest.hexdigest()
+        path = blob_path(sha256, landing_dir)
+        if os.path.exists(path):
+            os.remove(tmp)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return sha256, generated_at, size, os.path.getsize(path)
+
+
+def read_chunks(path):
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b"")
+
+
+def entries(feed=None, landing_dir=LANDING_DIR):
+    # Manifest entries, oldest first; the default store starts with the seed
+    found = []
+    for directory in ([SEED_DIR, landing_dir] if landing_dir == LANDING_DIR else [landing_dir]):
+        path = os.path.join(directory, "manifest.jsonl")
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        found += [Landed(**row, landing_dir=directory) for row in rows if feed is None or row["feed"] == feed]
+    return found
+
+
+def latest(feed, landing_dir=LANDING_DIR):
+    found = entries(feed, landing_dir)
+    return found[-1] if found else None
+
+
+def find(feed, sha256=None, landing_dir=LANDING_DIR):
+    # The newest entry of feed, or the newest whose hash starts with sha256
+    for entry in reversed(entries(feed, landing_dir)):
+        if sha256 is None or entry.sha256.startswith(sha256):
+            return entry
+    raise LookupError(f"No {feed} payload{' ' + sha256 if sha256 else ''} in {landing_dir}")
+
+
+def append_manifest(entry, landing_dir=LANDING_DIR):
+    # The pipeline lands its three feeds from concurrent threads
+    with _manifest_lock:
+        with open(os.path.join(landing_dir, "manifest.jsonl"), "a", encoding="utf-8") as f:
+            f.write(entry.to_json() + "\n")
+
+
+def land_file(feed, path, url=None, landing_dir=LANDING_DIR):
+    with stage("land", feed=feed) as s:
+        sha256, generated_at, size, stored_size = store_blob(read_chunks(path), landing_dir)
+        entry = Landed(feed, sha256, generated_at, now(), size, stored_size, url, landing_dir)
+        append_manifest(entry, landing_dir)
+        s.bytes = size
+    return entry
+
+
+def land(feed, response, landing_dir=LANDING_DIR):
+    # A response served from the HTTP cache or a 304 is the body landed last
+    # time, so it is neither hashed nor recorded again
+    if not response.changed:
+        entry = latest(feed, landing_dir)
+        if entry and entry.url == response.url and os.path.exists(entry.path):
+            return entry
+    return land_file(feed, response.path, response.url, landing_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="show the manifest")
+    listing.add_argument("feed", nargs="?")
+    importing = commands.add_parser("import", help="land a payload saved elsewhere")
+    importing.add_argument("feed")
+    importing.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        # Compacted first: older copies such as complexes.json were indented
+        with open(args.path, "rb") as f:
+            body = json.dumps(json.load(f), separators=(",", ":"), ensure_ascii=False).encode()
+        start = time.perf_counter()
+        sha256, generated_at, size, stored_size = store_blob([body])
+        if all(entry.sha256 != sha256 for entry in entries(args.feed)):
+            append_manifest(Landed(args.feed, sha256, generated_at, now(), size, stored_size))
+        print(f"✅ {args.path} ({os.path.getsize(args.path)} B) landed as {sha256[:12]} "
+              f"({stored_size} B) in {time.perf_counter() - start:.2f}s")
+    else:
+        found = entries(args.feed)
+        blobs = {entry.sha256: entry.stored_size for entry in found}
+        for entry in found:
+            print(f"{entry.fetched_at}  {entry.feed:<13} {entry.sha256[:12]}  "
+                  f"generated {entry.generated_at or '-':<25} {entry.size:>10} B -> {entry.stored_size:>9} B")
+        print(f"{len(found)} fetches, {len(blobs)} distinct payloads, {sum(blobs.values())} B on disk")
@@ -0,0 +1,189 @@
+# Ranking lists and the leaderboard index behind the dashboard's
+# Leaderboards page. The rankings feed ranks competitors in groups (ATP, WTA,
+# the doubles lists, ...), a competitor possibly in several; the group is
+# kept on the ranking row as list_key, resolved from its (name, type_id,
+# gender) the way countries are resolved from their code, and a competitor
+# has one current row per list. The leaderboard table holds each current
+# ranking once per scope it belongs to: its list in its country, its list,
+# its country, and everything (ALL stands for "every list" / "every
+# country"), so a competitor ranked in two lists appears twice in the
+# every-list scopes.
+# With one index per order, the top K by rank or points of any scope is a
+# range read of K index entries, however large the rankings grow:
+#   WHERE list_key = ? AND country_key = ? ORDER BY rank LIMIT ?
+# A load rewrites only the rows of the competitors it touched.
+
+ALL = 0
+
+LEADERBOARD_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS ranking_lists (
+        list_key INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        type_id INT,
+        gender TEXT,
+        UNIQUE (name, type_id, gender)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS leaderboard (
+        competitor_id TEXT NOT NULL,
+        list_key INT NOT NULL,
+        country_key INT NOT NULL,
+        rank INT NOT NULL,
+        points INT NOT NULL,
+        PRIMARY KEY (competitor_id, list_key, country_key)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_leaderboard_rank
+    ON leaderboard(list_key, country_key, rank, competitor_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_leaderboard_points
+    ON leaderboard(list_key, country_key, points DESC, competitor_id)
+    """,
+]
+
+# Migration 14: one current row per competitor and list, and leaderboard
+# rows keyed by the ranking row they come from
+RANKINGS_PER_LIST = [
+    "DROP INDEX IF EXISTS idx_rankings_current",
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_rankings_current
+    ON competitor_rankings(competitor_id, list_key) WHERE valid_to IS NULL
+    """,
+    "DROP TABLE IF EXISTS leaderboard",
+    """
+    CREATE TABLE IF NOT EXISTS leaderboard (
+        competitor_id TEXT NOT NULL,
+        rank_id INT NOT NULL,
+        list_key INT NOT NULL,
+        country_key INT NOT NULL,
+        rank INT NOT NULL,
+        points INT NOT NULL,
+        PRIMARY KEY (competitor_id, rank_id, list_key, country_key)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_leaderboard_rank
+    ON leaderboard(list_key, country_key, rank, competitor_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_leaderboard_points
+    ON leaderboard(list_key, country_key, points DESC, competitor_id)
+    """,
+]
+
+LATEST_VIEW = """
+CREATE VIEW IF NOT EXISTS competitor_rankings_latest AS
+SELECT rank_id, rank, movement, points, competitions_played, competitor_id, snapshot_id, list_key
+FROM competitor_rankings
+WHERE valid_to IS NULL
+"""
+
+LEADERBOARD_ORDER = {
+    "rank": "b.rank, b.competitor_id, b.rank_id",
+    "points": "b.points DESC, b.competitor_id, b.rank_id",
+}
+
+
+def leaderboard_query(by):
+    # Parameters: list_key, country_key (ALL for every one), K. The other
+    # columns are looked up for the K rows only
+    return f"""
+        SELECT b.rank, b.points, r.movement, r.competitions_played,
+               c.name, n.country_name AS country, l.name AS ranking_list, b.competitor_id
+        FROM leaderboard b
+        JOIN competitor_rankings r ON r.rank_id = b.rank_id
+        JOIN competitors c ON c.competitor_id = b.competitor_id
+        LEFT JOIN countries n ON n.country_key = c.country_key
+        LEFT JOIN ranking_lists l ON l.list_key = r.list_key
+        WHERE b.list_key = ? AND b.country_key = ?
+        ORDER BY {LEADERBOARD_ORDER[by]}
+        LIMIT ?
+    """
+
+
+def list_label(name, type_id, gender):
+    return f"{name} ({gender})" if gender else name
+
+
+class RankingLists:
+    """Ranking group to list_key for one load; new lists are added as they come."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.keys = {
+            (name, type_id, gender): key
+            for key, name, type_id, gender in conn.execute(
+                "SELECT list_key, name, type_id, gender FROM ranking_lists")
+        }
+        self.added = 0
+
+    def key(self, name, type_id, gender):
+        if not name:
+            return None
+        identity = (name, type_id, gender)
+        key = self.keys.get(identity)
+        if key is None:
+            key = self.conn.execute(
+                "INSERT INTO ranking_lists (name, type_id, gender) VALUES (?, ?, ?)", identity
+            ).lastrowid
+            self.keys[identity] = key
+            self.added += 1
+        return key
+
+
+def create_leaderboards(conn):
+    # Migration step: ranking_lists, list_key on the rankings and the
+    # leaderboard, which rankings_per_list rebuilds and fills. Rankings stored
+    # before it have no list until the next load and are only in the
+    # every-list scopes.
+    for statement in LEADERBOARD_TABLES:
+        conn.execute(statement)
+    conn.execute(
+        "ALTER TABLE competitor_rankings ADD COLUMN list_key INTEGER REFERENCES ranking_lists(list_key)"
+    )
+    conn.execute("DROP VIEW IF EXISTS competitor_rankings_latest")
+    conn.execute(LATEST_VIEW)
+
+
+def rankings_per_list(conn):
+    # Migration step: a competitor ranked in several lists keeps a current
+    # row in each, and the leaderboard is filled from the current rows
+    for statement in RANKINGS_PER_LIST:
+        conn.execute(statement)
+    refresh_leaderboard(conn)
+
+
+def refresh_leaderboard(conn, competitor_ids=None):
+    # Rewrites the rows of the given competitors (None: every one) from
+    # their current rankings; a competitor without one drops out
+    match = ""
+    if competitor_ids is not None:
+        conn.execute("DROP TABLE IF EXISTS temp.touched_leaderboard")
+        conn.execute("CREATE TEMP TABLE touched_leaderboard (competitor_id TEXT PRIMARY KEY)")
+        conn.executemany(
+            "INSERT OR IGNORE INTO temp.touched_leaderboard VALUES (?)", ((i,) for i in competitor_ids)
+        )
+        match = "IN (SELECT competitor_id FROM temp.touched_leaderboard)"
+
+    conn.execute(f"DELETE FROM leaderboard {'WHERE competitor_id ' + match if match else ''}")
+    # Four rows per ranking: (list, country), (list, ALL), (ALL, country), (ALL, ALL)
+    return conn.execute(
+        f"""
+        INSERT INTO leaderboard (competitor_id, rank_id, list_key, country_key, rank, points)
+        SELECT r.competitor_id, r.rank_id,
+               CASE WHEN s.by_list THEN r.list_key ELSE {ALL} END,
+               CASE WHEN s.by_country THEN c.country_key ELSE {ALL} END,
+               r.rank, r.points
+        FROM competitor_rankings_latest r
+        JOIN competitors c ON c.competitor_id = r.competitor_id
+        JOIN (SELECT 0 AS by_list, 0 AS by_country UNION ALL SELECT 1, 0
+              UNION ALL SELECT 0, 1 UNION ALL SELECT 1, 1) s
+        WHERE (NOT s.by_list OR r.list_key IS NOT NULL)
+          AND (NOT s.by_country OR c.country_key IS NOT NULL)
+          {'AND r.competitor_id ' + match if match else ''}
+        """
+    ).rowcount
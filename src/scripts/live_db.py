@@ -0,0 +1,30 @@
+import os
+
+# The database the app reads and the loads write. competition.db is the copy
+# tracked in git; pipeline.py --swap publishes new versions under db/ and
+# repoints competition.current at them (see db_swap.py), so the tracked file
+# is never replaced. The link is not tracked either: the first swap creates
+# it, and until then everything opens competition.db. The path is looked up
+# on every call rather than at import, so a reader started before that swap
+# moves to the link once it exists. Paths derived from this one
+# (competition.snapshot/, competition.duckdb) drop the extension, so they
+# are the same either way.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACKED_PATH = os.path.join(BASE_DIR, "competition.db")
+LINK_PATH = os.path.join(BASE_DIR, "competition.current")
+
+
+def current_path():
+    return LINK_PATH if os.path.lexists(LINK_PATH) else TRACKED_PATH
+
+
+def current_link():
+    # Writers only (db_swap.py): creates the link, pointing at competition.db
+    if not os.path.lexists(LINK_PATH):
+        try:
+            os.symlink(os.path.basename(TRACKED_PATH), LINK_PATH)
+        except FileExistsError:
+            # Another process created it first
+            pass
+    return LINK_PATH
@@ -0,0 +1,395 @@
+import argparse
+import os
+import re
+import sqlite3
+from aggregates import create_summary_tables
+from search import create_search_index
+from hierarchy import create_hierarchy
+from sync import add_fingerprints
+from countries import create_countries, restore_feed_names
+from leaderboards import create_leaderboards, rankings_per_list
+from live_db import current_path
+from instrument import now
+
+# Versioned schema for competition.db. The applied version is kept in
+# PRAGMA user_version; migrate() applies every newer step, each in its own
+# transaction. Add new steps at the end, never edit an applied one.
+#   python migrations.py            migrate src/scripts/competition.db
+#   python migrations.py --dump     regenerate src/queries/db_schema.sql
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(os.path.dirname(BASE_DIR), "queries", "db_schema.sql")
+
+
+BASE_TABLES = """
+CREATE TABLE IF NOT EXISTS categories (
+    category_id TEXT PRIMARY KEY,
+    category_name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS competitions (
+    competition_id TEXT PRIMARY KEY,
+    competition_name TEXT NOT NULL,
+    parent_id TEXT,
+    type TEXT,
+    gender TEXT,
+    category_id TEXT,
+    FOREIGN KEY (category_id) REFERENCES categories(category_id)
+);
+
+CREATE TABLE IF NOT EXISTS competitors (
+    competitor_id VARCHAR(50) PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    country VARCHAR(100) NOT NULL,
+    country_code CHAR(3) NOT NULL,
+    abbreviation VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS competitor_rankings (
+    rank_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rank INT NOT NULL,
+    movement INT NOT NULL,
+    points INT NOT NULL,
+    competitions_played INT NOT NULL,
+    competitor_id VARCHAR(50) NOT NULL,
+    FOREIGN KEY (competitor_id) REFERENCES competitors(competitor_id)
+);
+
+CREATE TABLE IF NOT EXISTS complexes (
+    complex_id TEXT PRIMARY KEY,
+    complex_name TEXT,
+    country TEXT,
+    timezone TEXT
+);
+
+CREATE TABLE IF NOT EXISTS venues (
+    venue_id TEXT PRIMARY KEY,
+    venue_name TEXT,
+    complex_id TEXT,
+    FOREIGN KEY (complex_id) REFERENCES complexes(complex_id)
+);
+"""
+
+
+def ranking_snapshots(conn):
+    # One full copy of the rankings used to be appended per run. Keep each
+    # competitor's newest row as the first snapshot and drop the rest.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ranking_snapshots (
+            snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            generated_at TEXT,
+            ingested_at TEXT NOT NULL,
+            rows_seen INT NOT NULL DEFAULT 0,
+            rows_changed INT NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(competitor_rankings)")]
+    if "snapshot_id" not in columns:
+        conn.execute(
+            "ALTER TABLE competitor_rankings "
+            "ADD COLUMN snapshot_id INT REFERENCES ranking_snapshots(snapshot_id)"
+        )
+        conn.execute(
+            "ALTER TABLE competitor_rankings "
+            "ADD COLUMN valid_to INT REFERENCES ranking_snapshots(snapshot_id)"
+        )
+        conn.execute(
+            """
+            DELETE FROM competitor_rankings
+            WHERE rank_id NOT IN (
+                SELECT MAX(rank_id) FROM competitor_rankings GROUP BY competitor_id
+            )
+            """
+        )
+        # A fresh database has no rows to keep, and its first load is snapshot 1
+        rows = conn.execute("SELECT COUNT(*) FROM competitor_rankings").fetchone()[0]
+        if rows:
+            snapshot_id = conn.execute(
+                """
+                INSERT INTO ranking_snapshots (generated_at, ingested_at, rows_seen, rows_changed)
+                VALUES (NULL, ?, ?, ?)
+                """,
+                (now(), rows, rows),
+            ).lastrowid
+            conn.execute("UPDATE competitor_rankings SET snapshot_id = ?", (snapshot_id,))
+
+    conn.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_rankings_current
+        ON competitor_rankings(competitor_id) WHERE valid_to IS NULL
+        """
+    )
+    conn.execute(
+        """
+        CREATE VIEW IF NOT EXISTS competitor_rankings_latest AS
+        SELECT rank_id, rank, movement, points, competitions_played, competitor_id, snapshot_id
+        FROM competitor_rankings
+        WHERE valid_to IS NULL
+        """
+    )
+
+
+PIPELINE_STATE = """
+CREATE TABLE IF NOT EXISTS pipeline_state (
+    stage TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    completed_at TEXT NOT NULL
+);
+"""
+
+# Every join and GROUP BY in analysis_queries.sql and app.py.
+# Checked by check_query_plans.py.
+SECONDARY_INDEXES = """
+-- Category names are unique in the feed; declaring it lets GROUP BY
+-- category_name, type stream in index order without a temp B-tree
+CREATE UNIQUE INDEX IF NOT EXISTS idx_categories_name
+ON categories(category_name);
+
+CREATE INDEX IF NOT EXISTS idx_competitions_category
+ON competitions(category_id, type);
+CREATE INDEX IF NOT EXISTS idx_competitions_parent
+ON competitions(parent_id);
+CREATE INDEX IF NOT EXISTS idx_competitions_type
+ON competitions(type);
+CREATE INDEX IF NOT EXISTS idx_competitions_name
+ON competitions(competition_name);
+
+CREATE INDEX IF NOT EXISTS idx_competitors_country
+ON competitors(country);
+
+-- Current rows only, history is reached through snapshot_id
+CREATE INDEX IF NOT EXISTS idx_rankings_current_cover
+ON competitor_rankings(competitor_id, rank, points, movement, competitions_played)
+WHERE valid_to IS NULL;
+CREATE INDEX IF NOT EXISTS idx_rankings_current_rank
+ON competitor_rankings(rank) WHERE valid_to IS NULL;
+CREATE INDEX IF NOT EXISTS idx_rankings_current_points
+ON competitor_rankings(points) WHERE valid_to IS NULL;
+CREATE INDEX IF NOT EXISTS idx_rankings_current_movement
+ON competitor_rankings(movement, rank) WHERE valid_to IS NULL;
+CREATE INDEX IF NOT EXISTS idx_rankings_snapshot
+ON competitor_rankings(snapshot_id, valid_to);
+
+CREATE INDEX IF NOT EXISTS idx_complexes_name
+ON complexes(complex_name, complex_id);
+CREATE INDEX IF NOT EXISTS idx_complexes_country
+ON complexes(country, complex_id);
+CREATE INDEX IF NOT EXISTS idx_complexes_timezone
+ON complexes(timezone);
+
+CREATE INDEX IF NOT EXISTS idx_venues_complex
+ON venues(complex_id, venue_id);
+"""
+
+# data_generation is bumped by every committed load (bulk_load.load_session);
+# readers compare it to decide whether cached data is stale
+DB_META = """
+CREATE TABLE IF NOT EXISTS db_meta (
+    key TEXT PRIMARY KEY,
+    value INT NOT NULL
+);
+
+INSERT OR IGNORE INTO db_meta (key, value) VALUES ('data_generation', 0);
+"""
+
+
+def data_generation(conn):
+    # 0 for a database the migration has not reached yet
+    row = conn.execute("SELECT value FROM db_meta WHERE key = 'data_generation'").fetchone()
+    return row[0] if row else 0
+
+
+# Competitor Explorer pages through current rankings by (rank, competitor_id);
+# points is included so the minimum-points filter is checked in the index
+EXPLORER_INDEX = """
+DROP INDEX IF EXISTS idx_rankings_current_rank;
+CREATE INDEX IF NOT EXISTS idx_rankings_current_rank
+ON competitor_rankings(rank, competitor_id, points) WHERE valid_to IS NULL;
+"""
+
+# Per-id detail responses (fetch_details.py). A stored payload is also the
+# checkpoint that keeps a rerun from fetching that id again; ids that ran
+# out of retries wait in detail_failures for the next run.
+DETAIL_PAYLOADS = """
+CREATE TABLE IF NOT EXISTS detail_payloads (
+    endpoint TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    status INT NOT NULL,
+    body TEXT,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (endpoint, entity_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS detail_failures (
+    endpoint TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    attempts INT NOT NULL,
+    error TEXT,
+    failed_at TEXT NOT NULL,
+    PRIMARY KEY (endpoint, entity_id)
+) WITHOUT ROWID;
+"""
+
+# Categories are upserted by id (sync.py), so two of them may swap or share
+# a name within one load; a unique name index would abort it. The plain index
+# still serves lookups and the grouped reads by name.
+CATEGORY_NAME_INDEX = """
+DROP INDEX IF EXISTS idx_categories_name;
+CREATE INDEX IF NOT EXISTS idx_categories_name
+ON categories(category_name);
+"""
+
+MIGRATIONS = [
+    (1, "base tables", BASE_TABLES),
+    (2, "ranking snapshots", ranking_snapshots),
+    (3, "pipeline state", PIPELINE_STATE),
+    (4, "secondary indexes", SECONDARY_INDEXES),
+    (5, "dashboard summary tables", create_summary_tables),
+    (6, "data generation", DB_META),
+    (7, "explorer keyset index", EXPLORER_INDEX),
+    (8, "competitor search index", create_search_index),
+    (9, "competition hierarchy", create_hierarchy),
+    (10, "row fingerprints", add_fingerprints),
+    (11, "countries dimension", create_countries),
+    (12, "detail payloads", DETAIL_PAYLOADS),
+    (13, "ranking lists and leaderboard", create_leaderboards),
+    (14, "rankings per list", rankings_per_list),
+    (15, "country names as the rankings feed gives them", restore_feed_names),
+    (16, "non-unique category name index", CATEGORY_NAME_INDEX),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn):
+    # Requires a connection in autocommit mode (isolation_level=None)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+    for number, name, step in MIGRATIONS:
+        if number <= version:
+            continue
+
+        conn.execute("BEGIN")
+        try:
+            if callable(step):
+                step(conn)
+            else:
+                # executescript() would commit, so run the statements one by one
+                for statement in re.sub(r"--[^\n]*", "", step).split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"Applied migration {number}: {name}")
+
+    if version < LATEST_VERSION:
+        conn.execute("ANALYZE")
+    # WAL is turned on by the writers (bulk_load.py, fetch_details.py), not
+    # here: the competition.db tracked in git stays in rollback mode, which
+    # read-only connections can open in a read-only checkout
+
+
+def column_items(body):
+    # The top-level comma-separated items of a CREATE TABLE body, each on one line
+    items, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(body):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and not depth:
+            items.append(body[start:i])
+            start = i + 1
+    items.append(body[start:])
+    return [re.sub(r"\s*\n\s*", " ", item.strip()) for item in items]
+
+
+def format_sql(sql):
+    # sqlite_master keeps statements as written, indentation included, and
+    # ALTER TABLE ADD COLUMN appends to the last column's line: tables get one
+    # column or constraint per line, indexes ON and WHERE on lines of their own
+    sql = sql.strip()
+    if re.match(r"CREATE (VIRTUAL )?TABLE", sql):
+        start, end = sql.index("("), sql.rindex(")")
+        head = sql[:start].rstrip()
+        lines = ",\n".join("    " + item for item in column_items(sql[start + 1:end]))
+        return f"{head}{'' if 'USING' in head else ' '}(\n{lines}\n){sql[end + 1:]}"
+    if re.match(r"CREATE (UNIQUE )?INDEX", sql):
+        sql = " ".join(sql.split())
+        return re.sub(r" (ON|WHERE) ", r"\n\1 ", sql)
+    return "\n".join(line.strip() for line in sql.splitlines())
+
+
+def schema_signature(conn):
+    # Columns and indexes of every table, to compare two schemas by
+    tables = [name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' "
+        "ORDER BY name")]
+    return {
+        name: (
+            conn.execute(f"PRAGMA table_xinfo({name})").fetchall(),
+            conn.execute(f"PRAGMA foreign_key_list({name})").fetchall(),
+            sorted((index[1:], conn.execute(f"PRAGMA index_xinfo({index[1]})").fetchall())
+                   for index in conn.execute(f"PRAGMA index_list({name})")),
+        )
+        for name in tables
+    }
+
+
+def dump_schema(path=SCHEMA_PATH):
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    migrate(conn)
+    rows = conn.execute(
+        """
+        SELECT sql FROM sqlite_master m
+        WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+          -- FTS5 shadow tables are created by their virtual table
+          AND NOT EXISTS (
+              SELECT 1 FROM sqlite_master v
+              WHERE v.sql LIKE 'CREATE VIRTUAL TABLE%' AND m.name LIKE v.name || '\\_%' ESCAPE '\\'
+          )
+        ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END, rowid
+        """
+    ).fetchall()
+    schema = "".join(format_sql(sql) + ";\n\n" for (sql,) in rows)
+
+    # The reformatted statements must build the schema the migrations build
+    check = sqlite3.connect(":memory:")
+    check.executescript(schema)
+    if schema_signature(check) != schema_signature(conn):
+        raise RuntimeError("reformatted schema differs from the migrated one")
+    check.close()
+    conn.close()
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"-- Generated by src/scripts/migrations.py --dump (schema version {LATEST_VERSION})\n")
+        f.write("-- Edit MIGRATIONS in migrations.py, not this file.\n\n")
+        f.write(schema.rstrip("\n") + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=current_path())
+    parser.add_argument("--dump", action="store_true",
+                        help="write the migrated schema to src/queries/db_schema.sql")
+    args = parser.parse_args()
+
+    if args.dump:
+        dump_schema()
+        print("✅ Schema written to", SCHEMA_PATH)
+    else:
+        conn = sqlite3.connect(args.db, isolation_level=None)
+        migrate(conn)
+        print("✅ Schema at version", conn.execute("PRAGMA user_version").fetchone()[0])
+        conn.close()
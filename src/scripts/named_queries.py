@@ -0,0 +1,28 @@
+import os
+
+# The queries in src/queries/analysis_queries.sql, keyed by the comment
+# line directly above each statement.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUERIES_PATH = os.path.join(os.path.dirname(BASE_DIR), "queries", "analysis_queries.sql")
+
+
+def load_queries(path=QUERIES_PATH):
+    queries = []
+    name = None
+    lines = []
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if not lines and stripped.startswith("--"):
+                name = stripped.lstrip("-").strip()
+                continue
+            if not stripped:
+                continue
+            lines.append(line.rstrip())
+            if stripped.endswith(";"):
+                queries.append((name, "\n".join(lines).rstrip(";")))
+                lines = []
+
+    return queries
@@ -1,28 +1,37 @@
 from fetch_competitions import fetch_competitions
-
-def parse_competitions():
-    raw_data = fetch_competitions()
-
-    categories = {}
-    competitions = []
-
-    for comp in raw_data:
-        category = comp.get("category", {})
-        category_id = category.get("id")
-        category_name = category.get("name")
-
-        # store unique categories
-        if category_id and category_id not in categories:
-            categories[category_id] = category_name
-
-        competitions.append({
-            "competition_id": comp.get("id"),
-            "competition_name": comp.get("name"),
-            "parent_id": comp.get("parent_id"),
-            "type": comp.get("type"),
-            "gender": comp.get("gender"),
-            "category_id": category_id
-        })
+from stream_json import iter_items
+from instrument import stage
+
+def parse_competitions(fp=None):
+    # fp: an already downloaded competitions payload, streamed item by item
+    with stage("parse_competitions") as s:
+        if fp is None:
+            raw_data = fetch_competitions()
+        else:
+            raw_data = (comp for _, comp in iter_items(fp, ("competitions", "*")))
+
+        categories = {}
+        competitions = []
+
+        for comp in raw_data:
+            category = comp.get("category", {})
+            category_id = category.get("id")
+            category_name = category.get("name")
+
+            # store unique categories
+            if category_id and category_id not in categories:
+                categories[category_id] = category_name
+
+            competitions.append({
+                "competition_id": comp.get("id"),
+                "competition_name": comp.get("name"),
+                "parent_id": comp.get("parent_id"),
+                "type": comp.get("type"),
+                "gender": comp.get("gender"),
+                "category_id": category_id
+            })
+
+        s.rows = len(competitions)
 
     return categories, competitions
 
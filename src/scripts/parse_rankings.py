@@ -1,40 +1,57 @@
 from fetch_rankings import fetch_rankings
+from stream_json import iter_items
+from instrument import stage
 
+# Every item of every ranking group (ATP, WTA, etc.)
+RANKINGS_PATH = ("rankings", "*", "competitor_rankings", "*")
 
-def parse_rankings():
-    raw_data = fetch_rankings()
 
-    competitors = {}
-    rankings = []
-
-    # raw_data is a list of ranking groups (ATP, WTA, etc.)
-    for group in raw_data:
-        competitor_rankings = group.get("competitor_rankings", [])
+def iter_rankings(fp=None):
+    # Yields one (competitor, ranking) pair at a time straight off the stream
+    if fp is None:
+        with fetch_rankings() as f:
+            yield from iter_rankings(f)
+        return
 
-        for item in competitor_rankings:
-            competitor = item.get("competitor", {})
-            competitor_id = competitor.get("id")
+    for group, item in iter_items(fp, RANKINGS_PATH):
+        competitor = item.get("competitor", {})
+        competitor_id = competitor.get("id")
 
-            if not competitor_id:
-                continue
+        if not competitor_id:
+            continue
 
-            competitors[competitor_id] = {
+        yield (
+            {
                 "competitor_id": competitor_id,
                 "name": competitor.get("name"),
                 "country": competitor.get("country"),
                 "country_code": competitor.get("country_code"),
                 "abbreviation": competitor.get("abbreviation"),
-            }
-
-            rankings.append(
-                {
-                    "rank": item.get("rank"),
-                    "movement": item.get("movement", 0),
-                    "points": item.get("points", 0),
-                    "competitions_played": item.get("competitions_played", 0),
-                    "competitor_id": competitor_id,
-                }
-            )
+            },
+            {
+                "rank": item.get("rank"),
+                "movement": item.get("movement", 0),
+                "points": item.get("points", 0),
+                "competitions_played": item.get("competitions_played", 0),
+                "competitor_id": competitor_id,
+                "generated_at": group.get("generated_at"),
+                # The ranking list the row belongs to
+                "list_name": group.get("name"),
+                "list_type": group.get("type_id"),
+                "list_gender": group.get("gender"),
+            },
+        )
+
+
+def parse_rankings(fp=None):
+    competitors = {}
+    rankings = []
+
+    with stage("parse_rankings") as s:
+        for competitor, ranking in iter_rankings(fp):
+            competitors[competitor["competitor_id"]] = competitor
+            rankings.append(ranking)
+        s.rows = len(rankings)
 
     return competitors, rankings
 
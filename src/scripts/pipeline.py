@@ -0,0 +1,174 @@
+import argparse
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import db_swap
+import fetch_complexes
+import insert_complexes_venues
+import insert_data
+import insert_rankings
+import snapshot
+from fetch_competitions import request_competitions
+from fetch_rankings import request_rankings
+from http_client import get_client
+from migrations import migrate
+from live_db import current_path
+
+# Full refresh as a DAG: the three feeds download concurrently into the
+# landing store (landing.py) and each load starts as soon as its own feed
+# lands. A load whose input hash matches the last successful run is skipped.
+# With --swap the loads go into a copy of the database that replaces the
+# live one only once it checks out (db_swap.py), so the dashboard never
+# reads a half-finished refresh. The columnar snapshot the dashboard maps
+# (snapshot.py) is written last, from the database that is live by then.
+#   python pipeline.py [--force] [--swap]
+
+
+class Stage:
+    def __init__(self, name, fn, deps=(), loads=False):
+        self.name = name
+        self.fn = fn
+        self.deps = deps
+        # Load stages write to SQLite and are skipped when their input is unchanged
+        self.loads = loads
+
+
+def load_competitions(landed, db_path):
+    with landed.open() as f:
+        insert_data.insert_data(db_path, f)
+
+
+def load_complexes(landed, db_path):
+    with landed.open() as f:
+        insert_complexes_venues.insert_complexes(db_path, f)
+
+
+def load_rankings(landed, db_path):
+    with landed.open() as f:
+        insert_rankings.insert_data(db_path, f)
+
+
+STAGES = [
+    Stage("fetch_competitions", lambda inputs, db_path: request_competitions()),
+    Stage("fetch_complexes", lambda inputs, db_path: fetch_complexes.fetch_complexes()),
+    Stage("fetch_rankings", lambda inputs, db_path: request_rankings()),
+    Stage("load_competitions",
+          lambda inputs, db_path: load_competitions(inputs["fetch_competitions"], db_path),
+          deps=("fetch_competitions",), loads=True),
+    Stage("load_complexes",
+          lambda inputs, db_path: load_complexes(inputs["fetch_complexes"], db_path),
+          deps=("fetch_complexes",), loads=True),
+    Stage("load_rankings",
+          lambda inputs, db_path: load_rankings(inputs["fetch_rankings"], db_path),
+          deps=("fetch_rankings",), loads=True),
+]
+
+
+def last_hashes(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    migrate(conn)
+    hashes = dict(conn.execute("SELECT stage, input_hash FROM pipeline_state"))
+    conn.close()
+    return hashes
+
+
+def save_hash(db_path, stage, input_hash):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT OR REPLACE INTO pipeline_state VALUES (?, ?, ?)",
+        (stage, input_hash, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(stages=STAGES, db_path=None, force=False, max_workers=None):
+    db_path = db_path or current_path()
+    hashes = {} if force else last_hashes(db_path)
+    # SQLite takes one writer at a time; loads queue here instead of hitting SQLITE_BUSY
+    write_lock = threading.Lock()
+
+    results = {}
+    status = {}
+    timings = {}
+
+    def execute(stage):
+        start = time.perf_counter()
+        inputs = {dep: results[dep] for dep in stage.deps}
+
+        if not stage.loads:
+            return stage.fn(inputs, db_path), "done", start
+
+        # The input of a load stage is its feed's landed body (landing.py),
+        # already hashed when it was stored
+        input_hash = inputs[stage.deps[0]].sha256
+        if hashes.get(stage.name) == input_hash:
+            return None, "skipped (unchanged)", start
+
+        with write_lock:
+            stage.fn(inputs, db_path)
+            save_hash(db_path, stage.name, input_hash)
+        return None, "done", start
+
+    pending = {stage.name: stage for stage in stages}
+    running = {}
+    run_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as pool:
+        while pending or running:
+            # Submit every stage whose dependencies have finished
+            for name, stage in list(pending.items()):
+                if any(status.get(dep) in ("failed", "blocked") for dep in stage.deps):
+                    status[name] = "blocked"
+                    del pending[name]
+                elif all(dep in results for dep in stage.deps):
+                    running[pool.submit(execute, stage)] = stage
+                    del pending[name]
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    results[stage.name], status[stage.name], start = future.result()
+                    timings[stage.name] = time.perf_counter() - start
+                except Exception as e:
+                    status[stage.name] = "failed"
+                    print(f"❌ {stage.name} failed: {e}")
+
+    total = time.perf_counter() - run_start
+    print("\nStage                 Status                 Seconds")
+    for stage in stages:
+        seconds = timings.get(stage.name)
+        shown = f"{seconds:8.2f}" if seconds is not None else "       -"
+        print(f"{stage.name:<21} {status.get(stage.name, 'not run'):<22} {shown}")
+    print(f"Total wall time: {total:.2f}s")
+    print("HTTP:", get_client().stats())
+
+    return all(s not in ("failed", "blocked") for s in status.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true",
+                        help="reload every stage even if its input is unchanged")
+    parser.add_argument("--swap", action="store_true",
+                        help="load into a copy of the database and swap it in when done")
+    args = parser.parse_args()
+
+    if args.swap:
+        # A failed stage raises out of building(), which discards the copy
+        with db_swap.building() as build_path:
+            if not run(db_path=build_path, force=args.force):
+                raise SystemExit(1)
+    elif not run(force=args.force):
+        raise SystemExit(1)
+    # The app maps the large frames from here (src/app/data_layer.py); after
+    # a swap the live database is the one behind the link
+    snapshot.export_snapshot()
+    print("✅ Pipeline finished")
@@ -0,0 +1,264 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from dotenv import load_dotenv
+from instrument import now, stage
+from named_queries import load_queries
+from live_db import current_path
+from migrations import data_generation
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+load_dotenv()
+
+# Backends for the named analytical queries in analysis_queries.sql,
+# chosen with QUERY_BACKEND:
+#   sqlite  (default) competition.db itself
+#   duckdb  a columnar copy of competition.db in competition.duckdb, scanned
+#           vectorized on DUCKDB_THREADS threads. The copy is rebuilt
+#           whenever db_meta.data_generation has moved on since it was made.
+# Both take the same SQL and ? parameters and return DataFrames.
+#   python query_backend.py "Venues per complex"
+#   python query_backend.py --backend duckdb --all
+
+BACKEND = os.getenv("QUERY_BACKEND", "sqlite")
+# 0 leaves DuckDB's default of one thread per core
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "0"))
+EXPORT_BATCH = 100000
+
+_export_lock = threading.Lock()
+
+
+def duckdb_type(declared):
+    # SQLite's affinity rules, reduced to the types this schema declares
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return "BIGINT"
+    if any(name in declared for name in ("REAL", "FLOA", "DOUB")):
+        return "DOUBLE"
+    return "VARCHAR"
+
+
+def export_tables(conn):
+    # Plain tables; FTS5 tables and their shadow tables stay in SQLite
+    return [row[0] for row in conn.execute(
+        """
+        SELECT name FROM sqlite_master m
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+          AND sql NOT LIKE 'CREATE VIRTUAL TABLE%'
+          AND NOT EXISTS (
+              SELECT 1 FROM sqlite_master v
+              WHERE v.sql LIKE 'CREATE VIRTUAL TABLE%' AND m.name LIKE v.name || '\\_%' ESCAPE '\\'
+          )
+        ORDER BY name
+        """
+    )]
+
+
+def export_duckdb(db_path, path):
+    # Copies every table and view of db_path into a new DuckDB file, then
+    # moves it over path, so open readers keep the copy they have
+    start = time.perf_counter()
+    tmp = path + ".tmp"
+    for leftover in (tmp, tmp + ".wal"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    dst = duckdb.connect(tmp)
+    rows = 0
+    try:
+        # One read transaction, so every table comes from the same commit
+        src.execute("BEGIN")
+        generation = data_generation(src)
+        for table in export_tables(src):
+            columns = src.execute(f"PRAGMA table_info({table})").fetchall()
+            dst.execute(
+                f"CREATE TABLE {table} ({', '.join(f'{col[1]} {duckdb_type(col[2])}' for col in columns)})"
+            )
+            for chunk in pd.read_sql(f"SELECT * FROM {table}", src, chunksize=EXPORT_BATCH):
+                dst.register("chunk", chunk)
+                dst.execute(f"INSERT INTO {table} SELECT * FROM chunk")
+                dst.unregister("chunk")
+                rows += len(chunk)
+        for (sql,) in src.execute("SELECT sql FROM sqlite_master WHERE type = 'view'"):
+            dst.execute(sql)
+        dst.execute("CREATE TABLE export_meta (source VARCHAR, data_generation BIGINT, exported_at VARCHAR)")
+        dst.execute("INSERT INTO export_meta VALUES (?, ?, ?)",
+                    (os.path.realpath(db_path), generation, now()))
+        dst.execute("CHECKPOINT")
+        src.rollback()
+    finally:
+        dst.close()
+        src.close()
+
+    os.replace(tmp, path)
+    print(f"✅ Exported {rows} rows to {path} in {time.perf_counter() - start:.2f}s")
+    return generation
+
+
+class SQLiteBackend:
+    """Runs the queries on competition.db through a read-only connection."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or current_path()
+        self.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+
+    def query(self, sql, params=()):
+        return pd.read_sql(sql, self.conn, params=params)
+
+    def close(self):
+        self.conn.close()
+
+
+class DuckDBBackend:
+    """Runs the queries on a columnar DuckDB copy of competition.db."""
+
+    name = "duckdb"
+
+    def __init__(self, db_path=None, path=None, threads=DUCKDB_THREADS):
+        if duckdb is None:
+            raise RuntimeError("QUERY_BACKEND=duckdb needs the duckdb package (pip install duckdb)")
+        # None follows the live database (live_db.py) from one refresh to the next
+        self._db_path = db_path
+        self.path = path or os.path.splitext(self.db_path)[0] + ".duckdb"
+        self.threads = threads
+        self.conn = None
+        self.generation = None
+        # Queries running per connection, so a replaced one is closed by the last
+        self._users = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    @property
+    def db_path(self):
+        return self._db_path or current_path()
+
+    def exported(self):
+        # (source, data_generation) of the copy on disk, or None
+        if not os.path.exists(self.path):
+            return None
+        try:
+            conn = duckdb.connect(self.path, read_only=True)
+        except duckdb.Error:
+            return None
+        try:
+            return conn.execute("SELECT source, data_generation FROM export_meta").fetchone()
+        except duckdb.Error:
+            return None
+        finally:
+            conn.close()
+
+    def connect(self):
+        # The copy is attached to an in-memory database rather than opened by
+        # path: DuckDB shares one instance per open path, so while queries
+        # still run on the old copy a plain connect would return that one
+        conn = duckdb.connect(":memory:")
+        path = self.path.replace("'", "''")
+        conn.execute(f"ATTACH '{path}' AS copy (READ_ONLY)")
+        if self.threads:
+            conn.execute(f"SET threads = {self.threads}")
+        return conn
+
+    def refresh(self):
+        # Cheap when nothing was loaded: one read of db_meta
+        db_path = self.db_path
+        src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            generation = data_generation(src)
+        finally:
+            src.close()
+        if self.conn is not None and generation == self.generation:
+            return
+
+        with _export_lock:
+            # Another thread may have swapped in this generation while we waited
+            if self.conn is not None and generation == self.generation:
+                return
+            if self.exported() != (os.path.realpath(db_path), generation):
+                generation = export_duckdb(db_path, self.path)
+            conn = self.connect()
+            # Queries still on the old connection keep it; the last one closes it
+            with self._lock:
+                old, self.conn, self.generation = self.conn, conn, generation
+                if old is not None and not self._users.get(old, 0):
+                    old.close()
+
+    def query(self, sql, params=()):
+        self.refresh()
+        with self._lock:
+            conn = self.conn
+            self._users[conn] = self._users.get(conn, 0) + 1
+        try:
+            # A cursor per call: DuckDB connections are not shared across threads
+            with conn.cursor() as cursor:
+                cursor.execute("USE copy")
+                return cursor.execute(sql, list(params)).df()
+        finally:
+            with self._lock:
+                self._users[conn] -= 1
+                if not self._users[conn]:
+                    del self._users[conn]
+                    if conn is not self.conn:
+                        conn.close()
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self._users.pop(self.conn, None)
+                self.conn.close()
+                self.conn = None
+
+
+BACKENDS = {
+    "sqlite": SQLiteBackend,
+    "duckdb": DuckDBBackend,
+}
+
+
+def open_backend(name=None, db_path=None):
+    name = name or BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown QUERY_BACKEND {name!r}, expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](db_path)
+
+
+def run_named(backend, name, queries=None):
+    # One query of analysis_queries.sql by its comment line
+    queries = dict(queries or load_queries())
+    if name not in queries:
+        raise KeyError(f"No query named {name!r} in analysis_queries.sql")
+    with stage(f"query {name}", backend=backend.name) as s:
+        result = backend.query(queries[name])
+        s.rows = len(result)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("name", nargs="?", help="comment line above the query in analysis_queries.sql")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=BACKEND)
+    parser.add_argument("--db", default=current_path())
+    parser.add_argument("--all", action="store_true", help="run every named query")
+    args = parser.parse_args()
+
+    queries = load_queries()
+    names = [name for name, _ in queries] if args.all else [args.name]
+    if names == [None]:
+        parser.error("give a query name or --all")
+
+    backend = open_backend(args.backend, args.db)
+    for name in names:
+        start = time.perf_counter()
+        result = run_named(backend, name, queries)
+        print(f"-- {name} ({len(result)} rows, {(time.perf_counter() - start) * 1000:.1f} ms, {backend.name})")
+        print(result.head(20).to_string(index=False))
+    backend.close()
@@ -0,0 +1,42 @@
+import sqlite3
+import sys
+from live_db import current_path
+
+# Point-in-time reads over the snapshot-versioned competitor_rankings table.
+# A row is valid from its snapshot_id up to (excluding) valid_to.
+
+AS_OF_QUERY = """
+SELECT r.rank, r.movement, r.points, r.competitions_played,
+       c.competitor_id, c.name, c.country
+FROM competitor_rankings r
+JOIN competitors c ON c.competitor_id = r.competitor_id
+WHERE r.snapshot_id <= :snapshot_id
+  AND (r.valid_to IS NULL OR r.valid_to > :snapshot_id)
+ORDER BY r.rank
+"""
+
+def snapshot_as_of(conn, when):
+    # Newest snapshot whose feed was generated at or before `when` (ISO-8601)
+    row = conn.execute(
+        """
+        SELECT MAX(snapshot_id) FROM ranking_snapshots
+        WHERE COALESCE(generated_at, ingested_at) <= ?
+        """,
+        (when,),
+    ).fetchone()
+    return row[0]
+
+def rankings_as_of(conn, when):
+    snapshot_id = snapshot_as_of(conn, when)
+    if snapshot_id is None:
+        return []
+    return conn.execute(AS_OF_QUERY, {"snapshot_id": snapshot_id}).fetchall()
+
+if __name__ == "__main__":
+    when = sys.argv[1]
+    conn = sqlite3.connect(current_path())
+    rows = rankings_as_of(conn, when)
+    print(f"Rankings as of {when}: {len(rows)} competitors")
+    for row in rows[:10]:
+        print(row)
+    conn.close()
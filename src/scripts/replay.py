@@ -0,0 +1,32 @@
+import argparse
+import landing
+import snapshot
+from live_db import current_path
+from pipeline import load_competitions, load_complexes, load_rankings, save_hash
+
+# Loads a payload from the landing store again, without a request: the
+# latest one of a feed, or an earlier one by (a prefix of) its sha256 from
+# `python landing.py list`. The blob is streamed straight out of its gzip.
+#   python replay.py complexes
+#   python replay.py rankings 3fa9c1
+
+LOADERS = {
+    "competitions": load_competitions,
+    "complexes": load_complexes,
+    "rankings": load_rankings,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("feed", choices=list(LOADERS))
+    parser.add_argument("sha256", nargs="?", help="payload hash or prefix (default: latest)")
+    parser.add_argument("--db", default=current_path())
+    args = parser.parse_args()
+
+    landed = landing.find(args.feed, args.sha256)
+    LOADERS[args.feed](landed, args.db)
+    # The pipeline compares its next download against what was loaded last
+    save_hash(args.db, f"load_{args.feed}", landed.sha256)
+    snapshot.export_snapshot(args.db)
+    print(f"✅ {args.feed} {landed.sha256[:12]} (generated {landed.generated_at}) replayed into {args.db}")
@@ -0,0 +1,61 @@
+import re
+
+# Full-text index over competitor names for the Explorer's search box.
+# competitor_search is an external-content FTS5 table: it stores only the
+# index and reads the text back from competitors by rowid. unicode61 with
+# remove_diacritics folds case and accents ("muller" finds "Müller"), and
+# the 2/3-character prefix indexes keep short prefix queries cheap.
+
+SEARCH_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS competitor_search USING fts5(
+    name, abbreviation, country,
+    content='competitors',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+# Ranked by bm25, name matches weighted above abbreviation and country
+SEARCH_QUERY = """
+SELECT c.competitor_id, c.name, c.country
+FROM competitor_search s
+JOIN competitors c ON c.rowid = s.rowid
+WHERE competitor_search MATCH ?
+ORDER BY bm25(competitor_search, 10.0, 2.0, 1.0)
+LIMIT ?
+"""
+
+
+def create_search_index(conn):
+    # Migration step: create the index and fill it from competitors
+    conn.execute(SEARCH_TABLE)
+    conn.execute("INSERT INTO competitor_search (competitor_search) VALUES ('rebuild')")
+
+
+def index_new_competitors(conn, after_rowid):
+    # Competitors are only ever inserted (INSERT OR IGNORE), so rows added by
+    # a load are exactly those past the highest rowid seen before it
+    return conn.execute(
+        """
+        INSERT INTO competitor_search (rowid, name, abbreviation, country)
+        SELECT rowid, name, abbreviation, country FROM competitors WHERE rowid > ?
+        """,
+        (after_rowid,),
+    ).rowcount
+
+
+def match_query(text):
+    # Every word of the input becomes a quoted prefix term, so user input can
+    # never be parsed as FTS5 syntax. Returns None when there is nothing to match.
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_competitors(conn, text, limit=20):
+    query = match_query(text)
+    if query is None:
+        return []
+    return conn.execute(SEARCH_QUERY, (query, limit)).fetchall()
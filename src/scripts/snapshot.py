@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from instrument import now, stage
+from live_db import current_path
+from migrations import data_generation
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Columnar snapshot of the dashboard's large frames (rankings, venues,
+# complexes), written after a refresh so the app does not rebuild them with
+# read_sql in every process. Each column is one .npy file that the app maps
+# read-only with np.load(mmap_mode="r"): every Streamlit process shares the
+# same page-cache pages, and nothing is parsed on open. Integers are stored
+# in the smallest type that holds their range. Strings that repeat (country,
+# timezone) are dictionary-encoded: sorted distinct values in
+# <column>.categories, int8-32 codes in <column>.codes.npy, -1 for NULL.
+# Mostly distinct strings (names, ids) are kept in Arrow's layout: UTF-8 in
+# <column>.data, int64 offsets in <column>.offsets.npy and a validity bitmap
+# in <column>.valid.npy if there are NULLs. With pyarrow installed they are
+# wrapped as the str column read_sql gives, over the mapped pages; without
+# it they are decoded into each process.
+#   competition.snapshot/current -> v42.20260121T125117123456/
+#   competition.snapshot/v42.../manifest.json, rankings.rank.npy, ...
+# A snapshot records the database file and data_generation it was read
+# from; data_layer.py uses it only while both still match, and falls back to
+# SQL otherwise.
+#   python snapshot.py [--force]
+
+# Versions kept besides the current one, for processes that still map them
+KEEP_VERSIONS = 1
+# String columns with more distinct values per row than this are not
+# dictionary-encoded: their categories would be as large as the column
+CATEGORY_RATIO = 0.5
+
+# The frames data_layer.py shows; the SQL path uses the same queries
+SNAPSHOT_QUERIES = {
+    "rankings": """
+        SELECT r.rank, r.movement, r.points, r.competitions_played,
+               c.name, n.country_name AS country, l.name AS ranking_list
+        FROM competitor_rankings_latest r
+        JOIN competitors c
+        ON r.competitor_id = c.competitor_id
+        LEFT JOIN countries n
+        ON n.country_key = c.country_key
+        LEFT JOIN ranking_lists l
+        ON l.list_key = r.list_key
+    """,
+    "venues": """
+        SELECT v.venue_id, v.venue_name,
+               c.complex_name, n.country_name AS country, c.timezone
+        FROM venues v
+        JOIN complexes c
+        ON v.complex_id = c.complex_id
+        LEFT JOIN countries n
+        ON n.country_key = c.country_key
+    """,
+    "complexes": """
+        SELECT c.complex_id, c.complex_name, n.country_name AS country, c.timezone
+        FROM complexes c
+        LEFT JOIN countries n
+        ON n.country_key = c.country_key
+    """,
+}
+
+
+def snapshot_dir(db_path=None):
+    return os.path.splitext(str(db_path or current_path()))[0] + ".snapshot"
+
+
+def smallest_int(values):
+    # The narrowest signed type for the range; read_sql gives int64
+    if not len(values):
+        return np.int8
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def code_type(categories):
+    # The type pandas keeps codes in for this many categories, so
+    # Categorical.from_codes uses the mapped array instead of a copy
+    for dtype in (np.int8, np.int16, np.int32):
+        if categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def write_column(version_dir, table, name, series):
+    # Writes one column and returns its manifest entry
+    prefix = os.path.join(version_dir, f"{table}.{name}")
+    if pd.api.types.is_integer_dtype(series.dtype):
+        values = series.to_numpy()
+        np.save(prefix + ".npy", values.astype(smallest_int(values), copy=False))
+        return {"name": name, "kind": "int"}
+    if pd.api.types.is_float_dtype(series.dtype):
+        # Integer columns with NULLs come back from read_sql as floats too
+        np.save(prefix + ".npy", series.to_numpy(dtype=np.float64))
+        return {"name": name, "kind": "float"}
+
+    codes, categories = pd.factorize(series, sort=True, use_na_sentinel=True)
+    if len(categories) > CATEGORY_RATIO * len(series):
+        return write_strings(prefix, name, series)
+    np.save(prefix + ".codes.npy", codes.astype(code_type(len(categories)), copy=False))
+    # NUL-separated UTF-8: one decode and split on open
+    with open(prefix + ".categories", "wb") as f:
+        f.write("\x00".join(str(value) for value in categories).encode())
+    return {"name": name, "kind": "category", "categories": len(categories)}
+
+
+def write_strings(prefix, name, series):
+    valid = series.notna().to_numpy()
+    encoded = [str(value).encode() if ok else b"" for value, ok in zip(series, valid)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(prefix + ".offsets.npy", offsets)
+    with open(prefix + ".data", "wb") as f:
+        f.write(b"".join(encoded))
+    nulls = int(len(valid) - valid.sum())
+    if nulls:
+        # Arrow's bitmap: one bit per row, least significant first
+        np.save(prefix + ".valid.npy", np.packbits(valid, bitorder="little"))
+    return {"name": name, "kind": "str", "nulls": nulls}
+
+
+def map_bytes(path):
+    # np.memmap refuses empty files
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+def read_strings(prefix, rows, nulls):
+    offsets = np.load(prefix + ".offsets.npy", mmap_mode="r")
+    data = map_bytes(prefix + ".data")
+    valid = np.load(prefix + ".valid.npy", mmap_mode="r") if nulls else None
+    if pa is not None:
+        array = pa.LargeStringArray.from_buffers(
+            rows, pa.py_buffer(offsets), pa.py_buffer(data),
+            None if valid is None else pa.py_buffer(valid), nulls,
+        )
+        return pd.arrays.ArrowStringArray(array, dtype=pd.StringDtype("pyarrow", na_value=np.nan))
+
+    text = bytes(data)
+    present = np.ones(rows, dtype=bool) if valid is None else np.unpackbits(valid, count=rows, bitorder="little")
+    values = [text[start:end].decode() if ok else None
+              for start, end, ok in zip(offsets[:-1].tolist(), offsets[1:].tolist(), present)]
+    return pd.array(values, dtype="str")
+
+
+def current_version(directory):
+    link = os.path.join(directory, "current")
+    return os.path.realpath(link) if os.path.lexists(link) else None
+
+
+def read_manifest(version_dir):
+    with open(os.path.join(version_dir, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_current(db_path=None, directory=None):
+    db_path = db_path or current_path()
+    version = current_version(directory or snapshot_dir(db_path))
+    if version is None or not os.path.exists(os.path.join(version, "manifest.json")):
+        return False
+    manifest = read_manifest(version)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        generation = data_generation(conn)
+    finally:
+        conn.close()
+    return (manifest["source"], manifest["data_generation"]) == (os.path.realpath(db_path), generation)
+
+
+def export_snapshot(db_path=None, directory=None, force=False):
+    # Writes a new version next to the current one and repoints `current`
+    # at it with one rename; open readers keep the files they mapped
+    db_path = db_path or current_path()
+    directory = directory or snapshot_dir(db_path)
+    if not force and is_current(db_path, directory):
+        print("Snapshot is up to date")
+        return current_version(directory)
+
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    with stage("export_snapshot") as s:
+        src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        version_dir = None
+        try:
+            # One read transaction, so every frame comes from the same commit
+            src.execute("BEGIN")
+            generation = data_generation(src)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+            version_dir = os.path.join(directory, f"v{generation}.{stamp}")
+            os.makedirs(version_dir)
+
+            tables = {}
+            for table, query in SNAPSHOT_QUERIES.items():
+                frame = pd.read_sql(query, src)
+                tables[table] = {
+                    "rows": len(frame),
+                    "columns": [write_column(version_dir, table, name, frame[name])
+                                for name in frame.columns],
+                }
+                s.rows += len(frame)
+            src.rollback()
+        except BaseException:
+            if version_dir is not None:
+                shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+        finally:
+            src.close()
+
+        with open(os.path.join(version_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "source": os.path.realpath(db_path),
+                "data_generation": generation,
+                "exported_at": now(),
+                "tables": tables,
+            }, f, indent=2)
+        s.bytes = sum(entry.stat().st_size for entry in os.scandir(version_dir))
+
+    link = os.path.join(directory, "current.swap")
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, os.path.join(directory, "current"))
+    prune(directory, version_dir)
+
+    print(f"✅ Snapshot of generation {generation} ({s.rows} rows, {s.bytes} B) written to "
+          f"{version_dir} in {time.perf_counter() - start:.2f}s")
+    return version_dir
+
+
+def prune(directory, current):
+    versions = sorted(
+        (entry.path for entry in os.scandir(directory) if entry.is_dir() and entry.name.startswith("v")),
+        key=os.path.getmtime,
+    )
+    older = [path for path in versions if path != current]
+    for path in older[:max(0, len(older) - KEEP_VERSIONS)]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class Snapshot:
+    """One snapshot version; frames are views over read-only mapped columns."""
+
+    def __init__(self, version_dir):
+        self.version_dir = version_dir
+        manifest = read_manifest(version_dir)
+        self.source = manifest["source"]
+        self.generation = manifest["data_generation"]
+        self.tables = manifest["tables"]
+
+    def frame(self, table):
+        columns = {}
+        for column in self.tables[table]["columns"]:
+            prefix = os.path.join(self.version_dir, f"{table}.{column['name']}")
+            if column["kind"] in ("int", "float"):
+                columns[column["name"]] = np.load(prefix + ".npy", mmap_mode="r")
+                continue
+            if column["kind"] == "str":
+                columns[column["name"]] = read_strings(prefix, self.tables[table]["rows"], column["nulls"])
+                continue
+            with open(prefix + ".categories", "rb") as f:
+                text = f.read().decode()
+            categories = text.split("\x00") if column["categories"] else []
+            columns[column["name"]] = pd.Categorical.from_codes(
+                np.load(prefix + ".codes.npy", mmap_mode="r"), categories=categories, validate=False
+            )
+        # copy=False keeps the mapped arrays as the frame's columns
+        return pd.DataFrame(columns, copy=False)
+
+
+def open_snapshot(db_path=None, directory=None):
+    # The current version, or None if there is none yet
+    version = current_version(directory or snapshot_dir(db_path))
+    if version is None or not os.path.exists(os.path.join(version, "manifest.json")):
+        return None
+    return Snapshot(version)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=current_path())
+    parser.add_argument("--force", action="store_true", help="export even if the snapshot is current")
+    args = parser.parse_args()
+    export_snapshot(args.db, force=args.force)
@@ -0,0 +1,118 @@
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    # Sliding text buffer over a file object; consumed text is dropped on refill
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+
+    def _fill(self):
+        while True:
+            data = self.fp.read(self.chunk_size)
+            if not isinstance(data, bytes):
+                break
+            raw = data
+            data = self._decode(raw, final=not raw)
+            # A chunk may end inside a multi-byte character
+            if data or not raw:
+                break
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        # Decode one complete JSON value, reading more text until it parses.
+        # A value ending exactly at the buffer end may be a truncated number.
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def _walk(reader, path, context):
+    if not path:
+        yield context, reader.value()
+        return
+
+    head, rest = path[0], path[1:]
+
+    if head == "*":
+        reader.expect("[")
+        if reader.peek() == "]":
+            reader.pos += 1
+            return
+        while True:
+            yield from _walk(reader, rest, context)
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("]")
+            return
+
+    reader.expect("{")
+    context = dict(context)
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == head:
+            # Snapshot: fields after the array must not leak into its items
+            yield from _walk(reader, rest, dict(context))
+        else:
+            value = reader.value()
+            if not isinstance(value, (dict, list)):
+                context[key] = value
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        return
+
+
+def iter_items(fp, path, chunk_size=CHUNK_SIZE):
+    """Yield (context, item) for every value at ``path`` without loading the document.
+
+    ``path`` is a sequence of object keys and ``"*"`` (every array element),
+    e.g. ``("rankings", "*", "competitor_rankings", "*")``. ``context`` holds
+    the scalar fields of the enclosing objects that appear before the array.
+    """
+    yield from _walk(_Reader(fp, chunk_size), tuple(path), {})
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import time
+from hashlib import blake2b
+from dotenv import load_dotenv
+from instrument import now
+
+load_dotenv()
+
+# Fingerprint sync for the feeds that describe the current state of a table
+# (categories, competitions, complexes, venues). Every row stores a hash of
+# its normalized fields; a load hashes the staged feed the same way and only
+# writes what differs:
+#   inserted   key not in the table
+#   updated    key present, fingerprint differs (renamed, moved, ...)
+#   unchanged  same fingerprint, not written
+#   deleted    in the table but not in the feed: removed, and recorded in
+#              tombstones with its last fingerprint
+# A record that comes back later is inserted again and its tombstone dropped.
+
+# A feed may drop at most this fraction of a table's rows; more looks like a
+# truncated download, and the load is rolled back instead
+MAX_DELETE = float(os.getenv("SYNC_MAX_DELETE", "0.5"))
+
+# Key and hashed columns per table. Changing a column list changes every
+# fingerprint, so the next load rewrites the whole table once.
+SYNC_TABLES = {
+    "categories": ("category_id", ["category_name"]),
+    "competitions": ("competition_id",
+                     ["competition_name", "parent_id", "type", "gender", "category_id"]),
+    "complexes": ("complex_id", ["complex_name", "country", "timezone"]),
+    "venues": ("venue_id", ["venue_name", "complex_id"]),
+}
+
+# Columns resolved at ingest rather than read from the feed, such as the
+# country key of a complex. They are stored with the row and compared as they
+# are instead of being hashed.
+DERIVED_COLUMNS = {
+    "complexes": ["country_key"],
+}
+
+TOMBSTONES = """
+CREATE TABLE IF NOT EXISTS tombstones (
+    table_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT,
+    deleted_at TEXT NOT NULL,
+    PRIMARY KEY (table_name, key)
+)
+"""
+
+
+class SyncRejected(Exception):
+    pass
+
+
+class SyncResult:
+    """Counts of one sync, plus the rows it wrote and the rows they replaced."""
+
+    def __init__(self, table):
+        self.table = table
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        # Inserted and updated rows as loaded (sqlite3.Row, by column name)
+        self.changed = []
+        # Updated and deleted rows as they were before the load
+        self.previous = []
+
+
+def fingerprint(*fields):
+    # Surrounding whitespace is ignored and NULL hashes like ''
+    text = "\x1f".join(["" if field is None else str(field).strip() for field in fields])
+    return blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def register(conn):
+    conn.create_function("fingerprint", -1, fingerprint, deterministic=True)
+
+
+def add_fingerprints(conn):
+    # Migration step: fingerprint the rows already loaded, create tombstones
+    register(conn)
+    for table, (_, columns) in SYNC_TABLES.items():
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN fingerprint TEXT")
+        conn.execute(f"UPDATE {table} SET fingerprint = fingerprint({', '.join(columns)})")
+    conn.execute(TOMBSTONES)
+
+
+def sync(stage):
+    # Replaces stage.load_into() for the tables in SYNC_TABLES
+    conn, table = stage.conn, stage.table
+    key, columns = SYNC_TABLES[table]
+    derived = DERIVED_COLUMNS.get(table, [])
+    stored = columns + derived
+    names = ", ".join([key] + stored)
+    stage.flush()
+    start = time.perf_counter()
+    register(conn)
+    # A venue may be deleted after the complex it belonged to; references are
+    # checked when the load commits
+    conn.execute("PRAGMA defer_foreign_keys = ON")
+
+    # First row per key, as INSERT OR IGNORE used to keep; rows without a key
+    # are dropped. A row whose fields are stored exactly as staged keeps its
+    # fingerprint without hashing it again.
+    same = " AND ".join(f"t.{col} IS f.{col}" for col in columns)
+    kept = " AND ".join([f"t.{col} IS f.{col}" for col in derived] + ["1"])
+    conn.execute(f"DROP TABLE IF EXISTS temp.sync_{table}")
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE sync_{table} AS
+        SELECT *,
+               CASE WHEN present IS NULL THEN 'inserted'
+                    WHEN old IS fingerprint AND kept THEN 'unchanged'
+                    ELSE 'updated' END AS action
+        FROM (
+            SELECT f.*, t.{key} AS present, t.fingerprint AS old, {kept} AS kept,
+                   CASE WHEN t.{key} IS NOT NULL AND {same} THEN t.fingerprint
+                        ELSE fingerprint({', '.join(f'f.{col}' for col in columns)}) END AS fingerprint
+            FROM temp.{stage.name} f
+            LEFT JOIN {table} t ON t.{key} = f.{key}
+            WHERE f.rowid IN (
+                SELECT MIN(rowid) FROM temp.{stage.name} WHERE {key} IS NOT NULL GROUP BY {key}
+            )
+        )
+        """
+    )
+    conn.execute(f"CREATE UNIQUE INDEX temp.sync_{table}_key ON sync_{table}({key})")
+
+    result = SyncResult(table)
+    for action, count in conn.execute(f"SELECT action, COUNT(*) FROM temp.sync_{table} GROUP BY action"):
+        setattr(result, action, count)
+
+    missing = f"{key} NOT IN (SELECT {key} FROM temp.sync_{table})"
+    rows = conn.cursor()
+    rows.row_factory = sqlite3.Row
+    result.previous = rows.execute(
+        f"""
+        SELECT {names} FROM {table}
+        WHERE {key} IN (SELECT {key} FROM temp.sync_{table} WHERE action = 'updated')
+           OR {missing}
+        """
+    ).fetchall()
+    result.deleted = len(result.previous) - result.updated
+
+    live = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    if result.deleted > live * MAX_DELETE:
+        raise SyncRejected(f"{table}: {result.deleted} of {live} rows are missing from the feed")
+
+    result.changed = rows.execute(
+        f"SELECT {names} FROM temp.sync_{table} WHERE action != 'unchanged'"
+    ).fetchall()
+    conn.execute(
+        f"""
+        INSERT INTO {table} ({names}, fingerprint)
+        SELECT {names}, fingerprint FROM temp.sync_{table} WHERE action != 'unchanged'
+        ON CONFLICT ({key}) DO UPDATE SET
+            {', '.join(f'{col} = excluded.{col}' for col in stored)},
+            fingerprint = excluded.fingerprint
+        """
+    )
+
+    if result.deleted:
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO tombstones (table_name, key, fingerprint, deleted_at)
+            SELECT ?, {key}, fingerprint, ? FROM {table} WHERE {missing}
+            """,
+            (table, now()),
+        )
+        conn.execute(f"DELETE FROM {table} WHERE {missing}")
+    # Records that came back; most loads have no tombstones to check
+    revived = result.inserted and conn.execute(
+        "SELECT 1 FROM tombstones WHERE table_name = ? LIMIT 1", (table,)
+    ).fetchone()
+    if revived:
+        conn.execute(
+            f"""
+            DELETE FROM tombstones WHERE table_name = ?
+              AND key IN (SELECT {key} FROM temp.sync_{table} WHERE action = 'inserted')
+            """,
+            (table,),
+        )
+
+    conn.execute(f"DROP TABLE temp.sync_{table}")
+    conn.execute(f"DROP TABLE temp.{stage.name}")
+
+    elapsed = stage.elapsed + time.perf_counter() - start
+    print(
+        f"{table}: {stage.rows} rows staged, {result.inserted} inserted, {result.updated} updated, "
+        f"{result.unchanged} unchanged, {result.deleted} deleted in {elapsed:.3f}s"
+    )
+    return result